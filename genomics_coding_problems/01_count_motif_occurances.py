@@ -4,21 +4,40 @@
 # 4 (we have to find overlapping occurances of TGT)
 
 from Bio.Seq import Seq
+from genomics.aho_corasick import MotifScanner
+from genomics.packed import PackedSequence
 
 def count_motif(sequence: str, motif: str) -> int:
     """
     Count overlapping occurrences of a motif in a sequence using Biopython's Seq object.
+    A PackedSequence is scanned directly, comparing packed words instead of strings.
     """
-    seq = Seq(sequence)
+    if isinstance(sequence, PackedSequence):
+        seq, motif = sequence, PackedSequence(motif)
+    else:
+        seq = Seq(sequence)
     count = 0
     for i in range(len(seq) - len(motif) + 1):
         if seq[i:i+len(motif)] == motif:
             count += 1
     return count
 
+def count_motifs(sequence, motifs, both_strands=False):
+    """
+    Count overlapping occurrences of a whole set of motifs in a single pass over the sequence,
+    using an Aho-Corasick automaton instead of one scan per motif.
+    Optionally also counts matches on the reverse-complement strand.
+    """
+    return MotifScanner(motifs, both_strands=both_strands).count(sequence)
+
 # Example usage
 sequence = "ACTGTACGATGATGTGTGTCAAAG"
 motif = "TGT"
 result = count_motif(sequence, motif)
 
 print(f"The motif '{motif}' occurs {result} times in the sequence.")
+
+# Many motifs at once (one pass over the sequence)
+motifs = ["TGT", "GAT", "ACA"]
+print(f"Counts of {motifs}: {count_motifs(sequence, motifs)}")
+print(f"Counts on both strands: {count_motifs(sequence, motifs, both_strands=True)}")
@@ -6,7 +6,7 @@
 # Frequency: 4
 
 from Bio.Seq import Seq
-from collections import Counter
+from genomics.kmers import KmerCounter
 
 # Define the sequence
 sequence = Seq("CGCCTAAATAGCCTCGCGGAGCCTTATGTCATACTCGTCCT")
@@ -14,18 +14,23 @@ sequence = Seq("CGCCTAAATAGCCTCGCGGAGCCTTATGTCATACTCGTCCT")
 # Set the k-mer length
 k = 3
 
-# Generate all 3-mers
-kmers = [str(sequence[i:i+k]) for i in range(len(sequence) - k + 1)]
+# Count all 3-mers: each k-mer is rolled into a 2-bit integer and counted in a
+# dense array (k <= 13) or a compact hash table (larger k), so no string is
+# created per position. This scales to whole bacterial or human chromosomes.
+kmer_counts = KmerCounter(k).add(sequence)
 
-# Count frequencies
-kmer_counts = Counter(kmers)
-
-# Find the maximum frequency
-max_freq = max(kmer_counts.values())
-
-# Extract most frequent 3-mers
-most_frequent = [kmer for kmer, count in kmer_counts.items() if count == max_freq]
+# Find the maximum frequency and extract the most frequent 3-mers
+most_frequent, max_freq = kmer_counts.most_frequent_kmers()
 
 # Output
 print(f"Most frequent 3-mer(s): {most_frequent}")
 print(f"Frequency: {max_freq}")
+
+# (L, t)-clumps: k-mers that occur at least t times inside some window of length L.
+# The window slides one base at a time and only the counts of the k-mer leaving and the
+# k-mer entering change, so a whole bacterial genome takes seconds. Passing
+# skew_flank=... restricts the search to the region around the skew minimum (the likely ori).
+from genomics.clumps import find_clumps
+
+genome = "CGGACTCGACAGATGTGAAGAACGACAATGTGAAGACTCGACACGACAGAGTGAAGAGAAGAGGAAACATTGTAA"
+print(f"(50, 4)-clumps of 5-mers: {find_clumps(genome, 5, 50, 4).kmers}")
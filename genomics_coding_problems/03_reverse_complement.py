@@ -3,11 +3,24 @@
 # Answer:
 # AGCTAGC
 
+from genomics.packed import PackedSequence
+from genomics.strand import ReverseComplement, reverse_complement_many
+
 def reverse_complement(dna):
-    complement = {'A': 'T', 'T': 'A', 'C': 'G', 'G': 'C'}
-    reversed_dna = dna[::-1]
-    return ''.join(complement[base] for base in reversed_dna)
+    if isinstance(dna, PackedSequence):
+        return dna.reverse_complement()  # done on the packed words
+    # A lazy view over the original sequence: nothing is copied until the bases are
+    # needed, and then the whole strand is complemented in one bytes.translate pass
+    return str(ReverseComplement(dna))
 
 # Sample input
 input_dna = "AAAACCCGGT"
 print(reverse_complement(input_dna))  # Output: ACCGGGTTTT
+
+# The view itself can be sliced and handed to the scanners in the genomics package
+# (k-mer counting, motif scanning, skew) without materializing the reverse strand
+minus_strand = ReverseComplement(input_dna)
+print(minus_strand[:4])  # Output: ACCG
+
+# Many reads at once: one translate and one reversal over the joined reads
+print(reverse_complement_many(["GCTAGCT", "AAAACCCGGT"]))  # Output: ['AGCTAGC', 'ACCGGGTTTT']
@@ -11,7 +11,14 @@
 # Sample Output:
 # 1 3 9
 
+from genomics.aho_corasick import MotifScanner
+from genomics.fm_index import FMIndex
+from genomics.packed import PackedSequence
+
 def pattern_matching(pattern, genome):
+    if isinstance(genome, PackedSequence):
+        pattern = PackedSequence(pattern)  # pack once, compare packed words at every offset
+
     positions = []
     pattern_length = len(pattern)
     genome_length = len(genome)
@@ -22,6 +29,13 @@ def pattern_matching(pattern, genome):
 
     return positions
 
+def multi_pattern_matching(patterns, genome, both_strands=False):
+    """
+    Starting positions of every pattern in a set, found in one pass over the genome
+    with an Aho-Corasick automaton. Returns a dictionary pattern -> positions.
+    """
+    return MotifScanner(patterns, both_strands=both_strands).find(genome)
+
 # Sample input
 pattern = "ATAT"
 genome = "GATATATGCATATACTT"
@@ -29,3 +43,14 @@ genome = "GATATATGCATATACTT"
 # Run and print output
 result = pattern_matching(pattern, genome)
 print(" ".join(map(str, result)))
+
+# Many queries against the same genome: build an FM-index once (it can be saved with
+# index.save(path) and memory-mapped back with FMIndex.load(path)); each query then takes
+# time proportional to the pattern length instead of rescanning the genome.
+index = FMIndex.build(genome)
+assert index.locate(pattern) == result
+print(" ".join(map(str, index.locate(pattern))))
+
+# Several patterns in a single pass
+for motif, found in multi_pattern_matching(["ATAT", "CAT", "ACTT"], genome).items():
+    print(f"{motif}: {' '.join(map(str, found))}")
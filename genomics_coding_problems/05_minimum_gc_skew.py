@@ -5,29 +5,17 @@
 # Minimum GC skew score is -4 at position 12 (indexes in the motif start from 1)
 #
 
+from genomics.skew import gc_skew
+
 def find_minimum_skew(dna_sequence):
-    # Initialize variables for G and C counts
-    g_count = 0
-    c_count = 0
-    min_skew = float('inf')  # Start with a very high value
-    min_position = -1
-    
-    # Iterate through the DNA sequence
-    for i in range(len(dna_sequence)):
-        if dna_sequence[i] == 'G':
-            g_count += 1
-        elif dna_sequence[i] == 'C':
-            c_count += 1
-        
-        # Calculate the current skew
-        current_skew = g_count - c_count
-        
-        # If the current skew is the minimum encountered so far
-        if current_skew < min_skew:
-            min_skew = current_skew
-            min_position = i + 1  # 1-based index
-    
-    return min_position
+    # Skew[i] = (number of G) - (number of C) in the first i bases.
+    # Instead of walking the sequence one character at a time, gc_skew turns each chunk
+    # of the sequence into +1 (G) / -1 (C) / 0 steps and takes a NumPy cumulative sum,
+    # carrying the running skew from one chunk to the next.
+    result = gc_skew(dna_sequence)
+
+    # Position of the first occurrence of the minimum (1-based), -1 for an empty sequence
+    return result.min_positions[0] if result.min_positions else -1
 
 # DNA sequence input
 dna_sequence = "GATACACTTCCCGAGTAGGTACTG"
@@ -35,3 +23,8 @@ dna_sequence = "GATACACTTCCCGAGTAGGTACTG"
 # Find the position of the first occurrence of the minimum skew
 min_skew_position = find_minimum_skew(dna_sequence)
 print(f"The position of the first occurrence of the minimum skew is: {min_skew_position}")
+
+# The same scan also reports every position of the minimum and of the maximum
+result = gc_skew(dna_sequence)
+print(f"Minimum skew {result.min_skew} at positions {result.min_positions}")
+print(f"Maximum skew {result.max_skew} at positions {result.max_positions}")
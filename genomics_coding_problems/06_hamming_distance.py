@@ -4,10 +4,19 @@
 # Answer is 50.
 #
 
+from genomics.hamming import hamming_matrix, pairs_within
+from genomics.packed import PackedSequence
+
 def hamming_distance(str1, str2):
     # Check if the lengths of the strings are the same
     if len(str1) != len(str2):
         raise ValueError("Strings must be of equal length")
+
+    # Packed sequences are compared 32 bases at a time with XOR + popcount
+    if isinstance(str1, PackedSequence):
+        return str1.hamming_distance(str2)
+    if isinstance(str2, PackedSequence):
+        return str2.hamming_distance(str1)
     
     # Compute the number of differing positions
     distance = sum(1 for a, b in zip(str1, str2) if a != b)
@@ -24,3 +33,11 @@ try:
     print(f"The Hamming distance is: {distance}")
 except ValueError as e:
     print(e)
+
+# Many sequences at once (e.g. barcodes): all-vs-all distances are computed on packed
+# uint64 words with XOR + popcount in tiles, and pairs_within() returns only the close
+# pairs so the full N x N matrix never has to be built.
+barcodes = ["ACGTACGT", "ACGTACGA", "TTGTACGA", "GGGGCCCC"]
+print(hamming_matrix(barcodes))
+for i, j, dist in zip(*pairs_within(barcodes, d=2)):
+    print(f"{barcodes[i]} ~ {barcodes[j]} (distance {dist})")
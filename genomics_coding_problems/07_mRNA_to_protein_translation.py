@@ -8,6 +8,9 @@
 # 1. CCCAGGACUGAGAUCAAU
 # 2. CCGAGGACCGAAAUCAAC
 
+from genomics.peptides import PeptideScanner
+from genomics.translation import find_orfs, six_frame_translation, translate
+
 # Define the standard codon table (RNA to amino acids)
 codon_table = {
     'UUU': 'F', 'UUC': 'F', 'UUA': 'L', 'UUG': 'L',
@@ -40,17 +43,28 @@ rna_sequences = [
 target = "PRTEIN"
 
 # Function to translate mRNA to protein
+# Each codon is turned into an index 16*b1 + 4*b2 + b3 and looked up in a 64-entry table
+# built from codon_table, for the whole RNA at once (no per-codon string concatenation).
+# Unknown or incomplete codons translate to "?".
 def translate_rna(rna):
-    protein = ""
-    for i in range(0, len(rna), 3):
-        codon = rna[i:i+3]
-        amino_acid = codon_table.get(codon, "?")
-        protein += amino_acid
-    return protein
+    return translate(rna, codon_table, rna=True)
 
 # Check which RNA strings match the target protein
 for rna in rna_sequences:
     protein = translate_rna(rna)
     print(f"RNA: {rna} → Protein: {protein} → Match: {protein == target}")
 
+# Screening without translating: the target is compiled into an automaton whose edges are
+# the codons of each residue (from codon_table), and every RNA is scanned in all three
+# frames directly. An RNA encodes the target when a hit covers it exactly.
+scanner = PeptideScanner([target], codon_table, both_strands=False)
+for rna in rna_sequences:
+    hits = scanner.find(rna, rna=True)
+    print(f"RNA: {rna} → Hits: {[(hit.frame, hit.start, hit.end) for hit in hits]} → "
+          f"Match: {any(hit.start == 0 and hit.end == len(rna) for hit in hits)}")
 
+# DNA works too: all six reading frames and the open reading frames (ATG ... stop)
+dna = "ATGGCCATTGTAATGGGCCGCTGAAAGGGTGCCCGATAG"
+print(six_frame_translation(dna))
+for orf in find_orfs(dna, min_length=3):
+    print(orf)
@@ -53,7 +53,7 @@
 #     Position 6: A
 #
 
-from itertools import product
+from genomics.consensus import DegenerateConsensus
 
 # Profile matrix as a dictionary
 profile = {
@@ -63,18 +63,10 @@ profile = {
     'T': [0.3, 0.1, 0.0, 0.4, 0.5, 0.0],
 }
 
-# Step 1: For each position, find the nucleotide(s) with the max probability
-positions = list(zip(profile['A'], profile['C'], profile['G'], profile['T']))
-nucleotides = ['A', 'C', 'G', 'T']
-
-consensus_options = []
-for pos in positions:
-    max_val = max(pos)
-    consensus_nucs = [nuc for nuc, val in zip(nucleotides, pos) if val == max_val]
-    consensus_options.append(consensus_nucs)
-
-# Step 2: Generate all possible consensus strings
-all_consensus_strings = [''.join(p) for p in product(*consensus_options)]
+# Step 1: For each position, keep the set of nucleotide(s) with the max probability as a
+# bitmask (A=1, C=2, G=4, T=8), i.e. one IUPAC code per column. The consensus strings are
+# never expanded, so long profiles with many ties cost nothing extra.
+consensus = DegenerateConsensus.from_profile(profile)
 
 # Given candidate strings
 candidate_strings = [
@@ -86,11 +78,15 @@ candidate_strings = [
     "AGGTGA",
 ]
 
-# Step 3: Filter which candidates are valid consensus strings
-valid_candidates = [s for s in candidate_strings if s in all_consensus_strings]
+# Step 2: A candidate is a consensus string iff every base is allowed by its column's mask
+valid_candidates = [s for s, ok in zip(candidate_strings, consensus.match_many(candidate_strings)) if ok]
 
 # Output
-print("All possible consensus strings:")
-print(all_consensus_strings)
+print(f"Degenerate consensus: {consensus} ({consensus.count()} possible consensus strings)")
+print("Allowed bases per position:", consensus.options())
 print("\nMatching candidate strings:")
 print(valid_candidates)
+
+# The same mask test scans a whole genome (or IndexedFasta chunks) for consensus hits
+genome = "TTAAGCTACCACGTTAGGAGGTGAT"
+print("\nConsensus hits in genome (0-based):", list(consensus.scan(genome)))
@@ -22,6 +22,8 @@
 # Now multiply all of them:
 # Pr(AAGTTC∣Profile) = 0.4×0.3×1.0×0.4×0.5×0.1 = 0.0024
 
+from genomics.pwm import PWM, PWMScanner
+
 # DNA string
 dna = "AAGTTC"
 
@@ -40,3 +42,23 @@ for i, base in enumerate(dna):
 
 # Output the result
 print(f"Pr({dna}|Profile) = {prob}")
+
+# The product underflows for long motifs and cannot rank hits in a genome. For scanning, the
+# profile becomes an integer log-odds PWM whose exact background score distribution gives a
+# score threshold for a chosen p-value; both strands are scanned.
+pwm = PWM(profile, name="profile")
+threshold = pwm.threshold(0.01)
+print(f"\nScore of {dna}: {pwm.score(dna)} (p-value {pwm.p_value(pwm.score(dna)):.4g}); "
+      f"threshold for p <= 0.01: {threshold}")
+
+genome = "TTAAGCTACCACGTTAGGAGGTGATTAGCGTTNNAAGTTCA"
+scanner = PWMScanner([pwm], p_value=0.01)
+print("Hits (BED):")
+for line in scanner.iter_bed("example", genome):
+    print(line, end="")
+
+# With a skewed background the reverse strand has its own score distribution (the forward
+# matrix under the complemented background), so each strand gets its own threshold.
+skewed = PWM(profile, name="profile", background=[0.7, 0.1, 0.1, 0.1])
+plus, minus = skewed.threshold(0.01), skewed.reverse_complement().threshold(0.01)
+print(f"\nThresholds for p <= 0.01 on an A-rich background: + strand {plus}, - strand {minus}")
@@ -22,8 +22,8 @@
 # We build a profile from the initial motifs with pseudocounts,
 # then select the most probable k-mer in each DNA string based on this profile.
 
-from collections import defaultdict
-import numpy as np
+from genomics.profile import SequenceSet, profile_matrix
+from genomics.randomized import randomized_motif_search
 
 # Inputs
 Dna = [
@@ -36,32 +36,16 @@ Dna = [
 initial_motifs = ["TGA", "GTT", "GAA", "TGT"]
 k = 3
 
-def build_profile_with_pseudocounts(motifs, k):
-    profile = {nuc: [1] * k for nuc in "ACGT"}  # Start with pseudocounts
-    for motif in motifs:
-        for i, nuc in enumerate(motif):
-            profile[nuc][i] += 1
-    t = len(motifs) + 4  # total count after adding pseudocounts
-    for nuc in "ACGT":
-        profile[nuc] = [count / t for count in profile[nuc]]
-    return profile
-
-def profile_most_probable_kmer(text, k, profile):
-    max_prob = -1
-    most_prob_kmer = text[0:k]
-    for i in range(len(text) - k + 1):
-        kmer = text[i:i+k]
-        prob = 1
-        for j, nuc in enumerate(kmer):
-            prob *= profile[nuc][j]
-        if prob > max_prob:
-            max_prob = prob
-            most_prob_kmer = kmer
-    return most_prob_kmer
-
 # Step 1: Build profile from initial motifs
-profile = build_profile_with_pseudocounts(initial_motifs, k)
+profile = profile_matrix(initial_motifs, pseudocount=1)
 
-# Step 2: Find the most probable k-mer in each DNA string based on profile
-new_motifs = [profile_most_probable_kmer(dna, k, profile) for dna in Dna]
+# Step 2: Score every 3-mer of every DNA string in one vectorized pass and keep
+# the most probable one per string
+dna = SequenceSet(Dna)
+new_motifs = dna.kmers(dna.most_probable_positions(profile), k)
 print(" ".join(new_motifs))  # Output: TGA TAA GGA TGT
+
+# Full RandomizedMotifSearch: 1,000 random restarts, each iterated until its score stops
+# improving. All restarts advance together as one (restarts x sequences) position matrix.
+result = randomized_motif_search(Dna, k, restarts=1000, seed=0)
+print(f"Best of 1000 restarts (score {result.score}):", " ".join(result.motifs))
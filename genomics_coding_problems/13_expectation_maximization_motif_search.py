@@ -5,34 +5,8 @@
 
 import random
 
-def calculate_profile_matrix(motifs, pseudocount=1):
-    """
-    Calculate the profile matrix from a list of motifs.
-    Optionally add pseudocounts to avoid zero probabilities.
-
-    :param motifs: List of strings, each string is a DNA motif of the same length.
-    :param pseudocount: Integer, added to each count to prevent zero probabilities.
-    :return: Dictionary with keys A, C, G, T mapping to lists of probabilities.
-    """
-    # Determine the length of motifs (all motifs are assumed to be of the same length)
-    k = len(motifs[0])
-
-    # Initialize a profile dictionary for A, C, G, T with pseudocounts to avoid zero probabilities
-    profile = {base: [pseudocount] * k for base in "ACGT"}
-
-    # Count the occurrences of each nucleotide at each position across all motifs
-    for motif in motifs:
-        for index, base in enumerate(motif):
-            profile[base][index] += 1  # Increment the count of base at position 'index'
-
-    # Compute the total number of sequences plus added pseudocounts at each position
-    total = len(motifs) + 4 * pseudocount  # each position is normalized across all 4 bases
-
-    # Convert counts to probabilities by dividing each count by the total at that position
-    for base in profile:
-        profile[base] = [count / total for count in profile[base]]
-
-    return profile
+from genomics.em import em_search
+from genomics.profile import SequenceSet, profile_matrix
 
 def random_kmers(dna_list, k):
     """Randomly select one k-mer from each DNA sequence."""
@@ -41,36 +15,37 @@ def random_kmers(dna_list, k):
 
 def expectation_step(dna_list, k, profile):
     """Compute most probable k-mers based on current profile (Expectation step)."""
-    motifs = []
-    for seq in dna_list:
-        max_prob = -1
-        best_kmer = seq[0:k]
-        for i in range(len(seq) - k + 1):
-            kmer = seq[i:i + k]
-            prob = 1
-            for j, base in enumerate(kmer):
-                prob *= profile[base][j]
-            if prob > max_prob:
-                max_prob = prob
-                best_kmer = kmer
-        motifs.append(best_kmer)
-    return motifs
+    sequences = dna_list if isinstance(dna_list, SequenceSet) else SequenceSet(dna_list)
+    return sequences.kmers(sequences.most_probable_positions(profile), k)
 
 
-def em_motif_finder(dna_list, k, iterations=10):
+def em_motif_finder(dna_list, k, iterations=10, mode="hard", starts=20, seed=None, processes=None):
     """
     EM motif finder: find common motifs in sequences using EM algorithm.
 
     :param dna_list: List of DNA sequences
     :param k: Motif length
-    :param iterations: Number of EM iterations to perform
+    :param iterations: Number of EM iterations to perform (the maximum in "soft" mode)
+    :param mode: "hard" keeps only the most probable k-mer per sequence from one random start;
+                 "soft" runs MEME-style EM (position responsibilities, weighted counts,
+                 stop on log-likelihood convergence) from many starts in a process pool
+    :param starts: Number of random starts in "soft" mode
+    :param seed: Seed for the "soft" mode starts (reproducible runs)
+    :param processes: Worker processes in "soft" mode (None = all cores)
     :return: Final motif list
     """
+    if mode == "soft":
+        return em_search(dna_list, k, starts=starts, seed=seed, processes=processes,
+                         max_iterations=iterations).motifs
+    if mode != "hard":
+        raise ValueError(f"Unknown mode: {mode}")
+
     motifs = random_kmers(dna_list, k)  # Step 0: Initialize with random k-mers
+    sequences = SequenceSet(dna_list)    # Encoded once, reused by every E-step
 
     for _ in range(iterations):
-        profile = calculate_profile_matrix(motifs)
-        motifs = expectation_step(dna_list, k, profile)
+        profile = profile_matrix(motifs)
+        motifs = expectation_step(sequences, k, profile)
 
     return motifs
 
@@ -90,6 +65,12 @@ if __name__ == "__main__":
     for motif in motifs:
         print(motif)
 
+    motifs = em_motif_finder(dna_list, k, iterations=100, mode="soft", starts=20, seed=1)
+
+    print("Motifs from soft EM (20 starts):")
+    for motif in motifs:
+        print(motif)
+
     # Expected result:
     # Should return a consistent set of 3-mers such as ['AGC', 'TGC', 'AGC', 'TGC'] or similar,
     # depending on random initialization.
@@ -3,53 +3,59 @@
 # combination of k-mers (substrings) across the input DNA sequences.
 # It chooses the combination that minimizes the total Hamming distance from a consensus sequence.
 
-from itertools import product
-
-def hamming_distance(seq1, seq2):
-    """Calculate the number of differences between two sequences (Hamming distance)."""
-    return sum(base1 != base2 for base1, base2 in zip(seq1, seq2))
-
-def consensus_string(motifs):
-    """Return the most common base at each position (consensus of motifs)."""
-    k = len(motifs[0])
-    consensus = ""
-    for i in range(k):
-        count = {base: 0 for base in "ACGT"}
-        for motif in motifs:
-            count[motif[i]] += 1
-        consensus += max(count, key=count.get)
-    return consensus
+from itertools import islice, product
+
+import numpy as np
+
+from genomics.median import median_string
+from genomics.profile import SequenceSet, score_motif_sets, score_motifs
 
 def total_distance(motifs):
     """Sum of Hamming distances of motifs to the consensus string."""
-    consensus = consensus_string(motifs)
-    return sum(hamming_distance(motif, consensus) for motif in motifs)
+    # Per column this is t minus the count of the consensus base, read off the one-hot counts
+    return score_motifs(motifs)
 
-def brute_force_motif_search(dna_list, k):
+def brute_force_motif_search(dna_list, k, batch_size=1 << 14, method="exhaustive", processes=None):
     """
     Brute-force motif search that tries every k-mer combination from all DNA sequences.
 
     :param dna_list: List of DNA sequences
     :param k: Length of the motif
+    :param batch_size: Number of combinations scored per vectorized batch
+    :param method: "exhaustive" tries every combination; "branch_and_bound" runs the exact
+                   median-string search instead, which reaches the same minimum total distance
+                   (on ties it may pick a different, equally good motif set)
+    :param processes: Worker processes for the branch-and-bound search (None = all cores)
     :return: List of best motif k-mers (one from each sequence)
     """
-    # Generate all possible k-mers for each sequence
-    all_kmers = [
-        [seq[i:i+k] for i in range(len(seq) - k + 1)]
-        for seq in dna_list
-    ]
+    if method == "branch_and_bound":
+        return tuple(median_string(dna_list, k, processes=processes).motifs)
+    if method != "exhaustive":
+        raise ValueError(f"Unknown method: {method}")
+
+    # Encode all possible k-mers of each sequence once, as (windows, k) code matrices
+    sequences = SequenceSet(dna_list)
+    _, segment_starts, counts = sequences.windows(k)
+    window_codes = sequences.window_codes(k)
+    rows = np.arange(len(sequences))
 
-    best_motifs = None
+    best_positions = None
     min_distance = float('inf')
 
-    # Try all combinations of one k-mer from each sequence using Cartesian product
-    for motif_combination in product(*all_kmers):
-        dist = total_distance(motif_combination)
-        if dist < min_distance:
-            min_distance = dist
-            best_motifs = motif_combination
+    # Try all combinations of one k-mer from each sequence using Cartesian product,
+    # scoring a batch of combinations at a time from their one-hot counts
+    combinations = product(*(range(n) for n in counts))
+    while True:
+        batch = np.array(list(islice(combinations, batch_size)), dtype=np.int64)
+        if len(batch) == 0:
+            break
+        distances = score_motif_sets(window_codes[segment_starts[rows] + batch])
+        best = int(distances.argmin())   # first combination on ties, like the sequential scan
+        if distances[best] < min_distance:
+            min_distance = distances[best]
+            best_positions = batch[best]
 
-    return best_motifs
+    return tuple(sequences.kmers(best_positions, k))
 
 
 if __name__ == "__main__":
@@ -72,3 +78,10 @@ if __name__ == "__main__":
     # from their consensus. For example, something like:
     # ['AGC', 'TGC', 'AGC', 'TGC']
     # (Depends on actual contents of input)
+
+    # Exact search that scales well beyond a handful of sequences: branch and bound over
+    # the 4^k median-string tree, with the top-level prefixes searched in parallel.
+    best_motifs = brute_force_motif_search(dna_list, k, method="branch_and_bound")
+    print(f"\nBest Motifs (branch and bound, total distance {total_distance(best_motifs)}):")
+    for motif in best_motifs:
+        print(motif)
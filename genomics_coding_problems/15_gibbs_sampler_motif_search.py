@@ -9,39 +9,16 @@
 # - The goal is to converge to a set of motifs that are very similar (low total distance).
 
 import random
-from collections import Counter
 
-def hamming_distance(seq1, seq2):
-    return sum(c1 != c2 for c1, c2 in zip(seq1, seq2))
-
-def profile_with_pseudocounts(motifs):
-    """Generate a profile matrix with Laplace smoothing (pseudocounts of 1)."""
-    k = len(motifs[0])
-    t = len(motifs)
-    profile = {nuc: [1] * k for nuc in "ACGT"}  # start with pseudocounts
-
-    for motif in motifs:
-        for i, nuc in enumerate(motif):
-            profile[nuc][i] += 1
-
-    for nuc in "ACGT":
-        profile[nuc] = [count / (t + 4) for count in profile[nuc]]  # normalize
-
-    return profile
+from genomics.gibbs import gibbs_search
+from genomics.profile import SequenceSet, profile_matrix, score_motifs
 
 def profile_random_kmer(seq, k, profile):
     """Randomly choose a k-mer from a sequence based on the profile matrix."""
-    n = len(seq)
-    probs = []
-    kmers = []
-
-    for i in range(n - k + 1):
-        kmer = seq[i:i+k]
-        prob = 1.0
-        for j, nuc in enumerate(kmer):
-            prob *= profile[nuc][j]
-        probs.append(prob)
-        kmers.append(kmer)
+    sequences = seq if isinstance(seq, SequenceSet) else SequenceSet([seq])
+    probs = sequences.sequence_scores(0, profile).tolist()   # Pr(k-mer | profile) for every window
+    text = sequences.sequences[0]
+    kmers = [text[i:i+k] for i in range(len(probs))]
 
     total = sum(probs)
     probs = [p / total for p in probs]  # Normalize
@@ -49,22 +26,15 @@ def profile_random_kmer(seq, k, profile):
     # Weighted random choice based on profile probabilities
     return random.choices(kmers, weights=probs, k=1)[0]
 
-def consensus_string(motifs):
-    k = len(motifs[0])
-    consensus = ""
-    for i in range(k):
-        count = Counter([motif[i] for motif in motifs])
-        consensus += count.most_common(1)[0][0]
-    return consensus
-
 def score(motifs):
     """Return the total Hamming distance of motifs to their consensus."""
-    cons = consensus_string(motifs)
-    return sum(hamming_distance(motif, cons) for motif in motifs)
+    return score_motifs(motifs)
 
 def gibbs_sampler(dna, k, n_iterations):
     """Run Gibbs Sampling for motif discovery."""
     t = len(dna)
+    # Encode every sequence once, the sampling step reuses the cached windows
+    encoded = [SequenceSet([s]) for s in dna]
     # Step 1: randomly choose initial k-mers from each sequence
     motifs = [random.choice([s[i:i+k] for i in range(len(s)-k+1)]) for s in dna]
     best_motifs = motifs[:]
@@ -76,10 +46,10 @@ def gibbs_sampler(dna, k, n_iterations):
         motifs_except_i = motifs[:i] + motifs[i+1:]
 
         # Step 3: Build profile from remaining motifs
-        profile = profile_with_pseudocounts(motifs_except_i)
+        profile = profile_matrix(motifs_except_i)
 
         # Step 4: Sample a new motif for the excluded sequence
-        new_motif = profile_random_kmer(dna[i], k, profile)
+        new_motif = profile_random_kmer(encoded[i], k, profile)
         motifs[i] = new_motif
 
         # Step 5: Update best motifs if new ones are better
@@ -117,3 +87,13 @@ if __name__ == "__main__":
     # GTGTGTAC
     # GTGTGTGC
     # GTGTGTGC
+
+    # Many independent chains with live count matrices, one reproducible random stream per
+    # chain (seed=42) spread over a process pool; a chain stops once its best score has not
+    # improved for 200 iterations.
+    n_chains = 50
+    restarts = gibbs_search(dna_list, k, n_iterations=1000, n_chains=n_chains, seed=42, patience=200)
+
+    print(f"\nBest motifs over {n_chains} chains (score {restarts.score}, chain {restarts.chain}):")
+    for motif in restarts.motifs:
+        print(motif)
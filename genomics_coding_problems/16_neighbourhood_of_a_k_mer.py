@@ -25,52 +25,37 @@
 # This script computes all neighbors and groups them by their Hamming distance from the pattern.
 # ---------------------------------------------------------
 
-from itertools import product
 from collections import defaultdict
 
-def hamming_distance(s1, s2):
-    """Compute the Hamming distance between two strings."""
-    return sum(ch1 != ch2 for ch1, ch2 in zip(s1, s2))
+from genomics.kmers import decode_kmer
+from genomics.neighbors import iter_neighbors
 
 def neighbors(pattern, d):
     """
     Return the d-neighborhood of a k-mer pattern.
-    
+
+    Every neighbor is the 2-bit encoding of the pattern XOR-ed with one precomputed
+    mismatch mask (cached per (k, d) and shared by every pattern), so no intermediate
+    string is built and no Hamming distance is recomputed.
+
     Parameters:
         pattern (str): The original k-mer string.
         d (int): Maximum allowed Hamming distance.
-        
+
     Returns:
         Set[str]: All k-mers within Hamming distance ≤ d from the pattern.
     """
-    if d == 0:
-        return {pattern}
-    if len(pattern) == 0:
-        return {""}
-    
-    nucleotides = ['A', 'C', 'G', 'T']
-    suffix_neighbors = neighbors(pattern[1:], d)
-    neighborhood = set()
-
-    for text in suffix_neighbors:
-        if hamming_distance(pattern[1:], text) < d:
-            for n in nucleotides:
-                neighborhood.add(n + text)
-        else:
-            neighborhood.add(pattern[0] + text)
-    
-    return neighborhood
+    return {decode_kmer(value, len(pattern)) for value in iter_neighbors(pattern, d)}
 
 # ----------- Example Usage -----------
 pattern = "ACGT"
 d = 3
-neighborhood = neighbors(pattern, d)
 
-# Group by Hamming distance
+# Group by Hamming distance: the generator tags every neighbor with its distance
 grouped = defaultdict(list)
-for n in neighborhood:
-    dist = hamming_distance(pattern, n)
-    grouped[dist].append(n)
+for value, dist in iter_neighbors(pattern, d, with_distance=True):
+    grouped[dist].append(decode_kmer(value, len(pattern)))
+neighborhood = neighbors(pattern, d)
 
 # Print summary
 total = 0
@@ -93,11 +78,11 @@ assert total == len(neighborhood)
 # Examples: ['ACGT']
 #
 # Hamming Distance 1: 12 k-mers
-# Examples: ['CCGT', 'AGGT', 'AAGT', 'GCGT', 'ATGT'] ...
+# Examples: ['CCGT', 'GCGT', 'TCGT', 'AAGT', 'ATGT'] ...
 #
 # Hamming Distance 2: 54 k-mers
-# Examples: ['CAGT', 'ATCT', 'AAGC', 'GAGT', 'TCGT'] ...
+# Examples: ['CAGT', 'CTGT', 'CGGT', 'GAGT', 'GTGT'] ...
 #
 # Hamming Distance 3: 108 k-mers
-# Examples: ['TAGT', 'TGGA', 'CCGA', 'CCAT', 'GAGA'] ...
+# Examples: ['CATT', 'CAAT', 'CACT', 'CTTT', 'CTAT'] ...
 # ---------------------------------------------------------
@@ -1,6 +1,9 @@
 from Bio.Seq import Seq
 from Bio.SeqRecord import SeqRecord
 from Bio import SeqIO
+from genomics.align import call_variants
+from genomics.fastx import IndexedFasta
+from genomics.vcf import VcfReader, VcfWriter
 
 # Step 1: Generate reference and sample FASTA files
 def write_fasta_files():
@@ -12,62 +15,47 @@ def write_fasta_files():
     # SNP at position 5 (T → G)
     # Insertion of 'TT' after position 8
     # Deletion of 'C' at position 13
+    # The most parsimonious alignment explains it as an insertion of GT after position 6
+    # (left-aligned: A -> AGT) and a deletion of GC after position 12 (GGC -> G).
     sample_seq = SeqRecord(Seq("ATCGGAGTTTACAGT"), id="chr1", description="Sample sequence")
     SeqIO.write(sample_seq, "sample.fasta", "fasta")
 
 # Step 2: Compare sequences to find SNPs, insertions, deletions
-def find_variants(ref, sample):
-    variants = []
-    i, j, pos = 0, 0, 1  # 1-based position
-    while i < len(ref) and j < len(sample):
-        if ref[i] == sample[j]:
-            i += 1
-            j += 1
-            pos += 1
-        elif i + 1 < len(ref) and j + 1 < len(sample) and ref[i+1] == sample[j+1]:
-            # SNP
-            variants.append((pos, ref[i], sample[j]))
-            i += 1
-            j += 1
-            pos += 1
-        elif sample[j:j+2] and ref[i] == sample[j+2:j+3]:
-            # Insertion
-            inserted = sample[j:j+2]
-            variants.append((pos-1, ref[i-1], ref[i-1] + inserted))
-            j += 2
-        elif i + 1 < len(ref) and ref[i+1] != sample[j]:
-            # Deletion
-            del_seq = ref[i:i+2]
-            variants.append((pos, del_seq, ref[i]))
-            i += 1
-            pos += 1
-        else:
-            # Fallback for unexpected mismatch
-            variants.append((pos, ref[i], sample[j]))
-            i += 1
-            j += 1
-            pos += 1
-    return variants
+# The sample is aligned to the reference with a banded affine-gap aligner (memory grows
+# with length x band, not length^2, so whole contigs can be aligned), and the alignment is
+# turned into VCF records: SNVs, and indels anchored on the preceding base and shifted
+# left as far as the reference allows.
+def find_variants(ref, sample, band=64):
+    return call_variants(ref, sample, mode="global", band=band)
 
 # Step 3: Write variants to a VCF file
-def write_vcf_file(variants):
-    with open("variants.vcf", "w") as vcf:
-        vcf.write("##fileformat=VCFv4.2\n")
-        vcf.write("#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\n")
-        for pos, ref_base, alt_base in variants:
-            vcf.write(f"chr1\t{pos}\t.\t{ref_base}\t{alt_base}\t.\tPASS\t.\n")
+# Each variant is (chrom, pos, ref, alt). Records are formatted in batches into a
+# block-compressed (BGZF) file, and a positional index (variants.vcf.gz.vidx) is built
+# while writing, so a region can later be read back without decompressing the whole file.
+def write_vcf_file(variants, path="variants.vcf.gz", contigs=None):
+    with VcfWriter(path, contigs=contigs) as vcf:
+        vcf.write(variants)
 
 # Main pipeline
 def main():
     write_fasta_files()
 
-    ref = str(SeqIO.read("reference.fasta", "fasta").seq)
-    sample = str(SeqIO.read("sample.fasta", "fasta").seq)
-
-    variants = find_variants(ref, sample)
-    write_vcf_file(variants)
+    # Both FASTA files are memory-mapped and indexed (.fai), so every record of a
+    # multi-record file is compared in turn and only one record pair is loaded at a time.
+    variants = []
+    with IndexedFasta("reference.fasta") as reference, IndexedFasta("sample.fasta") as sample:
+        for chrom in reference.references:
+            if chrom not in sample:
+                continue
+            for pos, ref_base, alt_base in find_variants(reference.fetch(chrom), sample.fetch(chrom)):
+                variants.append((chrom, pos, ref_base, alt_base))
+        contigs = reference.lengths
+    write_vcf_file(variants, contigs=contigs)
 
     print("FASTA and VCF files generated successfully.")
+    with VcfReader("variants.vcf.gz") as vcf:
+        for record in vcf.fetch_region("chr1:1-10"):
+            print(record.chrom, record.pos, record.ref, record.alt)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,51 @@
+# Code Challenge: Solve the Approximate Pattern Matching Problem.
+#
+# Input: Strings Pattern and Text along with an integer d.
+# Output: All starting positions where Pattern appears as a substring of Text with at most d mismatches.
+#
+# Sample Input:
+# ATTCTGGA
+# CGCCCGAATCCAGAACGCATTCCCATATTTCGGGACCACTGGCCTCCACGGTACGGACGTCAATCAAATGCCTAGCGGCTTGTGGTTTCTCCTACGCTCC
+# 3
+#
+# Sample Output:
+# 6 7 26 27 78
+#
+# Code Challenge: Solve the Frequent Words with Mismatches and Reverse Complements Problem.
+#
+# Input: A DNA string Text as well as integers k and d.
+# Output: All k-mers Pattern maximizing the sum Count_d(Text, Pattern) + Count_d(Text, Pattern_rc)
+# over all possible k-mers.
+#
+# Sample Input:
+# ACGTTGCATGTCGCATGATGCATGAGAGCT
+# 4 1
+#
+# Sample Output:
+# ACAT ATGT
+#
+# ---------
+# Approach:
+# ---------
+# Enumerating the d-neighborhood of a pattern (see 16_neighbourhood_of_a_k_mer.py) grows as
+# C(k, d) * 3^d strings, and every neighbor would then have to be searched for.
+# Instead:
+#   - Seed and verify: split Pattern into d + 1 disjoint seeds. With at most d mismatches,
+#     at least one seed must match exactly (pigeonhole principle), so only the positions
+#     where some seed occurs (looked up in an integer k-mer index) need to be checked.
+#     Each candidate is verified with a Hamming distance on 2-bit packed words.
+#   - Frequent words: count each k-mer of Text once and spread the counts over Hamming
+#     balls of radius d on the 4^k count array, one position at a time.
+
+from genomics.approximate import approximate_pattern_matching, frequent_words_with_mismatches
+
+pattern = "ATTCTGGA"
+text = "CGCCCGAATCCAGAACGCATTCCCATATTTCGGGACCACTGGCCTCCACGGTACGGACGTCAATCAAATGCCTAGCGGCTTGTGGTTTCTCCTACGCTCC"
+d = 3
+print(" ".join(map(str, approximate_pattern_matching(pattern, text, d))))  # Output: 6 7 26 27 78
+
+text = "ACGTTGCATGTCGCATGATGCATGAGAGCT"
+k, d = 4, 1
+kmers, count = frequent_words_with_mismatches(text, k, d, reverse_complements=True)
+print(" ".join(kmers))  # Output: ACAT ATGT
+print(f"Count_d(Text, Pattern) + Count_d(Text, Pattern_rc) = {count}")
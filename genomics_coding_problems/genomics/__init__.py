@@ -0,0 +1,64 @@
+"""
+Shared building blocks for the genomics_coding_problems scripts.
+
+The numbered scripts stay self-contained and readable; the modules in this package hold
+the scalable versions of the data structures and algorithms they rely on.
+
+Importing the package is cheap: the public names below are resolved on first access, so
+NumPy and the algorithm modules are only loaded by the code that actually uses them
+(`python -m genomics` runs batch jobs from a manifest, see genomics/cli.py).
+"""
+
+import importlib
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    "PackedSequence": "packed",
+    "IndexedFasta": "fastx",
+    "read_fastq": "fastx",
+    "KmerCounter": "kmers",
+    "count_kmers_parallel": "kmers",
+    "MotifScanner": "aho_corasick",
+    "FMIndex": "fm_index",
+    "ApproximateMatcher": "approximate",
+    "approximate_pattern_matching": "approximate",
+    "frequent_words_with_mismatches": "approximate",
+    "gc_skew": "skew",
+    "hamming_matrix": "hamming",
+    "pairs_within": "hamming",
+    "translate": "translation",
+    "find_orfs": "translation",
+    "SequenceSet": "profile",
+    "profile_matrix": "profile",
+    "gibbs_search": "gibbs",
+    "median_string": "median",
+    "em_search": "em",
+    "randomized_motif_search": "randomized",
+    "DegenerateConsensus": "consensus",
+    "PWM": "pwm",
+    "PWMScanner": "pwm",
+    "call_variants": "align",
+    "VcfWriter": "vcf",
+    "VcfReader": "vcf",
+    "find_clumps": "clumps",
+    "iter_neighbors": "neighbors",
+    "ReverseComplement": "strand",
+    "reverse_complement_many": "strand",
+    "PeptideScanner": "peptides",
+    "ShardedExecutor": "sharded",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,208 @@
+# Multi-pattern motif scanning with an Aho-Corasick automaton.
+#
+# All motifs are compiled into one trie over the alphabet {A, C, G, T}. Failure links turn
+# the trie into a complete DFA (every state has a transition for every base), and each
+# state lists the motifs that end there, including the ones reached through failure links.
+# Scanning is then one table lookup per base, whatever the number of motifs, and finds
+# every overlapping occurrence of every motif in a single pass: O(genome + hits) instead of
+# O(patterns x genome).
+#
+# Bases other than A/C/G/T send the automaton back to the root, so no match spans an N.
+# The automaton state is carried across chunks, so a streamed genome can be fed piece by
+# piece (without overlaps) and no boundary hit is lost.
+
+from collections import deque
+
+import numpy as np
+
+from .packed import PackedSequence, is_sequence, to_codes
+
+_ALPHABET = "ACGT"
+_RESET = 4   # column used for any base outside A/C/G/T
+
+# bytes.translate table: A/C/G/T (any case) -> 0..3, everything else -> 4
+_CODE_TABLE = bytes(
+    _ALPHABET.find(chr(byte).upper()) if chr(byte).upper() in _ALPHABET else _RESET
+    for byte in range(256)
+)
+_COMPLEMENT = str.maketrans("ACGT", "TGCA")
+
+
+def _symbols(chunk):
+    """Automaton input of one chunk: bytes with 0-3 for A/C/G/T and 4 for any other base."""
+    if isinstance(chunk, (np.ndarray, PackedSequence)):   # 2-bit codes, AMBIGUOUS == 4
+        return to_codes(chunk).astype(np.uint8).tobytes()
+    if isinstance(chunk, str):
+        chunk = chunk.encode("ascii")
+    # bytes, bytearray, memoryview, Bio.Seq, strand.ReverseComplement (via bytes.translate)
+    return bytes(chunk).translate(_CODE_TABLE)
+
+
+def _distinct_sites(hits):
+    """
+    Drop the reverse-strand hit of a palindromic motif at a site already reported on the
+    forward strand (both come out together, and each motif's hits in increasing order).
+    """
+    last = {}
+    for hit in hits:
+        pattern, start, _ = hit
+        if last.get(pattern) != start:
+            last[pattern] = start
+            yield hit
+
+
+def build_automaton(keywords, alphabet_size):
+    """
+    Aho-Corasick automaton of a set of keywords, completed into a DFA.
+
+    :param keywords: List of (symbols, tag) pairs; symbols is a sequence of ints in
+                     range(alphabet_size).
+    :param alphabet_size: Number of symbols.
+    :return: Tuple (goto, outputs): goto[state][symbol] is the next state (state 0 is the
+             root) and outputs[state] lists (keyword length, tag) for every keyword that
+             ends in that state, including those reached through failure links.
+    """
+    # Trie construction
+    goto = [[-1] * alphabet_size]
+    outputs = [[]]
+    for symbols, tag in keywords:
+        state = 0
+        for symbol in symbols:
+            if goto[state][symbol] == -1:
+                goto[state][symbol] = len(goto)
+                goto.append([-1] * alphabet_size)
+                outputs.append([])
+            state = goto[state][symbol]
+        outputs[state].append((len(symbols), tag))
+
+    # Breadth-first failure links, completing the DFA as we go
+    fail = [0] * len(goto)
+    queue = deque()
+    for symbol in range(alphabet_size):
+        child = goto[0][symbol]
+        if child == -1:
+            goto[0][symbol] = 0
+        else:
+            queue.append(child)
+    while queue:
+        state = queue.popleft()
+        outputs[state] += outputs[fail[state]]
+        for symbol in range(alphabet_size):
+            child = goto[state][symbol]
+            if child == -1:
+                goto[state][symbol] = goto[fail[state]][symbol]
+            else:
+                fail[child] = goto[fail[state]][symbol]
+                queue.append(child)
+    return goto, outputs
+
+
+class MotifScanner:
+    """
+    A compiled set of motifs that finds all their overlapping occurrences in one pass.
+
+    Usage:
+        scanner = MotifScanner(["TGT", "GAT", "ATG"], both_strands=True)
+        scanner.count("ACTGTACGATGATGTGTGTCAAAG")   # {'TGT': ..., 'GAT': ..., 'ATG': ...}
+        scanner.find(genome.iter_chunks("chr1"))    # chunks from IndexedFasta are fine too
+
+    With both_strands, count() and find() report sites: a palindromic motif (equal to its
+    reverse complement) matches both strands at once and counts once, so
+    count(x)[motif] == len(find(x)[motif]). iter_hits() yields one hit per strand.
+    """
+
+    def __init__(self, patterns, both_strands=False):
+        """
+        :param patterns: Iterable of motif strings over A/C/G/T (case-insensitive).
+        :param both_strands: Also report matches on the reverse strand, i.e. occurrences of
+                             each motif's reverse complement, reported at their forward-strand
+                             start position with strand "-".
+        """
+        self.patterns = []
+        for pattern in patterns:
+            pattern = str(pattern).upper()
+            if not pattern or pattern.strip(_ALPHABET):
+                raise ValueError(f"Motifs must be non-empty strings over A, C, G, T: {pattern!r}")
+            if pattern not in self.patterns:
+                self.patterns.append(pattern)
+        self.both_strands = both_strands
+
+        # Each automaton keyword is (pattern index, strand)
+        keywords = [(pattern, (index, "+")) for index, pattern in enumerate(self.patterns)]
+        if both_strands:
+            keywords += [(pattern.translate(_COMPLEMENT)[::-1], (index, "-"))
+                         for index, pattern in enumerate(self.patterns)]
+        self._compile(keywords)
+
+    def _compile(self, keywords):
+        goto, outputs = build_automaton([([_ALPHABET.index(base) for base in word], tag)
+                                         for word, tag in keywords], 4)
+
+        # Flat transition table with states pre-multiplied by 5 (4 bases + reset column)
+        width = 5
+        self._delta = []
+        for row in goto:
+            self._delta.extend(next_state * width for next_state in row)
+            self._delta.append(0)
+        self._outputs = [()] * (len(goto) * width)
+        for state, found in enumerate(outputs):
+            self._outputs[state * width] = tuple(found)
+        self.n_states = len(goto)
+
+    def iter_hits(self, chunks):
+        """
+        Scan consecutive chunks of one sequence, carrying the automaton state across them.
+
+        :param chunks: Iterable of sequence pieces (str, bytes, memoryview, Bio.Seq,
+                       PackedSequence, ReverseComplement, code arrays) or of (start, piece) tuples as produced by IndexedFasta.iter_chunks(overlap=0).
+        :return: Generator of (pattern, start, strand) tuples, start being 0-based in the whole sequence.
+        """
+        delta, outputs, patterns = self._delta, self._outputs, self.patterns
+        state = 0
+        offset = 0
+        for chunk in chunks:
+            if isinstance(chunk, tuple):
+                start, chunk = chunk
+                if start != offset:
+                    raise ValueError("Chunks must be consecutive and non-overlapping")
+            data = _symbols(chunk)
+            for i, code in enumerate(data):
+                state = delta[state + code]
+                found = outputs[state]
+                if found:
+                    end = offset + i + 1
+                    for length, (index, strand) in found:
+                        yield patterns[index], end - length, strand
+            offset += len(data)
+
+    def _chunks(self, sequence):
+        return [sequence] if is_sequence(sequence) else sequence
+
+    def count(self, sequence):
+        """
+        Count overlapping occurrences of every motif (on both strands if enabled, a
+        palindromic site once).
+
+        :param sequence: A sequence or an iterable of consecutive chunks (see iter_hits).
+        :return: Dictionary motif -> count, including motifs with zero hits.
+        """
+        counts = dict.fromkeys(self.patterns, 0)
+        for pattern, _, _ in _distinct_sites(self.iter_hits(self._chunks(sequence))):
+            counts[pattern] += 1
+        return counts
+
+    def find(self, sequence, strand=None):
+        """
+        Find the start positions of every motif.
+
+        :param sequence: A sequence or an iterable of consecutive chunks (see iter_hits).
+        :param strand: Restrict to "+" or "-" hits; None returns both (sorted, de-duplicated,
+                       so a palindromic motif is listed once per position).
+        :return: Dictionary motif -> sorted list of 0-based start positions.
+        """
+        positions = {pattern: [] for pattern in self.patterns}
+        hits = self.iter_hits(self._chunks(sequence))
+        for pattern, start, hit_strand in _distinct_sites(hits) if strand is None else hits:
+            if strand is None or hit_strand == strand:
+                positions[pattern].append(start)
+        return positions
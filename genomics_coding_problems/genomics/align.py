@@ -0,0 +1,265 @@
+# Banded affine-gap alignment and variant records.
+#
+# Gotoh's three-state recurrence (H: best score, E: gap in the reference = insertion,
+# F: gap in the sample = deletion), with a gap of length L costing
+# gap_open + (L - 1) * gap_extend, restricted to a band of diagonals around the main
+# diagonal: cell (i, j) is stored at column j - i - low of its row, so each row holds
+# band_width cells and memory is O(n * band_width) (one uint8 traceback code per cell).
+#
+# Each row is one set of NumPy vector operations over the band:
+#   - diagonal moves and F (vertical) only depend on the previous row,
+#   - E (horizontal) depends on cells to the left in the same row; with gap_open >=
+#     gap_extend it equals a running maximum, E[j] = max_{j' < j} (H0[j'] - gap_open -
+#     (j - j' - 1) * gap_extend) over H0 = max(diagonal, F), computed with
+#     np.maximum.accumulate instead of a per-cell loop.
+#
+# "global" aligns both sequences end to end; "semiglobal" leaves the reference ends free,
+# so a sample contig can lie anywhere inside the (banded) reference window.
+#
+# The alignment is turned into VCF-style records (1-based position, REF, ALT): one SNV
+# per mismatching column, and insertions/deletions anchored on the preceding reference
+# base, normalized by shifting them left as far as the reference allows (but not across
+# another variant).
+
+from collections import namedtuple
+
+import numpy as np
+
+from .packed import to_codes
+
+Alignment = namedtuple("Alignment", ["score", "ref_start", "ref_end", "cigar"])
+
+_NEG = np.int32(-(1 << 29))
+_DIAG, _FROM_E, _FROM_F, _START = 0, 1, 2, 3
+_E_EXTEND, _F_EXTEND = 4, 8
+
+
+class Variant(namedtuple("Variant", ["pos", "ref", "alt"])):
+    """A VCF-style variant: 1-based position, REF and ALT alleles."""
+
+    __slots__ = ()
+
+    @property
+    def kind(self):
+        """"SNV", "INS" or "DEL"."""
+        if len(self.ref) == len(self.alt):
+            return "SNV"
+        return "INS" if len(self.alt) > len(self.ref) else "DEL"
+
+
+def _text(sequence):
+    return sequence if isinstance(sequence, str) else str(sequence)
+
+
+def align(ref, sample, mode="global", band=64, match=2, mismatch=-4, gap_open=6, gap_extend=1):
+    """
+    Banded affine-gap alignment of a sample against a reference.
+
+    :param ref: Reference sequence (str, Bio.Seq or PackedSequence).
+    :param sample: Sample sequence.
+    :param mode: "global" (end to end) or "semiglobal" (free reference ends).
+    :param band: Extra diagonals on each side of the diagonals joining the two ends; indels
+                 longer than this (net of the length difference) cannot be represented.
+    :param match: Score of an identical column.
+    :param mismatch: Score of a mismatching column (N always mismatches).
+    :param gap_open: Penalty of a gap's first base (must be >= gap_extend).
+    :param gap_extend: Penalty of every further gap base.
+    :return: Alignment(score, ref_start, ref_end, cigar): the aligned reference range
+             (0-based, half-open) and a CIGAR string of M/I/D operations.
+    """
+    if mode not in ("global", "semiglobal"):
+        raise ValueError(f"Unknown mode: {mode}")
+    if gap_open < gap_extend:
+        raise ValueError("gap_open must be at least gap_extend")
+    ref_codes = to_codes(ref).astype(np.int16)
+    # Sample bases outside A/C/G/T get a code that never equals a reference code
+    sample_codes = to_codes(sample).astype(np.int16)
+    ref_codes[ref_codes == 4] = -1
+    n, m = len(ref_codes), len(sample_codes)
+    semiglobal = mode == "semiglobal"
+
+    low = min(0, m - n) - band
+    high = max(0, m - n) + band
+    width = high - low + 1
+    offsets = np.arange(width)
+    extend_ramp = (offsets * gap_extend).astype(np.int32)
+    traceback = np.zeros((n + 1, width), dtype=np.uint8)
+    last_column = np.full(n + 1, _NEG, dtype=np.int32)   # H[i][m], for semiglobal ends
+
+    # Per-column tables indexed by i + c, i.e. by sample position j = i + low + c
+    columns = low + np.arange(n + width)
+    outside = (columns < 0) | (columns > m)
+    no_diagonal = outside | (columns < 1)
+    sample_before = np.full(len(columns), -2, dtype=np.int16)   # sample[j - 1], -2 outside
+    inside = ~no_diagonal
+    sample_before[inside] = sample_codes[columns[inside] - 1]
+    # Diagonal move scores for every reference base code (-1 = not A/C/G/T)
+    diagonal_scores = {code: np.where(sample_before == code, match, mismatch).astype(np.int32)
+                       for code in range(-1, 4)}
+
+    # Row 0: leading insertions
+    j = low + offsets
+    h = np.where(outside[:width], _NEG, -(gap_open + (j - 1) * gap_extend)).astype(np.int32)
+    h[j == 0] = 0
+    f = np.full(width, _NEG, dtype=np.int32)
+    traceback[0] = np.where(j >= 1, _FROM_E, _START) | np.where(j >= 2, _E_EXTEND, 0)
+    if 0 <= m - low < width:
+        last_column[0] = h[m - low]
+
+    up_h = np.full(width + 1, _NEG, dtype=np.int32)
+    up_f = np.full(width + 1, _NEG, dtype=np.int32)
+    e = np.full(width, _NEG, dtype=np.int32)
+    for i in range(1, n + 1):
+        invalid = outside[i:i + width]
+        # Vertical (deletion) moves come from column c + 1 of the previous row
+        up_h[:width] = h
+        up_f[:width] = f
+        f_open = up_h[1:] - gap_open
+        f_extend = up_f[1:] - gap_extend
+        f = np.maximum(f_open, f_extend)
+        f[invalid] = _NEG
+        # Diagonal moves come from the same column of the previous row
+        diagonal = h + diagonal_scores[int(ref_codes[i - 1])][i:i + width]
+        diagonal[no_diagonal[i:i + width]] = _NEG
+        h0 = np.maximum(diagonal, f)
+        first = -low - i   # column of j == 0
+        if semiglobal and 0 <= first < width:
+            h0[first] = 0   # free leading reference bases
+
+        # Horizontal (insertion) moves: running maximum over the cells to the left
+        running = np.maximum.accumulate(h0 + extend_ramp)
+        e[1:] = running[:-1] - (gap_open - gap_extend) - extend_ramp[1:]
+        e[invalid] = _NEG
+        h = np.maximum(h0, e)
+
+        from_f = f >= e
+        code = (diagonal < np.maximum(f, e)).astype(np.uint8) * (1 + from_f.astype(np.uint8))
+        code[1:] |= ((e[:-1] - gap_extend) >= (h[:-1] - gap_open)).astype(np.uint8) << 2
+        code |= (f_extend >= f_open).astype(np.uint8) << 3
+        if semiglobal and 0 <= first < width:
+            code[first] = _START
+        traceback[i] = code
+        if 0 <= m - i - low < width:
+            last_column[i] = h[m - i - low]
+
+    if semiglobal:
+        end = int(np.argmax(last_column))   # first row on ties
+    else:
+        end = n
+    score = int(last_column[end])
+    if score <= _NEG // 2:
+        raise ValueError("No alignment within the band; increase band")
+    ref_start, cigar = _trace(traceback, end, m, low, semiglobal)
+    return Alignment(score, ref_start, end, cigar)
+
+
+def _trace(traceback, i, j, low, semiglobal):
+    """Follow the traceback codes from (i, j) back to the start; returns (ref_start, cigar)."""
+    operations = []
+    state = _DIAG
+    while i > 0 or j > 0:
+        code = int(traceback[i, j - i - low])
+        if state == _DIAG:
+            source = code & 3
+            if source == _START:
+                break
+            if source != _DIAG:
+                state = source
+                continue
+            operations.append("M")
+            i -= 1
+            j -= 1
+        elif state == _FROM_E:
+            operations.append("I")
+            state = _FROM_E if code & _E_EXTEND else _DIAG
+            j -= 1
+        else:
+            operations.append("D")
+            state = _FROM_F if code & _F_EXTEND else _DIAG
+            i -= 1
+        if semiglobal and j == 0 and state == _DIAG:
+            break
+    operations.reverse()
+    cigar = []
+    for operation in operations:
+        if cigar and cigar[-1][1] == operation:
+            cigar[-1][0] += 1
+        else:
+            cigar.append([1, operation])
+    return i, "".join(f"{count}{operation}" for count, operation in cigar)
+
+
+def _parse_cigar(cigar):
+    number = ""
+    for character in cigar:
+        if character.isdigit():
+            number += character
+        else:
+            yield int(number), character
+            number = ""
+
+
+def _shift_left(ref, position, length, sequence, barrier):
+    """
+    Number of bases an indel at 0-based reference position can move left: while the base
+    before it is still unvaried (>= barrier) and equals the last base of the indel sequence.
+    """
+    shift = 0
+    while position - shift - 1 >= barrier and ref[position - shift - 1] == sequence[(length - 1 - shift) % length]:
+        shift += 1
+    return shift
+
+
+def alignment_variants(ref, sample, alignment):
+    """
+    Variant records of an alignment.
+
+    :return: List of Variant(pos, ref, alt) sorted by position: SNVs for mismatching
+             columns, and insertions/deletions shifted left as far as the reference allows
+             and anchored on the preceding reference base (or the following one at the start
+             of the alignment). Records whose reference spans would overlap (e.g. an SNV right
+             before an indel anchor) are merged into one record.
+    """
+    ref, sample = _text(ref), _text(sample)
+    spans = []   # (ref_start, ref_end, sample_start, sample_end), 0-based half-open
+
+    def emit(ref_start, ref_end, sample_start, sample_end):
+        if spans and ref_start < spans[-1][1]:
+            previous = spans.pop()
+            ref_start, sample_start = min(ref_start, previous[0]), min(sample_start, previous[2])
+            ref_end, sample_end = max(ref_end, previous[1]), max(sample_end, previous[3])
+        spans.append((ref_start, ref_end, sample_start, sample_end))
+
+    i, j = alignment.ref_start, 0
+    for length, operation in _parse_cigar(alignment.cigar):
+        if operation == "M":
+            for offset in range(length):
+                if ref[i + offset] != sample[j + offset]:
+                    emit(i + offset, i + offset + 1, j + offset, j + offset + 1)
+            i += length
+            j += length
+            continue
+        inserted = length if operation == "I" else 0
+        deleted = length if operation == "D" else 0
+        barrier = max(spans[-1][1] if spans else 0, alignment.ref_start)
+        indel = sample[j:j + length] if inserted else ref[i:i + length]
+        shift = _shift_left(ref, i, length, indel, barrier)
+        start, sample_start = i - shift, j - shift
+        if start > alignment.ref_start and sample_start > 0:
+            emit(start - 1, start + deleted, sample_start - 1, sample_start + inserted)
+        else:
+            emit(start, start + deleted + 1, sample_start, sample_start + inserted + 1)
+        i += deleted
+        j += inserted
+    return [Variant(start + 1, ref[start:end], sample[sample_start:sample_end])
+            for start, end, sample_start, sample_end in spans]
+
+
+def call_variants(ref, sample, **options):
+    """
+    Align a sample to a reference and return its normalized variant records.
+
+    :param options: Passed on to align (mode, band, scores).
+    :return: List of Variant(pos, ref, alt).
+    """
+    return alignment_variants(ref, sample, align(ref, sample, **options))
@@ -0,0 +1,213 @@
+# Approximate pattern matching (up to d mismatches) and frequent words with mismatches.
+#
+# Seed and verify:
+#   If a k-mer occurs with at most d mismatches, then splitting the pattern into d + 1
+#   disjoint seeds guarantees that at least one seed matches exactly (pigeonhole). So we
+#   look every seed up in an integer k-mer index of the genome (sorted 2-bit seed codes +
+#   positions), turn seed hits into candidate start positions, and verify each candidate
+#   with a packed-word Hamming distance: XOR of the 2-bit encodings, fold each 2-bit group
+#   into one bit, popcount.
+#
+# Frequent words with mismatches:
+#   Count every k-mer of the text once, then spread the counts over Hamming balls of
+#   radius d. For k <= DENSE_MAX_K this is done on the dense 4^k count array one position
+#   at a time (k * d vectorized passes, no neighborhood is ever enumerated); for larger k
+#   the distinct k-mers are expanded with precomputed XOR mismatch masks.
+
+import numpy as np
+
+from .kmers import KmerCounter, KmerHashTable, decode_kmer, encode_kmer, iter_kmer_codes
+from .neighbors import neighbor_masks
+from .packed import AMBIGUOUS, popcount, to_codes
+
+_LOW_BITS = np.uint64(0x5555555555555555)
+
+
+def packed_hamming(values, pattern_value):
+    """
+    Hamming distances between 2-bit encoded k-mers and one encoded pattern.
+
+    :param values: uint64 NumPy array of encoded k-mers.
+    :param pattern_value: Encoded pattern (int).
+    :return: NumPy array of distances.
+    """
+    diff = values ^ np.uint64(pattern_value)
+    return popcount((diff | (diff >> np.uint64(1))) & _LOW_BITS)
+
+
+class SeedIndex:
+    """
+    Integer index of all seed-length k-mers of a genome: sorted seed codes and their positions.
+    """
+
+    def __init__(self, genome, seed_length):
+        self.seed_length = seed_length
+        self.codes = to_codes(genome)
+        positions, values = [], []
+        for block_positions, block_values in iter_kmer_codes(self.codes, seed_length):
+            positions.append(block_positions)
+            values.append(block_values)
+        positions = np.concatenate(positions) if positions else np.zeros(0, dtype=np.int64)
+        values = np.concatenate(values) if values else np.zeros(0, dtype=np.uint64)
+        order = np.argsort(values, kind="stable")
+        self.values = values[order]
+        self.positions = positions[order]
+
+    def lookup(self, seed_value):
+        """Positions where the encoded seed occurs exactly."""
+        lo = np.searchsorted(self.values, np.uint64(seed_value), side="left")
+        hi = np.searchsorted(self.values, np.uint64(seed_value), side="right")
+        return self.positions[lo:hi]
+
+
+class ApproximateMatcher:
+    """
+    Find all occurrences of patterns with at most d mismatches in one genome.
+    The seed index is built once and reused for every pattern.
+
+    Usage:
+        matcher = ApproximateMatcher(genome, d=3, pattern_length=12)
+        matcher.find("ATTCTGGATTCA")     # sorted start positions
+        matcher.count("ATTCTGGATTCA")
+    """
+
+    def __init__(self, genome, d, pattern_length):
+        """
+        :param genome: str, bytes, Bio.Seq or PackedSequence.
+        :param d: Maximum number of mismatches.
+        :param pattern_length: Length of the patterns that will be queried; patterns of
+                               this length or longer can be searched.
+        """
+        if not 1 <= pattern_length <= 32:
+            raise ValueError("Patterns must be 1-32 bases long")
+        self.d = d
+        self.pattern_length = pattern_length
+        self.seed_length = pattern_length // (d + 1)
+        self.codes = to_codes(genome)
+        self._index = SeedIndex(self.codes, self.seed_length) if self.seed_length > 0 else None
+
+    def _candidates(self, pattern):
+        k = len(pattern)
+        n_starts = len(self.codes) - k + 1
+        if n_starts <= 0:
+            return np.zeros(0, dtype=np.int64)
+        if self._index is None:
+            # Fewer bases than d + 1: every position is a candidate
+            return np.arange(n_starts)
+        s = self.seed_length
+        hits = []
+        for seed in range(self.d + 1):
+            offset = seed * s
+            hits.append(self._index.lookup(encode_kmer(pattern[offset:offset + s])) - offset)
+        candidates = np.unique(np.concatenate(hits))
+        return candidates[(candidates >= 0) & (candidates < n_starts)]
+
+    def _distances(self, pattern, starts):
+        k = len(pattern)
+        pattern_codes = to_codes(pattern)
+        window = self.codes[starts[:, None] + np.arange(k)]
+        ambiguous = window == AMBIGUOUS
+        if ambiguous.any():
+            # An N always counts as a mismatch: encode it as the pattern base and add it back
+            window = np.where(ambiguous, pattern_codes, window)
+        values = np.zeros(len(starts), dtype=np.uint64)
+        for offset in range(k):
+            values <<= np.uint64(2)
+            values |= window[:, offset]
+        return packed_hamming(values, encode_kmer(pattern)) + ambiguous.sum(axis=1)
+
+    def find(self, pattern):
+        """
+        Start positions where pattern occurs with at most d mismatches.
+
+        :return: Sorted list of 0-based positions.
+        """
+        pattern = str(pattern).upper()
+        if len(pattern) < self.pattern_length or len(pattern) > 32:
+            raise ValueError(f"Pattern length must be between {self.pattern_length} and 32")
+        starts = self._candidates(pattern)
+        if len(starts) == 0:
+            return []
+        return starts[self._distances(pattern, starts) <= self.d].tolist()
+
+    def count(self, pattern):
+        """Number of positions where pattern occurs with at most d mismatches."""
+        return len(self.find(pattern))
+
+
+def approximate_pattern_matching(pattern, genome, d):
+    """
+    All starting positions where pattern appears in genome with at most d mismatches.
+
+    :return: Sorted list of 0-based positions.
+    """
+    return ApproximateMatcher(genome, d, len(pattern)).find(pattern)
+
+
+def approximate_pattern_count(pattern, genome, d):
+    """Number of occurrences of pattern in genome with at most d mismatches."""
+    return len(approximate_pattern_matching(pattern, genome, d))
+
+
+def reverse_complement_codes(values, k):
+    """Reverse complements of 2-bit encoded k-mers."""
+    values = np.asarray(values, dtype=np.uint64)
+    result = np.zeros(len(values), dtype=np.uint64)
+    for position in range(k):
+        result <<= np.uint64(2)
+        result |= np.uint64(3) - ((values >> np.uint64(2 * position)) & np.uint64(3))
+    return result
+
+
+def _ball_counts_dense(counts, k, d):
+    """Spread a dense 4^k count array over Hamming balls of radius d."""
+    layers = [counts.astype(np.int64)] + [np.zeros(4 ** k, dtype=np.int64) for _ in range(min(d, k))]
+    for position in range(k):
+        # Axis 1 of this view is the 2-bit code at `position` (counted from the right)
+        shape = (4 ** (k - 1 - position), 4, 4 ** position)
+        for j in range(len(layers) - 1, 0, -1):
+            previous = layers[j - 1].reshape(shape)
+            # Sum over the 3 other bases at this position = column total - own value
+            layers[j] += (previous.sum(axis=1, keepdims=True) - previous).reshape(-1)
+    return sum(layers)
+
+
+def frequent_words_with_mismatches(text, k, d, reverse_complements=False):
+    """
+    Most frequent k-mers with up to d mismatches (optionally counting reverse complements too).
+
+    :param text: str, bytes, Bio.Seq or PackedSequence.
+    :param k: k-mer length.
+    :param d: Maximum number of mismatches.
+    :param reverse_complements: Count Count_d(Text, Pattern) + Count_d(Text, rc(Pattern)).
+    :return: Tuple (kmers, count) with kmers in lexicographic order.
+    """
+    counter = KmerCounter(k).add(text)
+    keys, counts = counter.items()
+    if len(keys) == 0:
+        return [], 0
+
+    if counter.dense:
+        dense = np.zeros(4 ** k, dtype=np.int64)
+        dense[keys.astype(np.int64)] = counts
+        totals = _ball_counts_dense(dense, k, d)
+        if reverse_complements:
+            totals = totals + totals[reverse_complement_codes(np.arange(4 ** k), k).astype(np.int64)]
+        best = totals.max()
+        return [decode_kmer(value, k) for value in np.flatnonzero(totals == best)], int(best)
+
+    masks = neighbor_masks(k, d).masks
+    table = KmerHashTable(capacity=len(keys) * 4)
+    block = max(1, (1 << 22) // len(masks))
+    for start in range(0, len(keys), block):
+        neighbors = (keys[start:start + block, None] ^ masks[None, :]).reshape(-1)
+        table.add(neighbors, np.repeat(counts[start:start + block], len(masks)))
+    candidates, totals = table.items()
+    totals = totals.astype(np.int64)
+    if reverse_complements:
+        # A pattern can score through its reverse complement alone, so consider both
+        candidates = np.union1d(candidates, reverse_complement_codes(candidates, k))
+        totals = (table.get(candidates).astype(np.int64)
+                  + table.get(reverse_complement_codes(candidates, k)).astype(np.int64))
+    best = totals.max()
+    return sorted(decode_kmer(value, k) for value in candidates[totals == best]), int(best)
@@ -0,0 +1,335 @@
+# Reproducible benchmarks of the genomics algorithms, with regression checks.
+#
+# Inputs are synthetic and fully determined by their size and seed:
+#   - synthetic_genome: uniform random bases from NumPy's PCG64 generator,
+#   - planted_motif_set: t random sequences, each with one copy of a random k-mer planted
+#     at a random position with a fixed number of point mutations (the classic planted
+#     (k, d)-motif problem that the motif searches of scripts 11-15 solve).
+# Sizes are given as bases ("1kb" ... "100Mb"); a motif set of a given size holds that
+# many bases in total. Benchmarks whose algorithm cannot reasonably run at a size (the
+# Python-level loops of clump finding and peptide scanning, the motif searches) declare
+# a maximum size and are skipped above it.
+#
+# Every benchmark is timed like timeit: the call is repeated until MIN_TIME has elapsed,
+# the best of `repeat` such rounds gives the seconds per call and the throughput in the
+# benchmark's own unit (bases/s, k-mers/s, iterations/s, ...). Peak memory is measured
+# in one separate call under tracemalloc, which also sees NumPy's array allocations; it
+# is the peak above what was allocated before the call, so the input itself is excluded.
+#
+# Results are written as JSON and can be compared with a stored baseline run: a
+# benchmark regresses when its throughput falls, or its peak memory grows, by more than
+# the threshold (a fraction of the baseline value).
+
+import json
+import platform
+import re
+import time
+import tracemalloc
+from collections import namedtuple
+
+import numpy as np
+
+MIN_TIME = 0.2          # seconds per timing round
+DEFAULT_SIZES = ("1kb", "100kb", "1Mb")
+THRESHOLD = 0.25        # allowed relative loss of throughput / growth of peak memory
+
+Benchmark = namedtuple("Benchmark", ["name", "input", "unit", "max_size", "prepare"])
+Regression = namedtuple("Regression", ["benchmark", "metric", "baseline", "current", "change"])
+
+_SIZE_UNITS = {"": 1, "b": 1, "kb": 10 ** 3, "mb": 10 ** 6, "gb": 10 ** 9}
+_BASES = np.frombuffer(b"ACGT", dtype=np.uint8)
+
+MOTIFS = ["TGT", "GATA", "ACGTAC", "TTGACA", "TATAAT", "GGATCC"]
+PEPTIDES = ["MKV", "PRTEIN", "WHW", "DNAK"]
+MOTIF_K = 8
+PLANTED_MUTATIONS = 2
+PLANTED_SEQUENCES = 20
+
+
+def parse_size(size):
+    """
+    Number of bases in a size such as 1000, "1kb", "2.5Mb" (decimal units).
+    """
+    if isinstance(size, int):
+        return size
+    match = re.fullmatch(r"\s*([0-9.]+)\s*([kmg]?b?)\s*", str(size).lower())
+    if match is None:
+        raise ValueError(f"Invalid size {size!r}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2)])
+
+
+def format_size(bases):
+    """Shortest decimal label of a size, e.g. 1000000 -> "1Mb"."""
+    for unit, scale in (("Gb", 10 ** 9), ("Mb", 10 ** 6), ("kb", 10 ** 3)):
+        if bases >= scale and bases % scale == 0:
+            return f"{bases // scale}{unit}"
+    return f"{bases}b"
+
+
+def synthetic_genome(length, seed=0):
+    """
+    Deterministic random genome.
+
+    :param length: Number of bases.
+    :param seed: Seed of the generator; the same (length, seed) always gives the same genome.
+    :return: Upper-case str of A, C, G, T.
+    """
+    rng = np.random.default_rng([seed, length])
+    return _BASES[rng.integers(0, 4, length, dtype=np.uint8)].tobytes().decode("ascii")
+
+
+def planted_motif_set(total_length, k=MOTIF_K, t=PLANTED_SEQUENCES, mutations=PLANTED_MUTATIONS, seed=0):
+    """
+    Deterministic planted-motif sequence set.
+
+    :param total_length: Total number of bases over all sequences.
+    :param k: Length of the planted motif.
+    :param t: Number of sequences.
+    :param mutations: Point mutations applied to each planted copy.
+    :return: (sequences, motif): list of t upper-case strings of equal length and the motif.
+    """
+    length = max(total_length // t, 2 * k)
+    rng = np.random.default_rng([seed, total_length, k, t, mutations])
+    codes = rng.integers(0, 4, (t, length), dtype=np.uint8)
+    motif = rng.integers(0, 4, k, dtype=np.uint8)
+    for row in codes:
+        copy = motif.copy()
+        where = rng.choice(k, mutations, replace=False)
+        copy[where] = (copy[where] + rng.integers(1, 4, mutations, dtype=np.uint8)) % 4
+        start = rng.integers(0, length - k + 1)
+        row[start:start + k] = copy
+    sequences = [_BASES[row].tobytes().decode("ascii") for row in codes]
+    return sequences, _BASES[motif].tobytes().decode("ascii")
+
+
+# ----------------------------------------------------------------------
+# Benchmarks: prepare(input) does the untimed setup and returns (function, units), where
+# function() runs the algorithm once and units is the work it does per call, or a
+# callable that reads the work off function's result (e.g. iterations actually run).
+# ----------------------------------------------------------------------
+
+def _count_motifs(genome):
+    from .aho_corasick import MotifScanner
+    scanner = MotifScanner(MOTIFS)
+    return lambda: scanner.count(genome), len(genome)
+
+
+def _find_motifs(genome):
+    from .aho_corasick import MotifScanner
+    scanner = MotifScanner(MOTIFS, both_strands=True)
+    return lambda: scanner.find(genome), len(genome)
+
+
+def _count_kmers(genome, k=11):
+    from .kmers import KmerCounter
+    return lambda: KmerCounter(k).add(genome).most_frequent_kmers(), max(len(genome) - k + 1, 0)
+
+
+def _gc_skew(genome):
+    from .skew import gc_skew
+    return lambda: gc_skew(genome), len(genome)
+
+
+def _clumps(genome):
+    from .clumps import find_clumps
+    return lambda: find_clumps(genome, 9, 500, 3), len(genome)
+
+
+def _reverse_complement(genome):
+    from .strand import ReverseComplement
+    return lambda: str(ReverseComplement(genome)), len(genome)
+
+
+def _translate(genome):
+    from .translation import translate
+    return lambda: translate(genome), len(genome)
+
+
+def _orfs(genome):
+    from .translation import find_orfs
+    return lambda: find_orfs(genome), len(genome)
+
+
+def _peptides(genome):
+    from .peptides import PeptideScanner
+    scanner = PeptideScanner(PEPTIDES)
+    return lambda: scanner.find(genome), len(genome)
+
+
+def _approximate_matches(genome):
+    from .approximate import ApproximateMatcher
+    pattern = genome[len(genome) // 2:len(genome) // 2 + 12]
+    return lambda: ApproximateMatcher(genome, 2, 12).find(pattern), len(genome)
+
+
+def _pwm_scan(genome):
+    from .pwm import PWM, PWMScanner
+    profiles = np.random.default_rng(0).dirichlet(np.full(4, 0.5), size=(16, 12))   # 16 PWMs of width 12
+    scanner = PWMScanner([PWM(profile.T, name=str(index)) for index, profile in enumerate(profiles)])
+    return lambda: scanner.find(genome), len(genome)
+
+
+def _fm_index(genome):
+    from .fm_index import FMIndex
+    step = max(len(genome) // 100, 1)
+    queries = [genome[start:start + 20] for start in range(0, max(len(genome) - 20, 1), step)]
+    return lambda: FMIndex.build(genome).count_many(queries), len(genome)
+
+
+def _median_string(motif_set):
+    from .median import median_string
+    sequences, _ = motif_set
+    # Units: candidate patterns of the 4^k search space
+    return lambda: median_string(sequences, MOTIF_K, processes=1), 4 ** MOTIF_K
+
+
+def _gibbs_search(motif_set):
+    from .gibbs import gibbs_search
+    sequences, _ = motif_set
+    return (lambda: gibbs_search(sequences, MOTIF_K, n_iterations=200, n_chains=4, seed=0, processes=1),
+            lambda result: result.iterations)
+
+
+def _randomized_motif_search(motif_set):
+    from .randomized import randomized_motif_search
+    sequences, _ = motif_set
+    return (lambda: randomized_motif_search(sequences, MOTIF_K, restarts=200, seed=0),
+            lambda result: result.iterations)
+
+
+def _em_search(motif_set):
+    from .em import em_search
+    sequences, _ = motif_set
+    # Units: EM starts run to convergence
+    return lambda: em_search(sequences, MOTIF_K, starts=4, seed=0, processes=1), 4
+
+
+BENCHMARKS = {benchmark.name: benchmark for benchmark in [
+    Benchmark("count_motifs", "genome", "bases", None, _count_motifs),
+    Benchmark("find_motifs", "genome", "bases", None, _find_motifs),
+    Benchmark("count_kmers", "genome", "k-mers", None, _count_kmers),
+    Benchmark("gc_skew", "genome", "bases", None, _gc_skew),
+    Benchmark("reverse_complement", "genome", "bases", None, _reverse_complement),
+    Benchmark("translate", "genome", "bases", None, _translate),
+    Benchmark("orfs", "genome", "bases", None, _orfs),
+    Benchmark("approximate_matches", "genome", "bases", parse_size("10Mb"), _approximate_matches),
+    Benchmark("pwm_scan", "genome", "bases", parse_size("10Mb"), _pwm_scan),
+    Benchmark("clumps", "genome", "bases", parse_size("10Mb"), _clumps),
+    Benchmark("peptides", "genome", "bases", parse_size("1Mb"), _peptides),
+    Benchmark("fm_index", "genome", "bases", parse_size("1Mb"), _fm_index),
+    Benchmark("median_string", "motif_set", "patterns", parse_size("10kb"), _median_string),
+    Benchmark("gibbs_search", "motif_set", "iterations", parse_size("100kb"), _gibbs_search),
+    Benchmark("randomized_motif_search", "motif_set", "iterations", parse_size("100kb"), _randomized_motif_search),
+    Benchmark("em_search", "motif_set", "starts", parse_size("100kb"), _em_search),
+]}
+
+
+def time_call(function, repeat=3, min_time=MIN_TIME):
+    """
+    Best seconds per call of function(), timeit style.
+
+    :return: (seconds per call, value returned by the last call).
+    """
+    best = float("inf")
+    value = None
+    for _ in range(repeat):
+        calls = 0
+        started = time.perf_counter()
+        while True:
+            value = function()
+            calls += 1
+            elapsed = time.perf_counter() - started
+            if elapsed >= min_time:
+                break
+        best = min(best, elapsed / calls)
+    return best, value
+
+
+def peak_memory(function):
+    """Peak bytes allocated (Python objects and NumPy arrays) during one call of function()."""
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return max(peak - before, 0)
+
+
+def run_benchmarks(names=None, sizes=DEFAULT_SIZES, seed=0, repeat=3, min_time=MIN_TIME, progress=None):
+    """
+    Run benchmarks on synthetic inputs.
+
+    :param names: Benchmark names (keys of BENCHMARKS); None runs all of them.
+    :param sizes: Input sizes in bases or as labels ("1kb", "100Mb", ...).
+    :param seed: Seed of the synthetic inputs.
+    :param repeat: Timing rounds per benchmark (the best one is kept).
+    :param min_time: Minimum seconds per timing round.
+    :param progress: Optional callable receiving each result as it is measured.
+    :return: Dictionary with the "environment" of the run and its "results", keyed by
+             "name@size": size, unit, seconds per call, throughput (units/s) and peak_bytes.
+    """
+    names = list(BENCHMARKS) if names is None else list(names)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {', '.join(unknown)}")
+    results = {}
+    for size in sorted(parse_size(size) for size in sizes):
+        inputs = {}
+        for name in names:
+            benchmark = BENCHMARKS[name]
+            if benchmark.max_size is not None and size > benchmark.max_size:
+                continue
+            if benchmark.input not in inputs:
+                inputs[benchmark.input] = (synthetic_genome(size, seed) if benchmark.input == "genome"
+                                           else planted_motif_set(size, seed=seed))
+            run, units = benchmark.prepare(inputs[benchmark.input])
+            seconds, value = time_call(run, repeat, min_time)
+            if callable(units):
+                units = units(value)
+            result = {"benchmark": name, "size": size, "unit": benchmark.unit, "seconds": seconds,
+                      "throughput": units / seconds, "peak_bytes": peak_memory(run)}
+            results[f"{name}@{format_size(size)}"] = result
+            if progress is not None:
+                progress(result)
+    environment = {"python": platform.python_version(), "numpy": np.__version__,
+                   "machine": platform.machine(), "system": platform.system(), "seed": seed,
+                   "repeat": repeat, "min_time": min_time}
+    return {"environment": environment, "results": results}
+
+
+def compare(report, baseline, threshold=THRESHOLD):
+    """
+    Regressions of a run against a baseline run (benchmarks missing from either are ignored).
+
+    :param report: Result of run_benchmarks (or its JSON).
+    :param baseline: Earlier result to compare with.
+    :param threshold: Allowed fraction of throughput loss and of peak-memory growth.
+    :return: List of Regression(benchmark, metric, baseline, current, change), change being
+             the relative difference to the baseline value.
+    """
+    regressions = []
+    for key, current in report["results"].items():
+        previous = baseline["results"].get(key)
+        if previous is None:
+            continue
+        if current["throughput"] < previous["throughput"] * (1 - threshold):
+            change = current["throughput"] / previous["throughput"] - 1
+            regressions.append(Regression(key, "throughput", previous["throughput"], current["throughput"], change))
+        if previous["peak_bytes"] and current["peak_bytes"] > previous["peak_bytes"] * (1 + threshold):
+            change = current["peak_bytes"] / previous["peak_bytes"] - 1
+            regressions.append(Regression(key, "peak_bytes", previous["peak_bytes"], current["peak_bytes"], change))
+    return regressions
+
+
+def save_report(report, path):
+    with open(path, "w") as handle:
+        json.dump(report, handle, indent=2)
+        handle.write("\n")
+
+
+def load_report(path):
+    with open(path) as handle:
+        return json.load(handle)
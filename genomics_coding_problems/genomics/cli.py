@@ -0,0 +1,363 @@
+# Batch command line interface: run many jobs through the genomics algorithms in one process.
+#
+#   python -m genomics run manifest.json [-o results.jsonl]
+#   python -m genomics tasks
+#   python -m genomics startup [--runs 5] [--budget 0.05]
+#   python -m genomics bench [--sizes 1kb 1Mb] [-o run.json] [--baseline baseline.json]
+#
+# A manifest is a JSON list of jobs (or {"jobs": [...]}). Each job names a task, its
+# input and its parameters:
+#
+#   {"name": "ori", "task": "skew", "fasta": "genome.fa", "records": ["chr1"]}
+#   {"task": "count_motifs", "sequence": "ACTGTACGAT", "params": {"motifs": ["TGT", "GAT"]}}
+#   {"task": "median_string", "sequences": ["AAATTGAC...", "..."], "params": {"k": 8}}
+#
+# Input is an inline "sequence", an inline list of "sequences", or a "fasta" path (all
+# records, or only "records"; relative to the manifest's folder). Per-sequence tasks run
+# once per record, sequence-set tasks (motif discovery, variant calling) once on all of
+# them. Every result is written as one JSON line; a failing job is reported with its
+# error and the run goes on.
+#
+# Start-up cost matters when a pipeline forks one interpreter per job, so this module and
+# the package only import the standard library up front: NumPy, the algorithm modules and
+# multiprocessing are imported by the first job that needs them and then stay warm for the
+# rest of the manifest. `startup` measures the cold-start overhead of the CLI against a bare
+# interpreter and fails when it exceeds the budget. `bench` runs the benchmark suite of
+# genomics/benchmark.py and fails when a benchmark regresses against a stored baseline.
+
+import argparse
+import json
+import os
+import sys
+import time
+
+STARTUP_BUDGET = 0.05   # seconds of import overhead on top of a bare interpreter
+
+
+def _count_motifs(sequence, motifs, both_strands=False):
+    from .aho_corasick import MotifScanner
+    return MotifScanner(motifs, both_strands).count(sequence)
+
+
+def _find_motifs(sequence, motifs, both_strands=False):
+    from .aho_corasick import MotifScanner
+    return MotifScanner(motifs, both_strands).find(sequence)
+
+
+def _approximate_matches(sequence, pattern, d):
+    from .approximate import approximate_pattern_matching
+    return approximate_pattern_matching(pattern, sequence, d)
+
+
+def _frequent_kmers(sequence, k):
+    from .kmers import KmerCounter
+    kmers, count = KmerCounter(k).add(sequence).most_frequent_kmers()
+    return {"kmers": kmers, "count": count}
+
+
+def _frequent_words_with_mismatches(sequence, k, d, reverse_complements=False):
+    from .approximate import frequent_words_with_mismatches
+    kmers, count = frequent_words_with_mismatches(sequence, k, d, reverse_complements)
+    return {"kmers": kmers, "count": count}
+
+
+def _skew(sequence, track_step=None):
+    from .skew import gc_skew
+    return gc_skew(sequence, track_step=track_step)
+
+
+def _clumps(sequence, k, window, min_count, skew_flank=None):
+    from .clumps import find_clumps
+    return find_clumps(sequence, k, window, min_count, skew_flank=skew_flank)
+
+
+def _reverse_complement(sequence):
+    from .strand import ReverseComplement
+    return str(ReverseComplement(sequence))
+
+
+def _translate(sequence, frame=0, rna=None):
+    from .translation import translate
+    return translate(sequence, frame=frame, rna=rna)
+
+
+def _orfs(sequence, min_length=30, both_strands=True):
+    from .translation import find_orfs
+    return find_orfs(sequence, min_length=min_length, both_strands=both_strands)
+
+
+def _peptides(sequence, peptides, both_strands=True, rna=None):
+    from .peptides import PeptideScanner
+    return PeptideScanner(peptides, both_strands=both_strands).find(sequence, rna)
+
+
+def _consensus(sequence, pattern, both_strands=False):
+    from .consensus import DegenerateConsensus
+    return DegenerateConsensus.from_iupac(pattern).find(sequence, both_strands)
+
+
+def _pwm_scan(sequence, profiles, p_value=1e-4, both_strands=True):
+    from .pwm import PWM, PWMScanner
+    scanner = PWMScanner([PWM(profile, name=name) for name, profile in profiles.items()],
+                         p_value=p_value, both_strands=both_strands)
+    names = list(profiles)
+    return [{"pwm": names[pwm], "start": start, "strand": strand.decode(), "score": score}
+            for pwm, start, strand, score in scanner.find(sequence).tolist()]
+
+
+def _median_string(sequences, k):
+    from .median import median_string
+    return median_string(sequences, k)
+
+
+def _gibbs_search(sequences, k, **options):
+    from .gibbs import gibbs_search
+    return gibbs_search(sequences, k, **options)
+
+
+def _randomized_motif_search(sequences, k, **options):
+    from .randomized import randomized_motif_search
+    return randomized_motif_search(sequences, k, **options)
+
+
+def _em_search(sequences, k, **options):
+    from .em import em_search
+    return em_search(sequences, k, **options)
+
+
+def _call_variants(sequences, **options):
+    from .align import call_variants
+    if len(sequences) != 2:
+        raise ValueError("call_variants needs exactly two sequences: reference and sample")
+    return call_variants(sequences[0], sequences[1], **options)
+
+
+# Task name -> (input kind, runner); "sequence" runs per record, "set" on all sequences
+TASKS = {
+    "count_motifs": ("sequence", _count_motifs),
+    "find_motifs": ("sequence", _find_motifs),
+    "approximate_matches": ("sequence", _approximate_matches),
+    "frequent_kmers": ("sequence", _frequent_kmers),
+    "frequent_words_with_mismatches": ("sequence", _frequent_words_with_mismatches),
+    "skew": ("sequence", _skew),
+    "clumps": ("sequence", _clumps),
+    "reverse_complement": ("sequence", _reverse_complement),
+    "translate": ("sequence", _translate),
+    "orfs": ("sequence", _orfs),
+    "peptides": ("sequence", _peptides),
+    "consensus": ("sequence", _consensus),
+    "pwm_scan": ("sequence", _pwm_scan),
+    "median_string": ("set", _median_string),
+    "gibbs_search": ("set", _gibbs_search),
+    "randomized_motif_search": ("set", _randomized_motif_search),
+    "em_search": ("set", _em_search),
+    "call_variants": ("set", _call_variants),
+}
+
+
+def _plain(value):
+    """Convert a result into JSON-serializable values (namedtuples become objects)."""
+    if hasattr(value, "_asdict"):
+        return {key: _plain(item) for key, item in value._asdict().items()}
+    if isinstance(value, dict):
+        return {str(key): _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    if isinstance(value, bytes):
+        return value.decode("ascii")
+    if hasattr(value, "tolist"):   # NumPy arrays and scalars
+        return _plain(value.tolist())
+    return value
+
+
+def load_manifest(path):
+    """
+    Read a job manifest.
+
+    :param path: JSON file holding a list of jobs or {"jobs": [...]}; "-" reads standard input.
+    :return: List of job dictionaries.
+    """
+    if path == "-":
+        manifest = json.load(sys.stdin)
+    else:
+        with open(path) as handle:
+            manifest = json.load(handle)
+    jobs = manifest.get("jobs") if isinstance(manifest, dict) else manifest
+    if not isinstance(jobs, list):
+        raise ValueError('A manifest must be a list of jobs or {"jobs": [...]}')
+    for index, job in enumerate(jobs):
+        if not isinstance(job, dict):
+            raise ValueError(f"Job {index}: expected an object, got {type(job).__name__}")
+        if job.get("task") not in TASKS:
+            raise ValueError(f"Job {index}: unknown task {job.get('task')!r}")
+    return jobs
+
+
+class _Inputs:
+    """Open FASTA files shared by every job of a run."""
+
+    def __init__(self, base_dir=None):
+        self.base_dir = base_dir
+        self._fastas = {}
+
+    def records(self, job):
+        """(record name, sequence) pairs of a job's input."""
+        if "sequence" in job:
+            return [(job.get("record", "sequence"), job["sequence"])]
+        if "sequences" in job:
+            return [(str(index), sequence) for index, sequence in enumerate(job["sequences"])]
+        if "fasta" in job:
+            # Relative to the manifest's folder; absolute paths stay as they are
+            path = os.path.join(self.base_dir or os.curdir, job["fasta"])
+            if path not in self._fastas:
+                from .fastx import IndexedFasta
+                self._fastas[path] = IndexedFasta(path)
+            fasta = self._fastas[path]
+            return [(name, fasta.fetch(name)) for name in job.get("records") or fasta.references]
+        raise ValueError("A job needs a 'sequence', 'sequences' or 'fasta' input")
+
+    def close(self):
+        for fasta in self._fastas.values():
+            fasta.close()
+        self._fastas.clear()
+
+
+def run_jobs(jobs, output, base_dir=None):
+    """
+    Run jobs in this process and write one JSON line per result.
+
+    :param jobs: List of job dictionaries (see load_manifest).
+    :param output: Open text handle for the JSON lines.
+    :param base_dir: Folder that relative "fasta" paths are resolved against (the manifest's
+                     folder); None uses the current directory.
+    :return: Number of failed jobs.
+    """
+    inputs = _Inputs(base_dir)
+    failed = 0
+    try:
+        for index, job in enumerate(jobs):
+            name = job.get("name", index)
+            kind, runner = TASKS[job["task"]]
+            params = job.get("params", {})
+            started = time.perf_counter()
+            try:
+                records = inputs.records(job)
+                if kind == "set":
+                    results = [(None, runner([sequence for _, sequence in records], **params))]
+                else:
+                    results = [(record, runner(sequence, **params)) for record, sequence in records]
+            except Exception as error:   # report and go on with the next job
+                failed += 1
+                line = {"job": name, "task": job["task"], "error": f"{type(error).__name__}: {error}"}
+                output.write(json.dumps(line) + "\n")
+                continue
+            seconds = round(time.perf_counter() - started, 6)
+            for record, result in results:
+                line = {"job": name, "task": job["task"]}
+                if record is not None:
+                    line["record"] = record
+                line["result"] = _plain(result)
+                line["seconds"] = seconds
+                output.write(json.dumps(line) + "\n")
+            output.flush()
+    finally:
+        inputs.close()
+    return failed
+
+
+def measure_startup(runs=5):
+    """
+    Cold-start time of the CLI, measured in fresh interpreters.
+
+    :param runs: Number of timed launches of each command (the median is reported).
+    :return: Dictionary with the median seconds of a bare interpreter ("python"), of
+             launching the CLI ("cli") and their difference ("overhead").
+    """
+    import subprocess
+
+    package_parent = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    def median_time(arguments):
+        times = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            subprocess.run([sys.executable] + arguments, cwd=package_parent, check=True,
+                           stdout=subprocess.DEVNULL)
+            times.append(time.perf_counter() - started)
+        return sorted(times)[len(times) // 2]
+
+    python = median_time(["-c", "pass"])
+    cli = median_time(["-m", "genomics", "tasks"])
+    return {"python": python, "cli": cli, "overhead": cli - python}
+
+
+def bench_command(args):
+    from . import benchmark
+
+    def progress(result):
+        print(f"{result['benchmark']:<24} {benchmark.format_size(result['size']):>6} "
+              f"{result['throughput']:>14.4g} {result['unit']}/s {result['peak_bytes'] / 2 ** 20:>10.2f} MiB",
+              flush=True)
+
+    report = benchmark.run_benchmarks(args.only, args.sizes or benchmark.DEFAULT_SIZES, args.seed,
+                                      args.repeat, progress=progress)
+    if args.output:
+        benchmark.save_report(report, args.output)
+    if not args.baseline:
+        return 0
+    threshold = benchmark.THRESHOLD if args.threshold is None else args.threshold
+    regressions = benchmark.compare(report, benchmark.load_report(args.baseline), threshold)
+    for regression in regressions:
+        print(f"Regression in {regression.benchmark}: {regression.metric} {regression.baseline:.4g} -> "
+              f"{regression.current:.4g} ({regression.change:+.1%})", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m genomics",
+                                     description="Run genomics algorithms in batch from a job manifest.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="run every job of a manifest")
+    run.add_argument("manifest", help="JSON job manifest ('-' for standard input)")
+    run.add_argument("-o", "--output", help="write JSON lines here instead of standard output")
+    commands.add_parser("tasks", help="list the available tasks")
+    startup = commands.add_parser("startup", help="measure the cold-start time of the CLI")
+    startup.add_argument("--runs", type=int, default=5)
+    startup.add_argument("--budget", type=float, default=STARTUP_BUDGET,
+                         help="maximum overhead over a bare interpreter, in seconds")
+    bench = commands.add_parser("bench", help="benchmark the algorithms on synthetic inputs")
+    bench.add_argument("--sizes", nargs="+", help="input sizes, e.g. 1kb 100kb 1Mb 100Mb")
+    bench.add_argument("--only", nargs="+", metavar="BENCHMARK", help="run only these benchmarks")
+    bench.add_argument("--seed", type=int, default=0)
+    bench.add_argument("--repeat", type=int, default=3)
+    bench.add_argument("-o", "--output", help="write the results as JSON (e.g. to store a baseline)")
+    bench.add_argument("--baseline", help="JSON results of an earlier run to compare with")
+    bench.add_argument("--threshold", type=float, help="allowed relative regression (default 0.25)")
+    args = parser.parse_args(argv)
+
+    if args.command == "tasks":
+        for name, (kind, _) in TASKS.items():
+            print(f"{name}\t{kind}")
+        return 0
+    if args.command == "startup":
+        timing = measure_startup(args.runs)
+        print(json.dumps({key: round(value, 4) for key, value in timing.items()}))
+        if timing["overhead"] > args.budget:
+            print(f"Start-up overhead {timing['overhead']:.3f} s exceeds the budget of {args.budget:.3f} s",
+                  file=sys.stderr)
+            return 1
+        return 0
+    if args.command == "bench":
+        return bench_command(args)
+
+    try:
+        jobs = load_manifest(args.manifest)
+    except (OSError, ValueError) as error:   # unreadable manifest, bad JSON or job list, unknown task
+        parser.error(f"{args.manifest}: {error}")
+    base_dir = None if args.manifest == "-" else os.path.dirname(os.path.abspath(args.manifest))
+    if args.output:
+        with open(args.output, "w") as output:
+            failed = run_jobs(jobs, output, base_dir)
+    else:
+        failed = run_jobs(jobs, sys.stdout, base_dir)
+    return 1 if failed else 0
@@ -0,0 +1,82 @@
+# (L, t)-clump finding with incremental sliding-window k-mer counts.
+#
+# A k-mer forms an (L, t)-clump if it occurs at least t times inside some window of
+# length L (a hint of a replication origin, ori, when the window sits near the minimum
+# of the GC skew). Recounting every window costs O(genome x L). Instead:
+#   - every k-mer is encoded once as a 2-bit integer (iter_kmer_codes), and the distinct
+#     codes are renumbered 0..n-1 so the counters are one flat list whatever k is,
+#   - the window slides one base at a time: the k-mer leaving on the left is decremented
+#     and the k-mer entering on the right is incremented; nothing else changes, and only
+#     the entering k-mer can reach t, so it is the only one checked.
+# Windows may be restricted to a region, e.g. a few kilobases around the skew minimum.
+# k-mers containing a base other than A/C/G/T are skipped.
+
+from collections import namedtuple
+
+import numpy as np
+
+from .kmers import decode_kmer, rolling_kmer_codes
+from .skew import gc_skew
+
+ClumpResult = namedtuple("ClumpResult", ["kmers", "start", "end"])
+
+
+def skew_minimum_region(sequence, flank):
+    """
+    Region of flank bases on each side of the first GC skew minimum.
+
+    :return: Tuple (start, end), 0-based and half-open, clipped to the sequence.
+    """
+    result = gc_skew(sequence)
+    if not result.min_positions:
+        return 0, 0
+    # Skew position i is the skew after i bases, i.e. between bases i - 1 and i (0-based)
+    center = result.min_positions[0]
+    return max(0, center - flank), min(result.length, center + flank)
+
+
+def find_clumps(sequence, k, window, min_count, start=0, end=None, skew_flank=None):
+    """
+    Every k-mer that occurs at least min_count times in some window of length `window`.
+
+    :param sequence: str, bytes, Bio.Seq or PackedSequence.
+    :param k: k-mer length (1-32).
+    :param window: Window length L (at least k).
+    :param min_count: Number of occurrences t that makes a clump.
+    :param start: First base of the region searched (0-based).
+    :param end: One past the last base of the region; None means the end of the sequence.
+    :param skew_flank: If set, search only skew_flank bases on each side of the skew minimum
+                       (overrides start and end).
+    :return: ClumpResult(kmers, start, end): the clump-forming k-mers in lexicographic
+             order and the region that was searched. A region shorter than the window is
+             searched as one window.
+    """
+    if window < k:
+        raise ValueError("The window must be at least k bases long")
+    if skew_flank is not None:
+        start, end = skew_minimum_region(sequence, skew_flank)
+    end = len(sequence) if end is None else min(end, len(sequence))
+    start = max(0, start)
+    positions, values = rolling_kmer_codes(sequence[start:end], k)
+    if len(values) == 0:
+        return ClumpResult([], start, end)
+    codes, ids = np.unique(values, return_inverse=True)
+
+    # k-mers starting at p - span .. p share a window of length `window` with the one at p
+    span = window - k
+    positions = positions.tolist()
+    ids = ids.reshape(-1).tolist()
+    counts = [0] * len(codes)
+    found = bytearray(len(codes))
+    left = 0
+    for entering, position in enumerate(positions):
+        while positions[left] < position - span:
+            counts[ids[left]] -= 1
+            left += 1
+        kmer = ids[entering]
+        count = counts[kmer] + 1
+        counts[kmer] = count
+        if count >= min_count:
+            found[kmer] = 1
+    clumps = np.flatnonzero(np.frombuffer(found, dtype=np.uint8))
+    return ClumpResult([decode_kmer(codes[i], k) for i in clumps], start, end)
@@ -0,0 +1,171 @@
+# Degenerate consensus strings kept as one base bitmask per column.
+#
+# When several bases tie for the maximum in a profile column, every combination of the
+# tied bases is a consensus string, so expanding them (itertools.product) grows
+# exponentially with the number of tied columns. A DegenerateConsensus instead stores,
+# per column, the set of allowed bases as a 4-bit mask (A=1, C=2, G=4, T=8), which is
+# also exactly an IUPAC nucleotide code (A/C -> M, C/T -> Y, A/C/G -> V, ...).
+#
+# A candidate is a consensus string iff (bit(base_j) & mask_j) != 0 for every column j,
+# so testing one candidate, a batch of candidates, or every window of a whole genome is
+# a per-position mask test; genome scans work chunk by chunk (carrying the last k - 1
+# bases) and stream their hits. Bases other than A/C/G/T never match.
+
+from itertools import product
+
+import numpy as np
+
+from .packed import BASES, iter_sequence_chunks, to_codes
+
+# Bitmask -> IUPAC code and back
+IUPAC = {
+    1: "A", 2: "C", 4: "G", 8: "T",
+    3: "M", 5: "R", 9: "W", 6: "S", 10: "Y", 12: "K",
+    7: "V", 11: "H", 13: "D", 14: "B", 15: "N",
+}
+IUPAC_MASKS = {code: mask for mask, code in IUPAC.items()}
+
+# 2-bit code (AMBIGUOUS included) -> base bit
+_BASE_BITS = np.array([1, 2, 4, 8, 0], dtype=np.uint8)
+_CHUNK = 1 << 22
+
+
+class DegenerateConsensus:
+    """
+    Set of consensus strings stored as one allowed-base mask per column.
+
+    Usage:
+        consensus = DegenerateConsensus.from_profile(profile)
+        str(consensus)                   # 'AVGYKA'
+        "AAGCTA" in consensus            # True
+        consensus.scan(genome)           # generator of 0-based hit starts
+    """
+
+    def __init__(self, masks):
+        """
+        :param masks: Sequence of 4-bit masks (1-15), one per column.
+        """
+        self.masks = np.asarray(masks, dtype=np.uint8)
+        if self.masks.ndim != 1 or ((self.masks == 0) | (self.masks > 15)).any():
+            raise ValueError("Every column needs a base mask between 1 and 15")
+
+    @classmethod
+    def from_profile(cls, profile, tolerance=0.0):
+        """
+        Consensus of a profile: every base within tolerance of its column maximum is allowed.
+
+        :param profile: {'A': [...], 'C': [...], 'G': [...], 'T': [...]} or a 4 x k array.
+        :param tolerance: Values at least column max - tolerance count as tied (0 = exact ties).
+        """
+        if isinstance(profile, dict):
+            profile = [profile[base] for base in BASES]
+        profile = np.asarray(profile, dtype=np.float64)
+        tied = profile >= profile.max(axis=0) - tolerance
+        return cls((tied * np.array([1, 2, 4, 8])[:, None]).sum(axis=0))
+
+    @classmethod
+    def from_iupac(cls, pattern):
+        """Consensus from an IUPAC string such as 'AVGYKA'."""
+        try:
+            return cls([IUPAC_MASKS[code] for code in str(pattern).upper()])
+        except KeyError as error:
+            raise ValueError(f"Not an IUPAC nucleotide code: {error.args[0]!r}") from None
+
+    def __len__(self):
+        return len(self.masks)
+
+    def __str__(self):
+        return "".join(IUPAC[int(mask)] for mask in self.masks)
+
+    def __repr__(self):
+        return f"DegenerateConsensus({str(self)!r})"
+
+    def options(self):
+        """Allowed bases per column, e.g. ['A', 'ACG', 'G', 'CT', 'GT', 'A']."""
+        return ["".join(base for bit, base in enumerate(BASES) if mask >> bit & 1) for mask in self.masks]
+
+    def count(self):
+        """Number of consensus strings represented, without expanding them."""
+        total = 1
+        for mask in self.masks:
+            total *= bin(int(mask)).count("1")
+        return total
+
+    def iter_strings(self):
+        """Lazily enumerate every consensus string (in A, C, G, T order per column)."""
+        return ("".join(bases) for bases in product(*self.options()))
+
+    def matches(self, candidate):
+        """True if the candidate string is one of the consensus strings."""
+        codes = to_codes(candidate)
+        return len(codes) == len(self.masks) and bool((_BASE_BITS[codes] & self.masks).all())
+
+    def __contains__(self, candidate):
+        return self.matches(candidate)
+
+    def match_many(self, candidates):
+        """
+        Test many equal-length candidates at once.
+
+        :return: Boolean NumPy array, one entry per candidate (False for a wrong length).
+        """
+        result = np.zeros(len(candidates), dtype=bool)
+        rows = [i for i, candidate in enumerate(candidates) if len(candidate) == len(self.masks)]
+        if rows:
+            codes = np.array([to_codes(candidates[i]) for i in rows], dtype=np.uint8)
+            result[rows] = (_BASE_BITS[codes] & self.masks).all(axis=1)
+        return result
+
+    @staticmethod
+    def _window_hits(codes, mask_sets):
+        """Start offsets of the windows of one code array that match any of the mask sets."""
+        n = len(codes) - len(mask_sets[0]) + 1
+        if n <= 0:
+            return np.zeros(0, dtype=np.int64)
+        bits = _BASE_BITS[codes]
+        found = np.zeros(n, dtype=bool)
+        for masks in mask_sets:
+            hit = (bits[:n] & masks[0]) != 0
+            for column in range(1, len(masks)):
+                hit &= (bits[column:column + n] & masks[column]) != 0
+            found |= hit
+        return np.flatnonzero(found)
+
+    def scan(self, sequence, both_strands=False, chunk_size=_CHUNK):
+        """
+        Stream every position where a consensus string occurs.
+
+        :param sequence: str, bytes, Bio.Seq, PackedSequence, or an iterable of consecutive
+                         chunks (pieces or (start, piece) tuples from IndexedFasta.iter_chunks
+                         with overlap=0).
+        :param both_strands: Also report positions where the reverse complement of a
+                             consensus string occurs (each position once).
+        :param chunk_size: Bases per vectorized block when a single sequence is given.
+        :return: Generator of 0-based start positions, in increasing order.
+        """
+        k = len(self.masks)
+        mask_sets = [self.masks] + ([self.reverse_complement().masks] if both_strands else [])
+        carry = np.zeros(0, dtype=np.uint8)
+        offset = 0   # position of carry[0] in the whole sequence
+        for chunk in iter_sequence_chunks(sequence, chunk_size):
+            if isinstance(chunk, tuple):
+                start, chunk = chunk
+                if start != offset + len(carry):
+                    raise ValueError("Chunks must be consecutive and non-overlapping")
+            codes = np.concatenate((carry, to_codes(chunk)))
+            for hit in self._window_hits(codes, mask_sets):
+                yield offset + int(hit)
+            keep = min(k - 1, len(codes))
+            offset += len(codes) - keep
+            carry = codes[len(codes) - keep:]
+
+    def find(self, sequence, both_strands=False):
+        """All hit positions of scan() as a list."""
+        return list(self.scan(sequence, both_strands))
+
+    def reverse_complement(self):
+        """Consensus of the reverse strand (each mask complemented base-wise, columns reversed)."""
+        masks = self.masks[::-1]
+        # A <-> T (bits 0 and 3), C <-> G (bits 1 and 2)
+        swapped = ((masks & 1) << 3) | ((masks & 8) >> 3) | ((masks & 2) << 1) | ((masks & 4) >> 1)
+        return DegenerateConsensus(swapped)
@@ -0,0 +1,146 @@
+# MEME-style expectation maximization for motif discovery (one occurrence per sequence).
+#
+# The model is a 4 x k profile theta plus a fixed background distribution of the bases.
+# Every window of every sequence (stacked as in SequenceSet) gets the log-likelihood ratio
+#   llr[w] = sum_j log theta[code_j, j] - log background[code_j]
+# and the E-step turns it into position responsibilities per sequence with a log-sum-exp
+# over that sequence's windows (np.logaddexp.reduceat), for all sequences at once. The
+# M-step rebuilds theta from responsibility-weighted base counts per column
+# (np.bincount with weights), plus pseudocounts. The run stops when the log-likelihood
+# gain of an iteration drops below `tolerance`.
+#
+# Soft EM only finds a local optimum, so many starts run in a process pool, each from a
+# reproducible random stream (one Generator per start, spawned from one SeedSequence) or
+# from a given seed k-mer, and the model with the highest log-likelihood is kept.
+
+from collections import namedtuple
+
+import numpy as np
+
+from .packed import to_codes
+from .profile import SequenceSet, profile_matrix
+
+EMResult = namedtuple("EMResult", ["motifs", "profile", "log_likelihood", "iterations", "start"])
+
+_SEQUENCES = None
+
+
+def background_frequencies(sequences, pseudocount=1):
+    """Base frequencies of a SequenceSet, as a length-4 array."""
+    counts = np.bincount(sequences.all_codes, minlength=4)[:4] + pseudocount
+    return counts / counts.sum()
+
+
+def seed_profile(kmer, weight=0.5):
+    """
+    Starting profile from one k-mer: probability `weight` on the k-mer's base in every
+    column and the rest spread evenly over the other three bases (as MEME does).
+    """
+    codes = to_codes(kmer)
+    profile = np.full((4, len(codes)), (1 - weight) / 3)
+    profile[codes, np.arange(len(codes))] = weight
+    return profile
+
+
+def em_run(sequences, profile, background=None, max_iterations=100, tolerance=1e-6, pseudocount=0.1):
+    """
+    Run soft EM from one starting profile until the log-likelihood converges.
+
+    :param sequences: SequenceSet (or list of DNA strings).
+    :param profile: 4 x k starting profile.
+    :param background: Length-4 background frequencies; defaults to the base frequencies of the sequences.
+    :param max_iterations: Upper bound on EM iterations.
+    :param tolerance: Stop when an iteration improves the log-likelihood by less than this.
+    :param pseudocount: Added to every weighted count in the M-step.
+    :return: Tuple (profile, responsibilities, log_likelihood, iterations); responsibilities
+             has one entry per stacked window and sums to 1 per sequence.
+    """
+    if not isinstance(sequences, SequenceSet):
+        sequences = SequenceSet(sequences)
+    if background is None:
+        background = background_frequencies(sequences)
+    k = profile.shape[1]
+    _, segment_starts, counts = sequences.windows(k)
+    window_codes = sequences.window_codes(k)
+    background_scores = np.log(background)[window_codes].sum(axis=1)
+    # Log-likelihood of every sequence under the background alone, and of the uniform position prior
+    offset = np.log(background)[sequences.all_codes].sum() - np.log(counts).sum()
+
+    log_likelihood = -np.inf
+    responsibilities = None
+    iteration = 0
+    for iteration in range(1, max_iterations + 1):
+        # E-step: log responsibilities for every window of every sequence at once
+        llr = sequences.score_windows(np.log(profile), log=True) - background_scores
+        normalizer = np.logaddexp.reduceat(llr, segment_starts)
+        responsibilities = np.exp(llr - np.repeat(normalizer, counts))
+        previous, log_likelihood = log_likelihood, float(normalizer.sum() + offset)
+
+        # M-step: responsibility-weighted base counts per column
+        weighted = np.stack([np.bincount(window_codes[:, j], weights=responsibilities, minlength=4)
+                             for j in range(k)], axis=1) + pseudocount
+        profile = weighted / weighted.sum(axis=0)
+        if log_likelihood - previous < tolerance:
+            break
+    return profile, responsibilities, log_likelihood, iteration
+
+
+def _init_worker(sequences):
+    global _SEQUENCES
+    _SEQUENCES = SequenceSet(sequences)
+
+
+def _run_start(args):
+    start, k, seed, kmer, options = args
+    sequences = _SEQUENCES
+    if kmer is None:
+        # Profile of one random k-mer per sequence, like em_motif_finder's random start
+        rng = np.random.default_rng(seed)
+        _, _, counts = sequences.windows(k)
+        positions = rng.integers(counts)
+        profile = profile_matrix(sequences.kmer_codes(positions, k))
+    else:
+        profile = seed_profile(kmer)
+    profile, _, log_likelihood, iterations = em_run(sequences, profile, **options)
+    return start, profile, log_likelihood, iterations
+
+
+def em_search(dna, k, starts=20, seed=None, seed_kmers=None, processes=None, **options):
+    """
+    Multi-start soft EM; keeps the model with the highest log-likelihood.
+
+    :param dna: List of DNA sequences (str, Bio.Seq or PackedSequence).
+    :param k: Motif length.
+    :param starts: Number of random starts.
+    :param seed: Seed of the SeedSequence that the random starts are spawned from.
+    :param seed_kmers: Optional k-mers to start from as well (see seed_profile).
+    :param processes: Worker processes; 1 runs the starts in this process, None uses os.cpu_count().
+    :param options: Passed on to em_run (background, max_iterations, tolerance, pseudocount).
+    :return: EMResult(motifs, profile, log_likelihood, iterations, start): the most likely
+             window of every sequence under the best model, the model itself, its
+             log-likelihood, its iteration count and the index of the winning start
+             (random starts first, then seed_kmers).
+    """
+    sequences = [str(sequence) for sequence in dna]
+    seeds = np.random.SeedSequence(seed).spawn(starts)
+    jobs = [(start, k, seeds[start], None, options) for start in range(starts)]
+    jobs += [(starts + i, k, None, kmer, options) for i, kmer in enumerate(seed_kmers or [])]
+
+    if processes == 1:
+        _init_worker(sequences)
+        results = [_run_start(job) for job in jobs]
+    else:
+        from multiprocessing import Pool
+
+        with Pool(processes, initializer=_init_worker, initargs=(sequences,)) as pool:
+            results = pool.map(_run_start, jobs)
+
+    start, profile, log_likelihood, iterations = max(results, key=lambda result: result[2])
+    encoded = SequenceSet(sequences)
+    background = options.get("background")
+    if background is None:
+        background = background_frequencies(encoded)
+    # Most likely site per sequence: the arg-max of the log-odds, i.e. of the responsibilities
+    log_odds = np.log(profile) - np.log(background)[:, None]
+    motifs = encoded.kmers(encoded.most_probable_positions(log_odds, log=True), k)
+    return EMResult(motifs, profile, log_likelihood, iterations, start)
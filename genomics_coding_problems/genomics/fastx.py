@@ -0,0 +1,283 @@
+# Streaming and random-access readers for FASTA and FASTQ files.
+#
+# FASTA files are memory-mapped and located through a samtools-compatible `.fai` index:
+#
+#   NAME  LENGTH  OFFSET  LINEBASES  LINEWIDTH
+#
+# OFFSET is the byte offset of the first base of the record, LINEBASES the number of
+# bases per line and LINEWIDTH the number of bytes per line (bases + line terminator).
+# With those five numbers the byte range of any region can be computed directly, so a
+# region fetch only touches the pages that hold it and whole chromosomes never have to
+# be loaded. The index is built once with a single streaming pass and reused as long as
+# it is newer than the FASTA file.
+#
+# FASTQ files are streamed in fixed-size batches of records (plain or gzip-compressed).
+
+import gzip
+import mmap
+import os
+import re
+from collections import namedtuple
+
+FaiEntry = namedtuple("FaiEntry", ["name", "length", "offset", "line_bases", "line_width"])
+FastqRecord = namedtuple("FastqRecord", ["name", "sequence", "quality"])
+
+_REGION = re.compile(r"^(?P<chrom>[^:]+)(?::(?P<start>[\d,]+)(?:-(?P<end>[\d,]+))?)?$")
+_NEWLINES = b"\r\n"
+
+
+def parse_region(region):
+    """
+    Parse a samtools-style region string.
+
+    :param region: "chrom", "chrom:start" or "chrom:start-end" (1-based, inclusive; commas allowed).
+    :return: Tuple (chrom, start, end) with a 0-based, half-open interval; end is None for "to the end".
+    """
+    match = _REGION.match(region.strip())
+    if not match:
+        raise ValueError(f"Invalid region: {region!r}")
+    start = match.group("start")
+    end = match.group("end")
+    start = int(start.replace(",", "")) - 1 if start else 0
+    end = int(end.replace(",", "")) if end else None
+    if start < 0 or (end is not None and end < start):
+        raise ValueError(f"Invalid region: {region!r}")
+    return match.group("chrom"), start, end
+
+
+def build_fasta_index(fasta_path):
+    """
+    Build a .fai index for a FASTA file with one streaming pass over the file.
+
+    :param fasta_path: Path to an uncompressed FASTA file.
+    :return: List of FaiEntry tuples in file order.
+    """
+    entries = []
+    name = None
+    length = offset = line_bases = line_width = 0
+    short_line_seen = False
+
+    def finish():
+        if name is not None:
+            entries.append(FaiEntry(name, length, offset, line_bases, line_width))
+
+    position = 0
+    with open(fasta_path, "rb") as handle:
+        for line in handle:
+            position += len(line)
+            if line.startswith(b">"):
+                finish()
+                name = line[1:].split(None, 1)[0].decode("ascii") if line[1:].strip() else ""
+                length = line_bases = line_width = 0
+                offset = position
+                short_line_seen = False
+                continue
+            if name is None:
+                if line.strip():
+                    raise ValueError(f"{fasta_path}: sequence data before the first header")
+                continue
+            bases = len(line.rstrip(_NEWLINES))
+            if bases == 0:
+                short_line_seen = True
+                continue
+            if line_bases == 0:
+                line_bases, line_width = bases, len(line)
+            elif short_line_seen or bases > line_bases:
+                raise ValueError(f"{fasta_path}: record {name!r} has uneven line lengths and cannot be indexed")
+            if bases < line_bases:
+                short_line_seen = True
+            length += bases
+    finish()
+    return entries
+
+
+def write_fasta_index(entries, fai_path):
+    """Write FaiEntry tuples to a tab-separated .fai file."""
+    with open(fai_path, "w") as fai:
+        for entry in entries:
+            fai.write("\t".join(str(field) for field in entry) + "\n")
+
+
+def read_fasta_index(fai_path):
+    """Read a .fai file into a list of FaiEntry tuples."""
+    entries = []
+    with open(fai_path) as fai:
+        for line in fai:
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) >= 5:
+                entries.append(FaiEntry(fields[0], *(int(field) for field in fields[1:5])))
+    return entries
+
+
+class IndexedFasta:
+    """
+    Random-access FASTA reader backed by mmap and a .fai index.
+
+    Usage:
+        with IndexedFasta("genome.fa") as genome:
+            for name in genome.references:
+                print(name, genome.lengths[name])
+            region = genome.fetch_region("chr1:10,001-10,100")
+    """
+
+    def __init__(self, fasta_path, fai_path=None, rebuild=False):
+        """
+        :param fasta_path: Path to an uncompressed FASTA file.
+        :param fai_path: Where the index lives; defaults to fasta_path + ".fai".
+        :param rebuild: Force rebuilding the index even if a fresh one exists.
+        """
+        self.path = fasta_path
+        self.fai_path = fai_path or fasta_path + ".fai"
+
+        index_is_fresh = (os.path.exists(self.fai_path)
+                          and os.path.getmtime(self.fai_path) >= os.path.getmtime(fasta_path))
+        if index_is_fresh and not rebuild:
+            entries = read_fasta_index(self.fai_path)
+        else:
+            entries = build_fasta_index(fasta_path)
+            write_fasta_index(entries, self.fai_path)
+        self.index = {entry.name: entry for entry in entries}
+
+        self._file = open(fasta_path, "rb")
+        if os.path.getsize(fasta_path) > 0:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._map = b""
+
+    @property
+    def references(self):
+        """Record names in file order."""
+        return list(self.index)
+
+    @property
+    def lengths(self):
+        """Mapping of record name to sequence length."""
+        return {name: entry.length for name, entry in self.index.items()}
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def _byte_offset(self, entry, position):
+        lines, column = divmod(position, entry.line_bases) if entry.line_bases else (0, 0)
+        return entry.offset + lines * entry.line_width + column
+
+    def fetch(self, chrom, start=0, end=None, packed=False):
+        """
+        Fetch a region by 0-based, half-open coordinates without reading the whole record.
+
+        :param chrom: Record name.
+        :param start: First base (0-based).
+        :param end: One past the last base; None means the end of the record.
+        :param packed: Return a PackedSequence instead of a str.
+        :return: Sequence of the region (uppercase/lowercase preserved as in the file).
+        """
+        if chrom not in self.index:
+            raise KeyError(f"Unknown sequence name: {chrom!r}")
+        entry = self.index[chrom]
+        end = entry.length if end is None else min(end, entry.length)
+        start = max(0, start)
+        if start >= end:
+            raw = b""
+        else:
+            raw = self._map[self._byte_offset(entry, start):self._byte_offset(entry, end)]
+            raw = raw.translate(None, _NEWLINES)
+        if packed:
+            from .packed import PackedSequence
+            return PackedSequence(raw)
+        return raw.decode("ascii")
+
+    def fetch_region(self, region, packed=False):
+        """
+        Fetch a samtools-style region such as "chr1:1,001-2,000" (1-based, inclusive).
+        """
+        chrom, start, end = parse_region(region)
+        return self.fetch(chrom, start, end, packed=packed)
+
+    def iter_chunks(self, chrom, chunk_size=1 << 20, overlap=0, packed=False):
+        """
+        Stream a record in fixed-size chunks, so a whole chromosome is never held in memory.
+
+        :param chrom: Record name.
+        :param chunk_size: Number of new bases per chunk.
+        :param overlap: Bases repeated from the end of the previous chunk (e.g. k - 1 for k-mer scans).
+        :param packed: Yield PackedSequence chunks instead of str.
+        :return: Generator of (start, sequence) tuples, start being the 0-based offset of the chunk.
+        """
+        if chunk_size <= 0 or overlap < 0:
+            raise ValueError("chunk_size must be positive and overlap non-negative")
+        length = self.index[chrom].length
+        for start in range(0, length, chunk_size):
+            chunk_start = max(0, start - overlap)
+            yield chunk_start, self.fetch(chrom, chunk_start, start + chunk_size, packed=packed)
+
+    def __iter__(self):
+        """Iterate over (name, sequence) pairs; each record is loaded one at a time."""
+        for name in self.index:
+            yield name, self.fetch(name)
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _open_text(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt")
+    return open(path)
+
+
+def read_fastq_batches(fastq_path, batch_size=10000):
+    """
+    Stream a FASTQ file (optionally .gz) in batches of records.
+
+    Only one batch is held in memory at a time, so arbitrarily large run files can be
+    processed with bounded memory.
+
+    :param fastq_path: Path to a FASTQ or FASTQ.gz file.
+    :param batch_size: Number of records per batch.
+    :return: Generator of lists of FastqRecord(name, sequence, quality).
+    """
+    if batch_size <= 0:
+        raise ValueError("batch_size must be positive")
+    batch = []
+    number = 0   # 1-based record number, for error messages
+    with _open_text(fastq_path) as handle:
+        while True:
+            header = handle.readline()
+            if not header:
+                break
+            if not header.strip():
+                continue
+            number += 1
+            sequence = handle.readline().rstrip("\r\n")
+            separator = handle.readline()
+            quality = handle.readline().rstrip("\r\n")
+            if not header.startswith("@") or not separator.startswith("+"):
+                raise ValueError(f"{fastq_path}: malformed FASTQ record near {header.strip()!r}")
+            if len(quality) != len(sequence):
+                raise ValueError(f"{fastq_path}: sequence and quality lengths differ for {header.strip()!r}")
+            name = header[1:].split(None, 1)
+            if not name:
+                raise ValueError(f"{fastq_path}: FASTQ record {number} has an empty name")
+            batch.append(FastqRecord(name[0], sequence, quality))
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def read_fastq(fastq_path, batch_size=10000):
+    """Stream FASTQ records one at a time (batched reads underneath)."""
+    for batch in read_fastq_batches(fastq_path, batch_size):
+        yield from batch
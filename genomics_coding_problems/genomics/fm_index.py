@@ -0,0 +1,259 @@
+# FM-index for repeated exact-match queries against a fixed genome.
+#
+# Build once:
+#   1. Suffix array (SA) of genome + "$" by prefix doubling (vectorized with NumPy).
+#   2. Burrows-Wheeler transform: BWT[i] = text[SA[i] - 1].
+#   3. C[c]: number of symbols in the text smaller than c.
+#   4. Occurrence checkpoints: Occ[c, j * occ_rate] for every occ_rate-th row; the rest of
+#      an Occ(c, i) lookup is counted directly in at most occ_rate BWT symbols.
+#   5. A sample of the SA (every sa_rate-th text position) for locate.
+#
+# Query:
+#   - count(P) runs a backward search: one pair of Occ lookups per pattern character,
+#     so it takes O(len(P)) time regardless of the genome size.
+#   - locate(P) walks each matching row back with LF(i) = C[BWT[i]] + Occ(BWT[i], i)
+#     until it hits a sampled row (at most sa_rate - 1 steps per hit).
+#
+# The index is saved as a directory of .npy files and memory-mapped on load, so opening it
+# is instant and only the pages touched by queries are read. Batch queries run the backward
+# search for all patterns at once as vectorized NumPy steps.
+
+import json
+import os
+
+import numpy as np
+
+SYMBOLS = "$ACGT"            # symbol 5 stands for any other character
+_SIGMA = len(SYMBOLS) + 1
+
+_TEXT_CODES = np.full(256, 5, dtype=np.uint8)
+for _code, _base in enumerate(SYMBOLS[1:], start=1):
+    _TEXT_CODES[ord(_base)] = _code
+
+
+def _encode_text(genome):
+    if isinstance(genome, str):
+        raw = genome.encode("ascii")
+    elif hasattr(genome, "words"):   # PackedSequence
+        raw = str(genome).encode("ascii")
+    else:
+        raw = bytes(genome)
+    codes = np.empty(len(raw) + 1, dtype=np.uint8)
+    codes[:-1] = _TEXT_CODES[np.frombuffer(raw, dtype=np.uint8)]
+    codes[-1] = 0
+    return codes
+
+
+def suffix_array(codes):
+    """
+    Suffix array by prefix doubling: sort by rank pairs (rank[i], rank[i + h]) for h = 1, 2, 4, ...
+
+    :param codes: uint8 NumPy array whose last symbol is a unique smallest sentinel.
+    :return: int64 NumPy array of suffix start positions in lexicographic order.
+    """
+    n = len(codes)
+    rank = codes.astype(np.int64)
+    sa = np.argsort(rank, kind="stable")
+    h = 1
+    while h < n:
+        second = np.full(n, -1, dtype=np.int64)
+        second[:n - h] = rank[h:]
+        sa = np.lexsort((second, rank))
+        first_sorted, second_sorted = rank[sa], second[sa]
+        new_group = np.empty(n, dtype=np.int64)
+        new_group[0] = 0
+        new_group[1:] = (first_sorted[1:] != first_sorted[:-1]) | (second_sorted[1:] != second_sorted[:-1])
+        sorted_ranks = np.cumsum(new_group)
+        rank = np.empty(n, dtype=np.int64)
+        rank[sa] = sorted_ranks
+        if sorted_ranks[-1] == n - 1:
+            break
+        h *= 2
+    return sa
+
+
+class FMIndex:
+    """
+    Exact-match index over one DNA sequence.
+
+    Usage:
+        index = FMIndex.build(genome)
+        index.save("genome.fmi")
+        index = FMIndex.load("genome.fmi")       # memory-mapped
+        index.locate("ATAT")                     # same result as pattern_matching("ATAT", genome)
+        index.count_many(["ATAT", "CAT"])
+
+    Query patterns must be non-empty and upper-case A/C/G/T only; anything else raises
+    ValueError. Genome bases outside A/C/G/T (including lower-case ones) never match.
+    """
+
+    def __init__(self, bwt, occ, c_table, sa_rows, sa_values, occ_rate, sa_rate):
+        self.bwt = bwt
+        self.occ = occ
+        self.c_table = c_table
+        self.sa_rows = sa_rows
+        self.sa_values = sa_values
+        self.occ_rate = occ_rate
+        self.sa_rate = sa_rate
+        self.length = len(bwt) - 1   # genome length without the sentinel
+
+    @classmethod
+    def build(cls, genome, occ_rate=64, sa_rate=32):
+        """
+        Build the index in memory.
+
+        :param genome: str, bytes, Bio.Seq or PackedSequence.
+        :param occ_rate: Rows between occurrence checkpoints (space/time trade-off for Occ).
+        :param sa_rate: Text positions between suffix array samples (space/time trade-off for locate).
+        :return: FMIndex.
+        """
+        codes = _encode_text(genome)
+        n = len(codes)
+        sa = suffix_array(codes)
+        bwt = codes[sa - 1]   # sa - 1 == -1 wraps to the sentinel, as it should
+
+        counts = np.bincount(codes, minlength=_SIGMA)
+        c_table = np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.int64)
+
+        # occ[j, c] = number of c in bwt[:j * occ_rate]
+        n_checkpoints = n // occ_rate + 1
+        occ = np.zeros((n_checkpoints, _SIGMA), dtype=np.uint32 if n < 2 ** 32 else np.uint64)
+        for symbol in range(_SIGMA):
+            cumulative = np.concatenate(([0], np.cumsum(bwt == symbol)))
+            occ[:, symbol] = cumulative[::occ_rate][:n_checkpoints]
+
+        sa_dtype = np.uint32 if n < 2 ** 32 else np.int64
+        sa_rows = np.flatnonzero(sa % sa_rate == 0)
+        sa_values = sa[sa_rows].astype(sa_dtype)
+        return cls(bwt, occ, c_table, sa_rows.astype(sa_dtype), sa_values, occ_rate, sa_rate)
+
+    def save(self, path):
+        """Save the index as a directory of .npy files plus meta.json."""
+        os.makedirs(path, exist_ok=True)
+        for name in ("bwt", "occ", "sa_rows", "sa_values"):
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(path, "meta.json"), "w") as meta:
+            json.dump({"c_table": self.c_table.tolist(), "occ_rate": self.occ_rate,
+                       "sa_rate": self.sa_rate, "length": self.length}, meta)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Load a saved index.
+
+        :param path: Directory written by save().
+        :param mmap: Memory-map the arrays instead of reading them into memory.
+        """
+        mode = "r" if mmap else None
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode)
+                  for name in ("bwt", "occ", "sa_rows", "sa_values")}
+        with open(os.path.join(path, "meta.json")) as meta:
+            info = json.load(meta)
+        return cls(arrays["bwt"], arrays["occ"], np.array(info["c_table"], dtype=np.int64),
+                   arrays["sa_rows"], arrays["sa_values"], info["occ_rate"], info["sa_rate"])
+
+    # ------------------------------------------------------------------
+    # Core operations (vectorized over many rows at once)
+    # ------------------------------------------------------------------
+
+    def _occ(self, symbols, rows):
+        """Occ(symbols[i], rows[i]): occurrences of each symbol in bwt[:rows[i]]."""
+        block = rows // self.occ_rate
+        result = self.occ[block, symbols].astype(np.int64)
+        start = block * self.occ_rate
+        span = rows - start
+        if span.any():
+            offsets = np.arange(self.occ_rate)
+            window = np.minimum(start[:, None] + offsets, len(self.bwt) - 1)
+            hits = (self.bwt[window] == symbols[:, None]) & (offsets < span[:, None])
+            result += hits.sum(axis=1)
+        return result
+
+    @staticmethod
+    def _encode_patterns(patterns):
+        encoded = []
+        for pattern in patterns:
+            pattern = str(pattern)
+            if not pattern or pattern.strip("ACGT"):
+                raise ValueError(f"Query patterns must be non-empty strings over A, C, G, T: {pattern!r}")
+            encoded.append(np.frombuffer(pattern.encode("ascii"), dtype=np.uint8))
+        return encoded
+
+    def _ranges(self, patterns):
+        """Backward search for all patterns together; returns SA row ranges [lo, hi)."""
+        encoded = self._encode_patterns(patterns)
+        lengths = np.array([len(p) for p in encoded], dtype=np.int64)
+        lo = np.zeros(len(encoded), dtype=np.int64)
+        hi = np.full(len(encoded), len(self.bwt), dtype=np.int64)
+        if not encoded:
+            return lo, hi
+        # Right-align the patterns so step j processes the j-th character from the end of each
+        width = int(lengths.max())
+        padded = np.zeros((len(encoded), width), dtype=np.uint8)
+        for i, pattern in enumerate(encoded):
+            padded[i, width - len(pattern):] = _TEXT_CODES[pattern]
+        for column in range(width - 1, -1, -1):
+            active = (lengths >= width - column) & (lo < hi)
+            if not active.any():
+                break
+            symbols = padded[active, column].astype(np.int64)
+            lo[active] = self.c_table[symbols] + self._occ(symbols, lo[active])
+            hi[active] = self.c_table[symbols] + self._occ(symbols, hi[active])
+        hi = np.maximum(hi, lo)
+        return lo, hi
+
+    def _resolve(self, rows):
+        """Text positions of SA rows, via LF-mapping back to the nearest sampled row."""
+        rows = rows.astype(np.int64)
+        steps = np.zeros(len(rows), dtype=np.int64)
+        positions = np.full(len(rows), -1, dtype=np.int64)
+        pending = np.arange(len(rows))
+        while len(pending):
+            current = rows[pending]
+            at = np.searchsorted(self.sa_rows, current)
+            at = np.minimum(at, len(self.sa_rows) - 1)
+            sampled = self.sa_rows[at] == current
+            done = pending[sampled]
+            positions[done] = self.sa_values[at[sampled]].astype(np.int64) + steps[done]
+            pending = pending[~sampled]
+            if len(pending):
+                current = rows[pending]
+                symbols = self.bwt[current].astype(np.int64)
+                rows[pending] = self.c_table[symbols] + self._occ(symbols, current)
+                steps[pending] += 1
+        return positions
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def count(self, pattern):
+        """Number of (overlapping) occurrences of pattern."""
+        return int(self.count_many([pattern])[0])
+
+    def locate(self, pattern):
+        """
+        Start positions of pattern, sorted; for an upper-case A/C/G/T pattern identical to
+        pattern_matching(pattern, genome).
+        """
+        return self.locate_many([pattern])[0]
+
+    def count_many(self, patterns):
+        """Counts for a batch of patterns as a NumPy array."""
+        lo, hi = self._ranges(list(patterns))
+        return hi - lo
+
+    def locate_many(self, patterns):
+        """
+        Start positions for a batch of patterns; all hits are resolved in one vectorized LF walk.
+
+        :return: List of sorted lists of positions, one per pattern.
+        """
+        lo, hi = self._ranges(list(patterns))
+        sizes = hi - lo
+        if sizes.sum() == 0:
+            return [[] for _ in sizes]
+        rows = np.concatenate([np.arange(a, b) for a, b in zip(lo, hi)])
+        positions = self._resolve(rows)
+        bounds = np.concatenate(([0], np.cumsum(sizes)))
+        return [np.sort(positions[bounds[i]:bounds[i + 1]]).tolist() for i in range(len(sizes))]
@@ -0,0 +1,136 @@
+# Gibbs sampling motif search with live counts and independent restarts.
+#
+# The reference gibbs_sampler (15_gibbs_sampler_motif_search.py) rebuilds the profile from
+# the t - 1 kept motifs and re-scores every motif against a fresh consensus on each
+# iteration, although only one motif changes. Here a chain keeps a k x 4 count matrix of
+# all t current motifs:
+#   - the profile without motif i is (counts - onehot(motif_i) + pseudocount) / (t - 1 + 4 * pseudocount),
+#   - replacing motif i subtracts the old one-hot rows and adds the new ones,
+#   - the score (sum over columns of t - max count) only changes in the columns where the
+#     old and new motif differ, so only those column maxima are recomputed.
+#
+# Each chain draws from its own NumPy Generator spawned from one SeedSequence, so a run is
+# reproducible for a given seed whatever the number of worker processes, and chains can
+# stop early once their best score has not improved for `patience` iterations.
+
+from collections import namedtuple
+
+import numpy as np
+
+from .profile import _EYE, SequenceSet
+
+GibbsResult = namedtuple("GibbsResult", ["motifs", "score", "chain", "iterations"])
+
+_SEQUENCES = None
+
+
+def gibbs_chain(sequences, k, n_iterations, rng, patience=None, pseudocount=1):
+    """
+    Run one Gibbs sampling chain.
+
+    :param sequences: SequenceSet (or list of DNA strings).
+    :param k: Motif length.
+    :param n_iterations: Maximum number of iterations.
+    :param rng: numpy.random.Generator driving the chain.
+    :param patience: Stop once the best score has not improved for this many iterations;
+                     None always runs n_iterations.
+    :param pseudocount: Added to every count when building the profile.
+    :return: Tuple (positions, score, iterations): best motif start per sequence, its score
+             and the number of iterations run.
+    """
+    if not isinstance(sequences, SequenceSet):
+        sequences = SequenceSet(sequences)
+    t = len(sequences)
+    _, segment_starts, counts = sequences.windows(k)
+    window_codes = sequences.window_codes(k)
+    columns = np.arange(k)
+    norm = t - 1 + 4 * pseudocount
+
+    positions = rng.integers(counts)
+    motifs = window_codes[segment_starts + positions]          # (t, k) codes
+    live = _EYE[motifs].sum(axis=0)                             # (k, 4) counts
+    column_max = live.max(axis=1)
+    score = int(t * k - column_max.sum())
+    best_positions, best_score = positions.copy(), score
+    since_best = 0
+
+    iteration = 0
+    for iteration in range(1, n_iterations + 1):
+        i = int(rng.integers(t))
+        old = motifs[i]
+
+        # Profile of the other t - 1 motifs, transposed to (k, 4) like the counts
+        profile = (live - _EYE[old] + pseudocount) / norm
+        codes = window_codes[segment_starts[i]:segment_starts[i] + counts[i]]
+        probs = profile[columns, codes].prod(axis=1)
+
+        # Weighted draw of a window of sequence i
+        cumulative = np.cumsum(probs)
+        position = int(np.searchsorted(cumulative, rng.random() * cumulative[-1], side="right"))
+        position = min(position, counts[i] - 1)
+        new = codes[position]
+
+        changed = np.flatnonzero(old != new)
+        if len(changed):
+            live[changed, old[changed]] -= 1
+            live[changed, new[changed]] += 1
+            updated = live[changed].max(axis=1)
+            score += int((column_max[changed] - updated).sum())
+            column_max[changed] = updated
+        motifs[i] = new
+        positions[i] = position
+
+        if score < best_score:
+            best_positions, best_score = positions.copy(), score
+            since_best = 0
+        else:
+            since_best += 1
+            if patience is not None and since_best >= patience:
+                break
+    return best_positions, best_score, iteration
+
+
+def _init_worker(sequences):
+    global _SEQUENCES
+    _SEQUENCES = SequenceSet(sequences)
+
+
+def _run_chain(args):
+    chain, k, n_iterations, seed, patience, pseudocount = args
+    positions, score, iterations = gibbs_chain(_SEQUENCES, k, n_iterations, np.random.default_rng(seed),
+                                               patience, pseudocount)
+    return chain, positions, score, iterations
+
+
+def gibbs_search(dna, k, n_iterations=1000, n_chains=20, seed=None, patience=None,
+                 pseudocount=1, processes=None):
+    """
+    Run independent Gibbs sampling chains and keep the best motifs.
+
+    :param dna: List of DNA sequences (str, Bio.Seq or PackedSequence).
+    :param k: Motif length.
+    :param n_iterations: Maximum iterations per chain.
+    :param n_chains: Number of independent restarts.
+    :param seed: Seed of the SeedSequence that every chain's generator is spawned from.
+    :param patience: Per-chain early stopping, see gibbs_chain.
+    :param pseudocount: Added to every count when building profiles.
+    :param processes: Worker processes; 1 runs the chains in this process, None uses os.cpu_count().
+    :return: GibbsResult(motifs, score, chain, iterations) of the best chain (lowest score,
+             lowest chain index on ties); iterations is the total over all chains.
+    """
+    sequences = [str(sequence) for sequence in dna]
+    seeds = np.random.SeedSequence(seed).spawn(n_chains)
+    jobs = [(chain, k, n_iterations, seeds[chain], patience, pseudocount) for chain in range(n_chains)]
+
+    if processes == 1:
+        _init_worker(sequences)
+        results = [_run_chain(job) for job in jobs]
+    else:
+        from multiprocessing import Pool
+
+        with Pool(processes, initializer=_init_worker, initargs=(sequences,)) as pool:
+            results = pool.map(_run_chain, jobs)
+
+    chain, positions, score, _ = min(results, key=lambda result: (result[2], result[0]))
+    motifs = [sequence[p:p + k] for sequence, p in zip(sequences, positions)]
+    return GibbsResult(motifs, int(score), chain, sum(result[3] for result in results))
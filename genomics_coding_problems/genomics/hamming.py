@@ -0,0 +1,141 @@
+# Batched Hamming distances for large sets of equal-length sequences (reads, barcodes).
+#
+# Each sequence is packed into uint64 words (32 bases per word, 2 bits per base). For two
+# packed words x and y, the positions that differ are the 2-bit groups of x ^ y that are
+# non-zero; folding each group onto its low bit ((v | v >> 1) & 0x5555...) and counting
+# the set bits gives the number of mismatches in 32 positions at once. Ambiguous bases
+# (N etc.) are kept in a separate bit mask and always count as a mismatch.
+#
+# The all-vs-all comparison is done in tiles of rows x columns so the temporary arrays
+# stay small, and tiles are spread over a thread pool (NumPy releases the GIL inside its
+# vectorized kernels, so threads scale across cores without copying the packed data).
+# pairs_within() keeps only pairs at distance <= d, so the dense N x M matrix is never built.
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .packed import BASES_PER_WORD, encode, popcount
+
+_LOW_BITS = np.uint64(0x5555555555555555)
+_SHIFTS = np.arange(BASES_PER_WORD, dtype=np.uint64) * np.uint64(2)
+
+
+class PackedBatch:
+    """
+    A set of equal-length sequences packed into an (N, words) uint64 matrix.
+    """
+
+    def __init__(self, sequences):
+        """
+        :param sequences: Iterable of equal-length str, bytes or Bio.Seq objects.
+        """
+        sequences = [s if isinstance(s, (bytes, bytearray)) else str(s).encode("ascii") for s in sequences]
+        lengths = {len(s) for s in sequences}
+        if len(lengths) > 1:
+            raise ValueError("Strings must be of equal length")
+        self.length = lengths.pop() if lengths else 0
+        n = len(sequences)
+        codes = encode(b"".join(sequences)).reshape(n, self.length)
+        ambiguous = codes == 255
+        codes = np.where(ambiguous, 0, codes)
+
+        n_words = max(1, -(-self.length // BASES_PER_WORD))
+        padded = np.zeros((n, n_words * BASES_PER_WORD), dtype=np.uint64)
+        padded[:, :self.length] = codes
+        flags = np.zeros((n, n_words * BASES_PER_WORD), dtype=np.uint64)
+        flags[:, :self.length] = ambiguous
+        shape = (n, n_words, BASES_PER_WORD)
+        self.words = np.bitwise_or.reduce(padded.reshape(shape) << _SHIFTS, axis=2)
+        # Ambiguity flags sit on the low bit of each 2-bit group, like the folded XOR
+        self.ambiguous = np.bitwise_or.reduce(flags.reshape(shape) << _SHIFTS, axis=2)
+        self.has_ambiguous = bool(ambiguous.any())
+
+    def __len__(self):
+        return len(self.words)
+
+
+def _as_batch(sequences):
+    return sequences if isinstance(sequences, PackedBatch) else PackedBatch(sequences)
+
+
+def _tile(a, b, rows, cols):
+    """Distance matrix between rows a[rows] and b[cols]."""
+    diff = a.words[rows, None, :] ^ b.words[None, cols, :]
+    folded = (diff | (diff >> np.uint64(1))) & _LOW_BITS
+    if a.has_ambiguous or b.has_ambiguous:
+        folded |= a.ambiguous[rows, None, :] | b.ambiguous[None, cols, :]
+    return popcount(folded).sum(axis=2, dtype=np.int64)
+
+
+def _blocks(n, block):
+    return [slice(start, min(start + block, n)) for start in range(0, n, block)]
+
+
+def _dtype_for(length):
+    return np.uint8 if length < 2 ** 8 else np.uint16 if length < 2 ** 16 else np.uint32
+
+
+def hamming_matrix(a, b=None, block=512, workers=None):
+    """
+    Dense Hamming distance matrix.
+
+    :param a: Sequences (or a PackedBatch) of one length.
+    :param b: Optional second set of the same length; None compares a with itself.
+    :param block: Tile size (rows and columns per tile).
+    :param workers: Number of threads; None lets ThreadPoolExecutor decide.
+    :return: (N, M) NumPy array of distances.
+    """
+    a = _as_batch(a)
+    b = a if b is None else _as_batch(b)
+    if a.length != b.length:
+        raise ValueError("Strings must be of equal length")
+    result = np.zeros((len(a), len(b)), dtype=_dtype_for(a.length))
+
+    def fill(rows):
+        for cols in _blocks(len(b), block):
+            result[rows, cols] = _tile(a, b, rows, cols)
+
+    with ThreadPoolExecutor(workers) as pool:
+        list(pool.map(fill, _blocks(len(a), block)))
+    return result
+
+
+def pairs_within(a, d, b=None, block=512, workers=None):
+    """
+    All pairs at Hamming distance <= d, as sparse coordinate arrays.
+
+    :param a: Sequences (or a PackedBatch) of one length.
+    :param d: Maximum distance.
+    :param b: Optional second set; None compares a with itself and returns each pair once (i < j).
+    :return: Tuple (i, j, distance) of NumPy arrays, sorted by i then j.
+    """
+    a = _as_batch(a)
+    same = b is None
+    b = a if same else _as_batch(b)
+    if a.length != b.length:
+        raise ValueError("Strings must be of equal length")
+
+    def scan(rows):
+        found = []
+        for cols in _blocks(len(b), block):
+            if same and cols.stop <= rows.start:
+                continue   # tile lies entirely below the diagonal
+            distances = _tile(a, b, rows, cols)
+            i, j = np.nonzero(distances <= d)
+            i += rows.start
+            j += cols.start
+            if same:
+                keep = i < j
+                i, j = i[keep], j[keep]
+            found.append((i, j, distances[i - rows.start, j - cols.start]))
+        return found
+
+    with ThreadPoolExecutor(workers) as pool:
+        tiles = [tile for found in pool.map(scan, _blocks(len(a), block)) for tile in found]
+    if not tiles:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+    i, j, distances = (np.concatenate(parts) for parts in zip(*tiles))
+    order = np.lexsort((j, i))
+    return i[order], j[order], distances[order].astype(_dtype_for(a.length))
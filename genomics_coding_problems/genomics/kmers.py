@@ -0,0 +1,340 @@
+# Integer-encoded k-mer counting.
+#
+# Every k-mer is rolled into a 2-bit integer (A=0, C=1, G=2, T=3, first base in the
+# highest bits), so numeric order equals lexicographic order and no Python string is
+# allocated per position. Counts go into:
+#   - a dense array of 4^k counters when k <= DENSE_MAX_K, updated by scatter-adding the
+#     distinct codes of each block (np.unique counts), or
+#   - a compact open-addressing hash table (linear probing, vectorized inserts) above that.
+# Windows that contain a base other than A/C/G/T are skipped.
+#
+# Counters of the same k can be merged, which is how per-chromosome partial counts coming
+# back from a process pool (as (codes, counts) items) are combined (see count_kmers_parallel).
+
+import numpy as np
+
+from .packed import AMBIGUOUS, BASES, to_codes
+
+DENSE_MAX_K = 13
+MAX_K = 32
+
+# Number of windows encoded per vectorized block, bounds the temporary uint64 arrays
+_BLOCK = 1 << 22
+_FIBONACCI = np.uint64(0x9E3779B97F4A7C15)
+
+
+def encode_kmer(kmer):
+    """Encode a k-mer string as a 2-bit integer (first base in the highest bits)."""
+    value = 0
+    for base in str(kmer).upper():
+        code = BASES.find(base)
+        if code < 0:
+            raise ValueError(f"k-mer {kmer!r} contains a base other than A, C, G, T")
+        value = (value << 2) | code
+    return value
+
+
+def decode_kmer(value, k):
+    """Decode a 2-bit integer back into a k-mer string."""
+    value = int(value)
+    return "".join(BASES[(value >> (2 * (k - 1 - i))) & 3] for i in range(k))
+
+
+def rolling_kmer_codes(sequence, k):
+    """
+    Encode every valid k-mer of a sequence as an integer.
+
+    :param sequence: str, bytes, Bio.Seq or PackedSequence.
+    :param k: k-mer length (1-32).
+    :return: Tuple (positions, values): start positions of the k-mers that contain only
+             A/C/G/T and their uint64 encodings.
+    """
+    positions, values = [], []
+    for block_positions, block_values in iter_kmer_codes(sequence, k):
+        positions.append(block_positions)
+        values.append(block_values)
+    if not values:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.uint64)
+    return np.concatenate(positions), np.concatenate(values)
+
+
+def iter_kmer_codes(sequence, k, block=_BLOCK):
+    """
+    Same as rolling_kmer_codes, but yields (positions, values) per block of windows so
+    memory stays bounded on whole chromosomes.
+    """
+    if not 1 <= k <= MAX_K:
+        raise ValueError(f"k must be between 1 and {MAX_K}")
+    codes = to_codes(sequence)
+    n_windows = len(codes) - k + 1
+    for start in range(0, max(n_windows, 0), block):
+        stop = min(start + block, n_windows)
+        window = codes[start:stop + k - 1]
+        ambiguous = np.concatenate(([0], np.cumsum(window == AMBIGUOUS)))
+        valid = (ambiguous[k:] - ambiguous[:-k]) == 0
+
+        # Roll the encoding forward one base at a time: value = (value << 2) | next_base
+        values = np.zeros(stop - start, dtype=np.uint64)
+        for offset in range(k):
+            values <<= np.uint64(2)
+            values |= window[offset:offset + stop - start] & 3
+        yield np.flatnonzero(valid) + start, values[valid]
+
+
+class KmerHashTable:
+    """
+    Open-addressing (linear probing) hash table from uint64 k-mer codes to uint32 counts.
+
+    Inserts are vectorized: all pending keys probe in parallel, keys that find their own
+    slot add their count, keys that find an empty slot claim it (one winner per slot per
+    round) and everything else moves on to the next slot.
+    """
+
+    def __init__(self, capacity=1 << 16, max_load=0.6):
+        capacity = 1 << max(4, int(capacity - 1).bit_length())
+        self.max_load = max_load
+        self.size = 0
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        self._bits = capacity.bit_length() - 1
+        self._keys = np.zeros(capacity, dtype=np.uint64)
+        self._counts = np.zeros(capacity, dtype=np.uint32)
+        self._occupied = np.zeros(capacity, dtype=bool)
+
+    def _slots(self, keys):
+        return ((keys * _FIBONACCI) >> np.uint64(64 - self._bits)).astype(np.int64)
+
+    def _grow(self, needed):
+        capacity = self.capacity
+        while needed > capacity * self.max_load:
+            capacity *= 2
+        if capacity == self.capacity:
+            return
+        keys, counts = self.items()
+        self._allocate(capacity)
+        self.size = 0
+        self._insert(keys, counts)
+
+    def add(self, keys, counts=None):
+        """
+        Add counts for an array of keys (duplicates allowed).
+
+        :param keys: uint64 NumPy array of k-mer codes.
+        :param counts: Optional array of counts per key; defaults to 1 each.
+        """
+        keys = np.asarray(keys, dtype=np.uint64)
+        if counts is None:
+            keys, counts = np.unique(keys, return_counts=True)
+        else:
+            keys, inverse = np.unique(keys, return_inverse=True)
+            counts = np.bincount(inverse.reshape(-1), weights=counts, minlength=len(keys))
+        if len(keys) == 0:
+            return
+        self._grow(self.size + len(keys))
+        self._insert(keys, counts.astype(np.uint32))
+
+    def _insert(self, keys, counts):
+        """Insert unique keys."""
+        slots = self._slots(keys)
+        mask = self.capacity - 1
+        pending = np.arange(len(keys))
+        while len(pending):
+            probe = slots[pending]
+            occupied = self._occupied[probe]
+            found = occupied & (self._keys[probe] == keys[pending])
+            self._counts[probe[found]] += counts[pending[found]]
+
+            empty = np.flatnonzero(~occupied)
+            _, first = np.unique(probe[empty], return_index=True)
+            winners = empty[first]
+            claimed = probe[winners]
+            self._occupied[claimed] = True
+            self._keys[claimed] = keys[pending[winners]]
+            self._counts[claimed] = counts[pending[winners]]
+            self.size += len(winners)
+
+            done = found.copy()
+            done[winners] = True
+            collided = occupied & ~found
+            slots[pending[collided]] = (probe[collided] + 1) & mask
+            pending = pending[~done]
+
+    def get(self, keys):
+        """
+        Look up counts for an array of keys.
+
+        :return: uint32 NumPy array, 0 for keys that are not present.
+        """
+        keys = np.asarray(keys, dtype=np.uint64)
+        result = np.zeros(len(keys), dtype=np.uint32)
+        slots = self._slots(keys)
+        mask = self.capacity - 1
+        pending = np.arange(len(keys))
+        while len(pending):
+            probe = slots[pending]
+            occupied = self._occupied[probe]
+            found = occupied & (self._keys[probe] == keys[pending])
+            result[pending[found]] = self._counts[probe[found]]
+            collided = occupied & ~found
+            slots[pending[collided]] = (probe[collided] + 1) & mask
+            pending = pending[collided]
+        return result
+
+    def items(self):
+        """Return (keys, counts) arrays of all stored k-mers."""
+        return self._keys[self._occupied], self._counts[self._occupied]
+
+
+class KmerCounter:
+    """
+    Count all k-mers of one or more sequences using integer encodings.
+
+    Usage:
+        counter = KmerCounter(3)
+        counter.add("CGCCTAAATAGCCTCGCGGAGCCTTATGTCATACTCGTCCT")
+        kmers, frequency = counter.most_frequent_kmers()   # (['CCT'], 4)
+    """
+
+    def __init__(self, k, dense=None):
+        """
+        :param k: k-mer length (1-32).
+        :param dense: Force the dense array (True) or the hash table (False);
+                      by default dense is used for k <= DENSE_MAX_K.
+        """
+        if not 1 <= k <= MAX_K:
+            raise ValueError(f"k must be between 1 and {MAX_K}")
+        self.k = k
+        self.dense = k <= DENSE_MAX_K if dense is None else dense
+        if self.dense:
+            self._counts = np.zeros(4 ** k, dtype=np.uint32)
+        else:
+            self._table = KmerHashTable()
+
+    def add(self, sequence):
+        """
+        Count the k-mers of a sequence (str, bytes, Bio.Seq or PackedSequence).
+
+        :return: self, so calls can be chained.
+        """
+        for _, values in iter_kmer_codes(sequence, self.k):
+            self.add_codes(values)
+        return self
+
+    def add_codes(self, values):
+        """Count an array of already-encoded k-mers."""
+        if self.dense:
+            # Scatter-add the distinct codes; a bincount over all 4^k slots per block costs
+            # far more than the block itself when the genome is small relative to 4^k
+            self.add_counts(*np.unique(values, return_counts=True))
+        else:
+            self._table.add(values)
+
+    def merge(self, other):
+        """
+        Add the counts of another counter with the same k.
+
+        :return: self.
+        """
+        if other.k != self.k:
+            raise ValueError("Cannot merge k-mer counters with different k")
+        return self.add_counts(*other.items())
+
+    def add_counts(self, keys, counts):
+        """
+        Add counts for an array of distinct k-mer codes (e.g. the items() of a partial count).
+
+        :return: self.
+        """
+        if self.dense:
+            self._counts[keys.astype(np.int64)] += counts.astype(np.uint32)
+        else:
+            self._table.add(keys, counts)
+        return self
+
+    def items(self):
+        """Return (codes, counts) arrays for every k-mer seen at least once."""
+        if self.dense:
+            keys = np.flatnonzero(self._counts)
+            return keys.astype(np.uint64), self._counts[keys]
+        return self._table.items()
+
+    def count(self, kmer):
+        """Number of occurrences of a single k-mer."""
+        if len(kmer) != self.k:
+            raise ValueError(f"Expected a {self.k}-mer")
+        code = encode_kmer(kmer)
+        if self.dense:
+            return int(self._counts[code])
+        return int(self._table.get(np.array([code], dtype=np.uint64))[0])
+
+    def __getitem__(self, kmer):
+        return self.count(kmer)
+
+    def total(self):
+        """Total number of counted k-mer positions."""
+        return int(self.items()[1].sum(dtype=np.uint64))
+
+    def __len__(self):
+        """Number of distinct k-mers seen."""
+        return len(self.items()[0])
+
+    def most_common(self, n=None):
+        """
+        Top-n k-mers by count, ties broken lexicographically.
+
+        :param n: Number of k-mers to return; None returns all of them, n <= 0 none.
+        :return: List of (kmer, count) tuples, highest count first.
+        """
+        if n is not None and n <= 0:
+            return []
+        keys, counts = self.items()
+        if n is not None and n < len(keys):
+            # Only fully sort the candidates that can make the top n
+            threshold = np.partition(counts, len(counts) - n)[len(counts) - n]
+            keep = counts >= threshold
+            keys, counts = keys[keep], counts[keep]
+        order = np.lexsort((keys, -counts.astype(np.int64)))
+        if n is not None:
+            order = order[:n]
+        return [(decode_kmer(keys[i], self.k), int(counts[i])) for i in order]
+
+    def most_frequent_kmers(self):
+        """
+        All k-mers tied at the maximum frequency.
+
+        :return: Tuple (kmers, frequency) with kmers in lexicographic order; ([], 0) when empty.
+        """
+        keys, counts = self.items()
+        if len(counts) == 0:
+            return [], 0
+        max_freq = counts.max()
+        tied = np.sort(keys[counts == max_freq])
+        return [decode_kmer(key, self.k) for key in tied], int(max_freq)
+
+
+def _count_one(args):
+    sequence, k, dense = args
+    # Only the k-mers seen travel back, not a dense 4^k table
+    return KmerCounter(k, dense=dense).add(sequence).items()
+
+
+def count_kmers_parallel(sequences, k, processes=None, dense=None):
+    """
+    Count k-mers of many sequences (e.g. one per chromosome) in a process pool and merge
+    the partial counts.
+
+    :param sequences: Iterable of sequences (str, bytes, Bio.Seq or PackedSequence).
+    :param k: k-mer length.
+    :param processes: Number of worker processes; None uses os.cpu_count().
+    :param dense: See KmerCounter.
+    :return: Merged KmerCounter.
+    """
+    from multiprocessing import Pool
+
+    total = KmerCounter(k, dense=dense)
+    with Pool(processes) as pool:
+        for keys, counts in pool.imap_unordered(_count_one, ((seq, k, total.dense) for seq in sequences)):
+            total.add_counts(keys, counts)
+    return total
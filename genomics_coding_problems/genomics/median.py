@@ -0,0 +1,167 @@
+# Exact motif search as a branch-and-bound median-string search.
+#
+# The best motifs (one k-mer per sequence, minimal total Hamming distance to their
+# consensus) have the same score as the median string: the k-mer pattern minimizing
+# d(pattern, Dna) = sum over sequences of the minimum distance from pattern to any k-mer
+# of that sequence. Instead of the (n - k + 1)^t motif combinations of the exhaustive
+# search, patterns are enumerated as a 4^k prefix tree:
+#   - every window of every sequence is encoded once, and a (k, 4, windows) mismatch table
+#     records whether base c differs from the window base at position j,
+#   - walking down the tree, the distance of every window's prefix to the pattern prefix is
+#     the parent distance plus one row of that table,
+#   - sum over sequences of the per-sequence minimum prefix distance never decreases as the
+#     prefix grows, so it is a lower bound for every pattern below the node and branches
+#     whose bound reaches the best score found so far are pruned.
+# The search starts from the score of the best k-mer of the first sequence (an upper bound
+# that prunes most of the tree right away), and the subtrees below the top-level prefixes
+# are searched in parallel worker processes.
+
+from collections import namedtuple
+
+import numpy as np
+
+from .packed import BASES
+from .profile import SequenceSet
+
+MedianResult = namedtuple("MedianResult", ["median", "motifs", "score"])
+
+_TABLES = None
+
+
+class _DistanceTables:
+    """Per-sequence k-mer window codes and the mismatch table used by the search."""
+
+    def __init__(self, sequences, k):
+        self.sequences = sequences if isinstance(sequences, SequenceSet) else SequenceSet(sequences)
+        self.k = k
+        _, self.segment_starts, self.counts = self.sequences.windows(k)
+        self.window_codes = self.sequences.window_codes(k)
+        bases = np.arange(4, dtype=np.uint8)[:, None]
+        self.mismatch = np.stack([(self.window_codes[:, j] != bases) for j in range(k)]).astype(np.uint8)
+
+    def bound(self, distances):
+        """Sum of the per-sequence minimum distances, for one or more rows of window distances."""
+        return np.minimum.reduceat(distances, self.segment_starts, axis=-1).sum(axis=-1, dtype=np.int64)
+
+    def prefix_distances(self, prefix):
+        """Distance of every window's first len(prefix) bases to a prefix given as base codes."""
+        distances = np.zeros(len(self.window_codes), dtype=np.uint8)
+        for depth, base in enumerate(prefix):
+            distances += self.mismatch[depth, base]
+        return distances
+
+    def upper_bound(self, block=64):
+        """Best d(pattern, Dna) over the distinct k-mers of the first sequence, as (score, codes)."""
+        candidates = np.unique(self.window_codes[:self.counts[0]], axis=0)
+        best_score, best = None, None
+        for start in range(0, len(candidates), block):
+            chunk = candidates[start:start + block]
+            distances = (chunk[:, None, :] != self.window_codes[None, :, :]).sum(axis=2, dtype=np.uint8)
+            scores = self.bound(distances)
+            row = int(scores.argmin())
+            if best_score is None or scores[row] < best_score:
+                best_score, best = int(scores[row]), chunk[row]
+        return best_score, best
+
+    def search(self, prefix, best_score):
+        """
+        Depth-first branch and bound below one prefix, children in A, C, G, T order.
+
+        :param prefix: Tuple of base codes of the subtree root.
+        :param best_score: Only patterns scoring strictly below this are reported.
+        :return: Tuple (score, codes) of the lexicographically first best pattern in the
+                 subtree, or (best_score, None) when nothing beats best_score.
+        """
+        k = self.k
+        root = self.prefix_distances(prefix)
+        if len(prefix) == k:
+            score = int(self.bound(root))
+            return (score, np.array(prefix, dtype=np.uint8)) if score < best_score else (best_score, None)
+        if self.bound(root) >= best_score:
+            return best_score, None
+
+        best = None
+        pattern = np.zeros(k, dtype=np.uint8)
+        pattern[:len(prefix)] = prefix
+        # Entries (depth, base, bound, distances): distances of the pattern prefix of length
+        # depth, whose last base is base; bound is re-checked on pop as best_score drops
+        stack = [(len(prefix), None, 0, root)]
+        while stack:
+            depth, base, bound, distances = stack.pop()
+            if bound >= best_score:
+                continue
+            if base is not None:
+                pattern[depth - 1] = base
+            children = distances[None, :] + self.mismatch[depth]
+            bounds = self.bound(children)
+            if depth + 1 == k:
+                leaf = int(bounds.argmin())
+                if bounds[leaf] < best_score:
+                    best_score = int(bounds[leaf])
+                    pattern[depth] = leaf
+                    best = pattern.copy()
+                continue
+            # Push in reverse so that A is expanded first
+            for child in range(3, -1, -1):
+                if bounds[child] < best_score:
+                    stack.append((depth + 1, child, bounds[child], children[child]))
+        return best_score, best
+
+    def motifs(self, pattern):
+        """First window of every sequence at minimal distance to pattern."""
+        distances = (self.window_codes != pattern).sum(axis=1)
+        rows = np.arange(len(distances))
+        best = np.repeat(np.minimum.reduceat(distances, self.segment_starts), self.counts)
+        first = np.minimum.reduceat(np.where(distances == best, rows, len(rows)), self.segment_starts)
+        return self.sequences.kmers(first - self.segment_starts, self.k)
+
+
+def _init_worker(sequences, k):
+    global _TABLES
+    _TABLES = _DistanceTables(sequences, k)
+
+
+def _search_prefix(args):
+    prefix, best_score = args
+    return _TABLES.search(prefix, best_score)
+
+
+def _prefixes(length):
+    prefixes = [()]
+    for _ in range(length):
+        prefixes = [prefix + (base,) for prefix in prefixes for base in range(4)]
+    return prefixes
+
+
+def median_string(dna, k, processes=None, prefix_length=None):
+    """
+    Exact median string and best motifs by branch and bound.
+
+    :param dna: List of DNA sequences (str, Bio.Seq or PackedSequence), each at least k long.
+    :param k: Pattern length.
+    :param processes: Worker processes for the top-level subtrees; 1 searches in this
+                      process, None uses os.cpu_count().
+    :param prefix_length: Depth of the top-level prefixes handed to the workers; defaults
+                          to 3 (64 subtrees), capped at k.
+    :return: MedianResult(median, motifs, score): the lexicographically first optimal
+             pattern, the first closest k-mer of every sequence and the total distance,
+             which equals the minimal motif score of the exhaustive search.
+    """
+    sequences = [str(sequence) for sequence in dna]
+    tables = _DistanceTables(sequences, k)
+    # Start one above the heuristic bound so the lexicographically first optimum is still found
+    upper, fallback = tables.upper_bound()
+    jobs = [(prefix, upper + 1) for prefix in _prefixes(min(k, 3 if prefix_length is None else prefix_length))]
+
+    if processes == 1:
+        results = [tables.search(prefix, best_score) for prefix, best_score in jobs]
+    else:
+        from multiprocessing import Pool
+
+        with Pool(processes, initializer=_init_worker, initargs=(sequences, k)) as pool:
+            results = pool.map(_search_prefix, jobs)
+
+    # Prefixes are in lexicographic order, so the first of the lowest scores wins ties
+    score, pattern = min((result for result in results if result[1] is not None),
+                         key=lambda result: result[0], default=(upper, fallback))
+    return MedianResult("".join(BASES[code] for code in pattern), tables.motifs(pattern), int(score))
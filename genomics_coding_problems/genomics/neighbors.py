@@ -0,0 +1,115 @@
+# d-neighborhoods of k-mers as XOR masks over 2-bit integer encodings.
+#
+# XOR-ing a 2-bit base code with 1, 2 or 3 yields each of the three other bases, so every
+# k-mer at Hamming distance exactly j from a pattern is pattern ^ mask for one mask that
+# picks j positions and one non-zero 2-bit value per chosen position. The masks only
+# depend on (k, d): they are built once (vectorized, one batch per distance), cached, and
+# reused for every pattern, so a neighborhood is one XOR per neighbor and the
+# neighborhoods of millions of encoded patterns are one broadcast XOR
+# (patterns[:, None] ^ masks[None, :]) computed in bounded blocks.
+#
+# Masks are ordered by distance (the zero mask first), so neighbors come out grouped by
+# their distance from the pattern, which is known without recomputing any Hamming distance.
+
+from collections import namedtuple
+from functools import lru_cache
+from itertools import combinations
+
+import numpy as np
+
+from .kmers import MAX_K, encode_kmer
+
+NeighborMasks = namedtuple("NeighborMasks", ["masks", "distances"])
+
+_MAX_CELLS = 1 << 22
+
+
+@lru_cache(maxsize=None)
+def neighbor_masks(k, d):
+    """
+    XOR masks of the whole d-neighborhood of a k-mer, cached per (k, d).
+
+    :return: NeighborMasks(masks, distances): uint64 masks ordered by distance, starting
+             with the zero mask (the pattern itself), and the uint8 distance of each mask.
+             Both arrays are read-only.
+    """
+    if not 1 <= k <= MAX_K:
+        raise ValueError(f"k must be between 1 and {MAX_K}")
+    masks = [np.zeros(1, dtype=np.uint64)]
+    distances = [np.zeros(1, dtype=np.uint8)]
+    for distance in range(1, min(d, k) + 1):
+        # Bit shift of every chosen position, first base in the highest bits
+        shifts = (2 * (k - 1 - np.array(list(combinations(range(k), distance))))).astype(np.uint64)
+        # Every non-zero 2-bit value per chosen position (3^distance rows)
+        values = np.stack(np.meshgrid(*[np.arange(1, 4, dtype=np.uint64)] * distance, indexing="ij"),
+                          axis=-1).reshape(-1, distance)
+        layer = np.bitwise_or.reduce(values[None, :, :] << shifts[:, None, :], axis=2).reshape(-1)
+        masks.append(layer)
+        distances.append(np.full(len(layer), distance, dtype=np.uint8))
+    result = NeighborMasks(np.concatenate(masks), np.concatenate(distances))
+    result.masks.flags.writeable = False
+    result.distances.flags.writeable = False
+    return result
+
+
+def mismatch_masks(k, d):
+    """
+    XOR masks that turn an encoded k-mer into each of its neighbors at distance 1..d.
+
+    :return: uint64 NumPy array (without the zero mask for distance 0).
+    """
+    return neighbor_masks(k, d).masks[1:]
+
+
+def neighborhood_size(k, d):
+    """Number of k-mers within Hamming distance d of a k-mer (the pattern included)."""
+    return len(neighbor_masks(k, d).masks)
+
+
+def iter_neighbors(pattern, d, k=None, with_distance=False):
+    """
+    Lazily generate the d-neighborhood of one k-mer as 2-bit integers.
+
+    :param pattern: k-mer string, or its 2-bit encoding (then k is required).
+    :param d: Maximum Hamming distance.
+    :param k: k-mer length when pattern is an integer.
+    :param with_distance: Yield (value, distance) pairs instead of bare values.
+    :return: Generator of int values (decode with kmers.decode_kmer), ordered by distance.
+    """
+    if isinstance(pattern, str):
+        value, k = encode_kmer(pattern), len(pattern)
+    elif k is None:
+        raise ValueError("k is required for an encoded pattern")
+    else:
+        value = int(pattern)
+    masks, distances = neighbor_masks(k, d)
+    values = (np.uint64(value) ^ masks).tolist()
+    if with_distance:
+        yield from zip(values, distances.tolist())
+    else:
+        yield from values
+
+
+def neighborhood_array(values, k, d):
+    """
+    Neighborhoods of many encoded k-mers at once.
+
+    :param values: Array of 2-bit encoded k-mers.
+    :return: (patterns, neighborhood_size) uint64 array; column j holds the neighbors at
+             distance neighbor_masks(k, d).distances[j].
+    """
+    values = np.asarray(values, dtype=np.uint64)
+    return values[:, None] ^ neighbor_masks(k, d).masks[None, :]
+
+
+def iter_neighborhood_blocks(values, k, d, max_cells=_MAX_CELLS):
+    """
+    Same as neighborhood_array, in blocks of patterns so memory stays bounded.
+
+    :return: Generator of (start, block) pairs: block[i] is the neighborhood of values[start + i].
+    """
+    values = np.asarray(values, dtype=np.uint64)
+    masks = neighbor_masks(k, d).masks
+    block = max(1, max_cells // len(masks))
+    for start in range(0, len(values), block):
+        yield start, values[start:start + block, None] ^ masks[None, :]
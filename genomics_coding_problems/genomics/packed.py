@@ -0,0 +1,412 @@
+# 2-bit packed nucleotide sequences.
+#
+# A, C, G and T are stored as the 2-bit codes 0, 1, 2 and 3, 32 bases per 64-bit word,
+# with base i living in bits 2*(i % 32) .. 2*(i % 32) + 1 of word i // 32.
+# Anything else (N, IUPAC ambiguity codes, gaps) is stored as code 0 in the words and
+# recorded in a sparse mask of (position, character) pairs, so a reference with a few
+# long runs of N costs next to nothing on top of the 2-bit payload.
+#
+# With this encoding the complement of a base is simply `code ^ 3`, which lets
+# reverse-complement and Hamming distance work on whole words at a time.
+
+import sys
+
+import numpy as np
+
+BASES = "ACGT"
+BASES_PER_WORD = 32
+
+# Code used by PackedSequence.codes() for masked (ambiguous) positions
+AMBIGUOUS = 4
+
+_WORD_BITS = 64
+_ONES = np.uint64(0xFFFFFFFFFFFFFFFF)
+_LOW_BITS = np.uint64(0x5555555555555555)   # lower bit of every 2-bit group
+_PAIRS = np.uint64(0x3333333333333333)
+_NIBBLES = np.uint64(0x0F0F0F0F0F0F0F0F)
+_SHIFTS = (np.arange(BASES_PER_WORD, dtype=np.uint64) * np.uint64(2))
+
+# ASCII -> 2-bit code lookup table, 255 marks a base that has to go into the mask
+_ENCODE = np.full(256, 255, dtype=np.uint8)
+for _code, _base in enumerate(BASES):
+    _ENCODE[ord(_base)] = _code
+    _ENCODE[ord(_base.lower())] = _code
+
+_DECODE = np.frombuffer(BASES.encode("ascii"), dtype=np.uint8)
+
+# Complements of the IUPAC ambiguity codes that can appear in the mask
+_IUPAC_COMPLEMENT = {
+    "N": "N", "R": "Y", "Y": "R", "S": "S", "W": "W", "K": "M", "M": "K",
+    "B": "V", "V": "B", "D": "H", "H": "D",
+}
+
+
+def popcount(words):
+    """
+    Count the set bits of every element of a uint64 array.
+
+    :param words: NumPy array of uint64 words.
+    :return: NumPy array with the number of set bits per word.
+    """
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words)
+    as_bytes = words.view(np.uint8).reshape(-1, 8)
+    return _BYTE_POPCOUNT[as_bytes].sum(axis=1)
+
+
+_BYTE_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def encode(text):
+    """
+    Convert a nucleotide string into an array of 2-bit codes.
+
+    :param text: str, bytes or Bio.Seq object.
+    :return: uint8 NumPy array of codes 0-3, with 255 for bases outside ACGT.
+    """
+    if isinstance(text, str):
+        text = text.encode("ascii")
+    elif not isinstance(text, (bytes, bytearray, memoryview)):
+        text = bytes(text)
+    return _ENCODE[np.frombuffer(text, dtype=np.uint8)]
+
+
+def to_codes(sequence):
+    """
+    Convert any supported sequence type into one 2-bit code per base.
+
+    :param sequence: str, bytes, Bio.Seq, PackedSequence, a sequence view with a codes() method,
+                     or an array that already holds codes.
+    :return: uint8 NumPy array with codes 0-3 for A, C, G, T and AMBIGUOUS for anything else.
+    """
+    if isinstance(sequence, np.ndarray):
+        return sequence
+    if isinstance(sequence, PackedSequence) or callable(getattr(sequence, "codes", None)):
+        return sequence.codes()   # PackedSequence, strand.ReverseComplement views
+    codes = encode(sequence)
+    codes[codes == 255] = AMBIGUOUS
+    return codes
+
+
+def is_sequence(value):
+    """
+    Whether a scanner input is one sequence rather than an iterable of chunks.
+
+    :param value: Scanner input.
+    :return: True for str, bytes, bytearray, memoryview, NumPy code arrays, Bio.Seq /
+             MutableSeq, PackedSequence and strand.ReverseComplement views.
+    """
+    if isinstance(value, (str, bytes, bytearray, memoryview, np.ndarray, PackedSequence)):
+        return True
+    from .strand import ReverseComplement
+    if isinstance(value, ReverseComplement):
+        return True
+    # A Bio.Seq object can only exist once Biopython has been imported
+    bio_seq = sys.modules.get("Bio.Seq")
+    if bio_seq is None:
+        return False
+    return isinstance(value, tuple(getattr(bio_seq, name) for name in ("Seq", "MutableSeq") if hasattr(bio_seq, name)))
+
+
+def iter_sequence_chunks(sequence, chunk_size):
+    """
+    Chunks of a scanner input.
+
+    :param sequence: One sequence (see is_sequence) or an iterable of consecutive chunks,
+                     e.g. IndexedFasta.iter_chunks(chrom) with overlap=0.
+    :param chunk_size: Bases per chunk when a single sequence is given.
+    :return: Generator of chunks; a single sequence is sliced (views stay views), the
+             items of an iterable are passed through unchanged ((start, piece) tuples included).
+    """
+    if is_sequence(sequence):
+        for start in range(0, len(sequence), chunk_size):
+            yield sequence[start:start + chunk_size]
+    else:
+        yield from sequence
+
+
+def pack_codes(codes):
+    """
+    Pack an array of 2-bit codes (0-3) into uint64 words, 32 bases per word.
+
+    :param codes: uint8 NumPy array of codes 0-3.
+    :return: uint64 NumPy array; unused bits in the last word are zero.
+    """
+    n_words = -(-len(codes) // BASES_PER_WORD)
+    padded = np.zeros(n_words * BASES_PER_WORD, dtype=np.uint64)
+    padded[:len(codes)] = codes
+    return np.bitwise_or.reduce(padded.reshape(n_words, BASES_PER_WORD) << _SHIFTS, axis=1)
+
+
+def unpack_words(words, length):
+    """
+    Unpack uint64 words (starting at bit 0) back into an array of 2-bit codes.
+
+    :param words: uint64 NumPy array produced by pack_codes.
+    :param length: Number of bases to unpack.
+    :return: uint8 NumPy array of codes 0-3.
+    """
+    codes = (words[:, None] >> _SHIFTS) & np.uint64(3)
+    return codes.reshape(-1)[:length].astype(np.uint8)
+
+
+def _reverse_pairs(words):
+    """Reverse the order of the 32 two-bit groups inside every word."""
+    words = ((words >> np.uint64(2)) & _PAIRS) | ((words & _PAIRS) << np.uint64(2))
+    words = ((words >> np.uint64(4)) & _NIBBLES) | ((words & _NIBBLES) << np.uint64(4))
+    return words.byteswap()
+
+
+def _tail_mask(length):
+    """Bit mask selecting the valid bases of the last word of a `length`-base sequence."""
+    used = length % BASES_PER_WORD
+    if used == 0:
+        return _ONES
+    return np.uint64((1 << (2 * used)) - 1)
+
+
+class PackedSequence:
+    """
+    A DNA sequence stored with 2 bits per base plus a sparse mask for ambiguous bases.
+
+    Slicing with step 1 returns a view that shares the packed buffer (no copy), and
+    comparisons, Hamming distance and reverse-complement operate on 64-bit words.
+    The class behaves like a read-only string where it matters: len(), indexing,
+    iteration, str() and == against plain strings all work, so the functions in
+    genomics_coding_problems accept it in place of a str or Bio.Seq.
+    """
+
+    __slots__ = ("_words", "_start", "_length", "_mask_positions", "_mask_bases")
+
+    def __init__(self, sequence=""):
+        """
+        :param sequence: str, bytes, Bio.Seq or another PackedSequence.
+        """
+        if isinstance(sequence, PackedSequence):
+            self._words = sequence._words
+            self._start = sequence._start
+            self._length = sequence._length
+            self._mask_positions = sequence._mask_positions
+            self._mask_bases = sequence._mask_bases
+            return
+
+        codes = encode(sequence)
+        ambiguous = np.flatnonzero(codes == 255)
+        if len(ambiguous):
+            raw = codes.copy()
+            text = sequence if isinstance(sequence, str) else bytes(sequence).decode("ascii")
+            self._mask_bases = np.frombuffer(
+                "".join(text[p] for p in ambiguous).upper().encode("ascii"), dtype=np.uint8)
+            raw[ambiguous] = 0
+            codes = raw
+        else:
+            self._mask_bases = np.zeros(0, dtype=np.uint8)
+        self._mask_positions = ambiguous.astype(np.int64)
+        self._words = pack_codes(codes)
+        self._start = 0
+        self._length = len(codes)
+
+    @classmethod
+    def _view(cls, words, start, length, mask_positions, mask_bases):
+        view = cls.__new__(cls)
+        view._words = words
+        view._start = start
+        view._length = length
+        view._mask_positions = mask_positions
+        view._mask_bases = mask_bases
+        return view
+
+    # ------------------------------------------------------------------
+    # Low-level access
+    # ------------------------------------------------------------------
+
+    def _mask_range(self):
+        """Index range of the shared mask arrays that falls inside this view."""
+        lo = np.searchsorted(self._mask_positions, self._start, side="left")
+        hi = np.searchsorted(self._mask_positions, self._start + self._length, side="left")
+        return lo, hi
+
+    def mask(self):
+        """
+        Return the ambiguous positions of this sequence.
+
+        :return: Tuple (positions, bases): int64 positions relative to the start of the
+                 sequence and the uint8 ASCII characters stored at them.
+        """
+        lo, hi = self._mask_range()
+        return self._mask_positions[lo:hi] - self._start, self._mask_bases[lo:hi]
+
+    def words(self):
+        """
+        Return the packed words of this sequence re-aligned so that base 0 sits in bit 0.
+
+        For a view that already starts on a word boundary this is a slice of the shared
+        buffer (bits past the end of the sequence are cleared only in a copy of the last
+        word); otherwise neighbouring words are shifted and merged.
+
+        :return: uint64 NumPy array of ceil(len / 32) words.
+        """
+        n_words = -(-self._length // BASES_PER_WORD)
+        if n_words == 0:
+            return np.zeros(0, dtype=np.uint64)
+        first = self._start // BASES_PER_WORD
+        shift = (self._start % BASES_PER_WORD) * 2
+        if shift == 0:
+            words = self._words[first:first + n_words]
+        else:
+            chunk = self._words[first:first + n_words + 1]
+            low = chunk[:n_words] >> np.uint64(shift)
+            high = np.zeros(n_words, dtype=np.uint64)
+            high[:len(chunk) - 1] = chunk[1:] << np.uint64(_WORD_BITS - shift)
+            words = low | high
+        tail = _tail_mask(self._length)
+        if words[-1] & ~tail:
+            words = words.copy()
+            words[-1] &= tail
+        return words
+
+    def codes(self):
+        """
+        Unpack the sequence into one code per base.
+
+        :return: uint8 NumPy array with codes 0-3 for A, C, G, T and AMBIGUOUS for masked bases.
+        """
+        codes = unpack_words(self.words(), self._length)
+        positions, _ = self.mask()
+        codes[positions] = AMBIGUOUS
+        return codes
+
+    def _code_at(self, index):
+        position = self._start + index
+        word = self._words[position // BASES_PER_WORD]
+        return int(word >> np.uint64((position % BASES_PER_WORD) * 2)) & 3
+
+    # ------------------------------------------------------------------
+    # String protocol
+    # ------------------------------------------------------------------
+
+    def __len__(self):
+        return self._length
+
+    def __str__(self):
+        text = _DECODE[unpack_words(self.words(), self._length)]
+        positions, bases = self.mask()
+        text[positions] = bases
+        return text.tobytes().decode("ascii")
+
+    def __repr__(self):
+        text = str(self) if self._length <= 60 else str(self[:57]) + "..."
+        return f"PackedSequence('{text}', length={self._length})"
+
+    def __iter__(self):
+        block = 1 << 16
+        for offset in range(0, self._length, block):
+            yield from str(self[offset:offset + block])
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self._length)
+            if step == 1:
+                length = max(0, stop - start)
+                return PackedSequence._view(self._words, self._start + start, length,
+                                            self._mask_positions, self._mask_bases)
+            if step == -1 and start == self._length - 1 and stop == -1:
+                # Plain reversal (seq[::-1]) is done on the words as well
+                return self._reverse_words(complement=False)
+            return PackedSequence(str(self)[key])
+
+        if key < 0:
+            key += self._length
+        if not 0 <= key < self._length:
+            raise IndexError("PackedSequence index out of range")
+        lo, hi = self._mask_range()
+        if lo < hi:
+            at = np.searchsorted(self._mask_positions[lo:hi], self._start + key)
+            if at < hi - lo and self._mask_positions[lo + at] == self._start + key:
+                return chr(self._mask_bases[lo + at])
+        return BASES[self._code_at(key)]
+
+    def __eq__(self, other):
+        if not isinstance(other, PackedSequence):
+            if not hasattr(other, "__len__"):
+                return NotImplemented
+            if len(other) != self._length:
+                return False
+            try:
+                other = PackedSequence(other)
+            except (TypeError, ValueError, UnicodeError):
+                return NotImplemented
+        if len(other) != self._length:
+            return False
+        return self._mismatches(other) == 0
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __hash__(self):
+        # Equal to a str with the same bases, so hash like that str
+        return hash(str(self))
+
+    # ------------------------------------------------------------------
+    # Word-level operations
+    # ------------------------------------------------------------------
+
+    def _mismatches(self, other):
+        """Number of differing positions between two packed sequences of equal length."""
+        diff = self.words() ^ other.words()
+        count = int(popcount((diff | (diff >> np.uint64(1))) & _LOW_BITS).sum())
+
+        own_positions, own_bases = self.mask()
+        other_positions, other_bases = other.mask()
+        if len(own_positions) == 0 and len(other_positions) == 0:
+            return count
+
+        # Masked bases are stored as code 0, so re-check every masked position by character
+        own = dict(zip(own_positions.tolist(), own_bases.tolist()))
+        theirs = dict(zip(other_positions.tolist(), other_bases.tolist()))
+        for position in own.keys() | theirs.keys():
+            code_differs = self._code_at(position) != other._code_at(position)
+            a = own.get(position, _DECODE[self._code_at(position)])
+            b = theirs.get(position, _DECODE[other._code_at(position)])
+            count += int(a != b) - int(code_differs)
+        return count
+
+    def hamming_distance(self, other):
+        """
+        Hamming distance to another sequence of the same length, computed on packed words.
+
+        :param other: PackedSequence, str or Bio.Seq of equal length.
+        :return: Number of mismatching positions.
+        """
+        if not isinstance(other, PackedSequence):
+            other = PackedSequence(other)
+        if len(other) != self._length:
+            raise ValueError("Strings must be of equal length")
+        return self._mismatches(other)
+
+    def _reverse_words(self, complement):
+        words = self.words()
+        n_words = len(words)
+        if complement:
+            words = ~words
+        reversed_words = _reverse_pairs(words)[::-1].copy()
+        # The reversed sequence now ends on a word boundary, so it starts `pad` bases in
+        pad = n_words * BASES_PER_WORD - self._length
+
+        positions, bases = self.mask()
+        new_positions = (pad + self._length - 1 - positions)[::-1].astype(np.int64)
+        new_bases = bases[::-1]
+        if complement and len(new_bases):
+            new_bases = np.frombuffer(
+                "".join(_IUPAC_COMPLEMENT.get(chr(b), chr(b)) for b in new_bases).encode("ascii"),
+                dtype=np.uint8)
+        return PackedSequence._view(reversed_words, pad, self._length, new_positions, new_bases.copy())
+
+    def reverse_complement(self):
+        """
+        Return the reverse complement, computed by complementing and bit-reversing whole words.
+
+        :return: New PackedSequence.
+        """
+        return self._reverse_words(complement=True)
@@ -0,0 +1,146 @@
+# Peptide search in nucleotide sequences through codon-degenerate automata.
+#
+# Instead of translating every transcript in every frame and comparing protein strings,
+# a whole peptide library is compiled once:
+#   - the peptides form one Aho-Corasick automaton over the residues they use
+#     (aho_corasick.build_automaton),
+#   - each residue edge is expanded to the set of codons that encode it in codon_table, so
+#     the automaton reads codons directly: its transition table has one column per codon
+#     index 16 * b1 + 4 * b2 + b3 (0-63) plus one for codons with any other character, and
+#     codons of residues that no peptide uses send it back to the root.
+# Scanning computes the codon index starting at every base of the sequence with three
+# vectorized shifts (no protein string is built), then walks each of the three frames of
+# each strand through the automaton with one table lookup per codon. Every hit carries
+# the exact forward-strand coordinates of the encoding nucleotides.
+
+from collections import namedtuple
+
+import numpy as np
+
+from .aho_corasick import build_automaton
+from .translation import _BASE_CODES, _as_bytes, _is_rna, codon_lookup_table
+
+PeptideHit = namedtuple("PeptideHit", ["peptide", "strand", "frame", "start", "end"])
+
+_INVALID_CODON = 64
+
+
+def codon_indices(sequence, rna=None, reverse=False):
+    """
+    Index of the codon starting at every base of a sequence (or of its reverse complement).
+
+    :param sequence: DNA or RNA as str, bytes, Bio.Seq or PackedSequence.
+    :param rna: True for RNA (U), False for DNA (T); None detects it from the sequence.
+    :param reverse: Index the codons of the reverse-complement strand instead.
+    :return: int64 array of length len - 2: 16 * b1 + 4 * b2 + b3, or 64 when a codon has a
+             character other than the four bases (lowercase included, as in translate).
+    """
+    raw = _as_bytes(sequence)
+    codes = _BASE_CODES[_is_rna(raw, rna)][np.frombuffer(raw, dtype=np.uint8)].astype(np.int64)
+    if reverse:
+        codes = np.where(codes < 4, 3 - codes, codes)[::-1]
+    if len(codes) < 3:
+        return np.zeros(0, dtype=np.int64)
+    indices = 16 * codes[:-2] + 4 * codes[1:-1] + codes[2:]
+    indices[(codes[:-2] > 3) | (codes[1:-1] > 3) | (codes[2:] > 3)] = _INVALID_CODON
+    return indices
+
+
+class PeptideScanner:
+    """
+    Find every nucleotide stretch that encodes one of many peptides, in all reading frames.
+
+    Usage:
+        scanner = PeptideScanner(["PRTEIN", "MKV"])
+        scanner.find("CCCAGGACUGAGAUCAAU")
+        # [PeptideHit(peptide='PRTEIN', strand='+', frame=1, start=0, end=18)]
+    """
+
+    def __init__(self, peptides, codon_table=None, both_strands=True):
+        """
+        :param peptides: Iterable of amino-acid strings (one-letter codes, "*" for stop).
+        :param codon_table: RNA codon table; defaults to the standard genetic code.
+        :param both_strands: Also search the three frames of the reverse complement.
+        """
+        self.peptides = []
+        for peptide in peptides:
+            peptide = str(peptide).upper()
+            if peptide and peptide not in self.peptides:
+                self.peptides.append(peptide)
+        if not self.peptides:
+            raise ValueError("At least one non-empty peptide is required")
+        self.both_strands = both_strands
+
+        lookup = codon_lookup_table(codon_table)
+        encoded = set(lookup[:_INVALID_CODON].tobytes().decode("ascii"))
+        residues = sorted(set("".join(self.peptides)))
+        missing = [residue for residue in residues if residue not in encoded]
+        if missing:
+            raise ValueError(f"No codon encodes {', '.join(missing)}")
+        symbol = {residue: index for index, residue in enumerate(residues)}
+        goto, outputs = build_automaton([([symbol[residue] for residue in peptide], index)
+                                         for index, peptide in enumerate(self.peptides)], len(residues))
+
+        # Codon column -> residue symbol, or -1 (back to the root) for unused residues and bad codons
+        codon_symbols = [symbol.get(chr(amino_acid), -1) for amino_acid in lookup[:_INVALID_CODON]]
+        codon_symbols.append(-1)
+        # Flat transition table with states pre-multiplied by 65 (64 codons + invalid column)
+        width = _INVALID_CODON + 1
+        self._delta = []
+        for row in goto:
+            self._delta.extend(row[code] * width if code >= 0 else 0 for code in codon_symbols)
+        self._outputs = [()] * (len(goto) * width)
+        for state, found in enumerate(outputs):
+            self._outputs[state * width] = tuple(found)
+        self.n_states = len(goto)
+
+    def _scan_frames(self, indices):
+        """(strand-relative start, end, peptide index) of every hit in the three frames, sorted."""
+        delta, outputs = self._delta, self._outputs
+        hits = []
+        for frame in range(3):
+            state = 0
+            for codon, index in enumerate(indices[frame::3].tolist()):
+                state = delta[state + index]
+                found = outputs[state]
+                if found:
+                    end = frame + 3 * (codon + 1)
+                    for length, peptide in found:
+                        hits.append((end - 3 * length, end, peptide))
+        hits.sort()
+        return hits
+
+    def find(self, sequence, rna=None):
+        """
+        Every occurrence of every peptide's coding sequence.
+
+        :param sequence: DNA or RNA as str, bytes, Bio.Seq or PackedSequence.
+        :param rna: True for RNA (U), False for DNA (T); None detects it from the sequence.
+        :return: List of PeptideHit(peptide, strand, frame, start, end): start/end are 0-based,
+                 half-open coordinates of the encoding bases on the forward strand and frame
+                 (1-3) is counted on the hit's own strand, as in find_orfs. Hits are sorted
+                 by strand, then by their start on that strand.
+        """
+        raw = _as_bytes(sequence)
+        rna = _is_rna(raw, rna)
+        length = len(raw)
+        result = []
+        for strand in ("+", "-") if self.both_strands else ("+",):
+            indices = codon_indices(raw, rna, reverse=strand == "-")
+            for start, end, peptide in self._scan_frames(indices):
+                frame = start % 3 + 1
+                if strand == "-":
+                    start, end = length - end, length - start
+                result.append(PeptideHit(self.peptides[peptide], strand, frame, start, end))
+        return result
+
+    def iter_hits(self, records, rna=None):
+        """
+        Stream the hits of many transcripts, e.g. IndexedFasta iteration or FASTQ batches.
+
+        :param records: Iterable of (name, sequence) pairs.
+        :return: Generator of (name, PeptideHit) tuples.
+        """
+        for name, sequence in records:
+            for hit in self.find(sequence, rna):
+                yield name, hit
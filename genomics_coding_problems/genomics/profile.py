@@ -0,0 +1,193 @@
+# NumPy position-weight-matrix (profile) core shared by the motif searches (scripts 11-15).
+#
+# A profile is a 4 x k float array, rows A, C, G, T and one column per motif position,
+# built from a one-hot count tensor of the motifs: (t, k) codes -> (t, k, 4) one-hot ->
+# summed over t. Optionally it is kept in log space.
+#
+# Scoring all k-mers of all sequences is one gather: every sequence is encoded once
+# (SequenceSet caches the codes and the window index arrays), all windows of all sequences
+# are stacked in one (windows, k) index matrix, and Pr(k-mer | profile) is the product of
+# profile[code, column] over the columns. The product is accumulated column by column, in
+# the same order as the reference loops (`prob *= profile[base][j]`), so probabilities,
+# arg-max tie-breaking and weighted sampling are bit-for-bit identical to the
+# dict-of-lists implementations.
+
+import numpy as np
+
+from .packed import AMBIGUOUS, BASES, to_codes
+
+_EYE = np.eye(4, dtype=np.int64)
+
+
+def profile_from_dict(profile):
+    """Convert a {'A': [...], 'C': [...], 'G': [...], 'T': [...]} profile into a 4 x k array."""
+    if isinstance(profile, np.ndarray):
+        return profile
+    return np.array([profile[base] for base in BASES], dtype=np.float64)
+
+
+def profile_to_dict(profile):
+    """Convert a 4 x k profile array into the dict-of-lists form used by the scripts."""
+    return {base: profile[row].tolist() for row, base in enumerate(BASES)}
+
+
+def motif_codes(motifs):
+    """Encode equal-length motifs as a (t, k) uint8 code matrix."""
+    codes = np.array([to_codes(motif) for motif in motifs], dtype=np.uint8)
+    if codes.size and (codes == AMBIGUOUS).any():
+        raise ValueError("Motifs must only contain A, C, G, T")
+    return codes
+
+
+def count_matrix(motifs):
+    """
+    4 x k count matrix of a set of motifs (strings or a (t, k) code matrix), via one-hot counts.
+    """
+    codes = motifs if isinstance(motifs, np.ndarray) else motif_codes(motifs)
+    return _EYE[codes].sum(axis=0).T
+
+
+def profile_matrix(motifs, pseudocount=1, log=False):
+    """
+    Profile matrix with pseudocounts.
+
+    :param motifs: List of equal-length strings, or a (t, k) code matrix.
+    :param pseudocount: Added to every count.
+    :param log: Return log probabilities instead of probabilities.
+    :return: 4 x k float array, rows A, C, G, T.
+    """
+    codes = motifs if isinstance(motifs, np.ndarray) else motif_codes(motifs)
+    counts = count_matrix(codes) + pseudocount
+    profile = counts / (len(codes) + 4 * pseudocount)
+    if log:
+        with np.errstate(divide="ignore"):
+            return np.log(profile)
+    return profile
+
+
+def score_motifs(motifs):
+    """
+    Total Hamming distance of the motifs to their consensus: sum over columns of (t - max count).
+    """
+    codes = motifs if isinstance(motifs, np.ndarray) else motif_codes(motifs)
+    counts = count_matrix(codes)
+    return int((len(codes) - counts.max(axis=0)).sum())
+
+
+def score_motif_sets(codes):
+    """
+    score_motifs for a whole batch of motif sets at once.
+
+    :param codes: (sets, t, k) code matrix, one (t, k) motif set per row.
+    :return: int64 array with one score per motif set.
+    """
+    counts = _EYE[codes].sum(axis=1)            # (sets, k, 4)
+    return (codes.shape[1] - counts.max(axis=2)).sum(axis=1)
+
+
+def consensus(motifs):
+    """Consensus string of the motifs (ties broken towards A, C, G, T order)."""
+    return "".join(BASES[i] for i in count_matrix(motifs).argmax(axis=0))
+
+
+class SequenceSet:
+    """
+    A list of DNA sequences encoded once, with cached sliding-window indices per k.
+
+    Usage:
+        dna = SequenceSet(dna_list)
+        positions = dna.most_probable_positions(profile)      # one per sequence
+        motifs = dna.kmers(positions, k)
+    """
+
+    def __init__(self, sequences):
+        self.sequences = [str(sequence) for sequence in sequences]
+        self.codes = [to_codes(sequence) for sequence in self.sequences]
+        for codes in self.codes:
+            if (codes == AMBIGUOUS).any():
+                raise ValueError("Sequences must only contain A, C, G, T")
+        self.lengths = np.array([len(codes) for codes in self.codes], dtype=np.int64)
+        self.offsets = np.concatenate(([0], np.cumsum(self.lengths)))
+        self.all_codes = np.concatenate(self.codes) if self.codes else np.zeros(0, dtype=np.uint8)
+        self._windows = {}
+        self._window_codes = {}
+
+    def __len__(self):
+        return len(self.codes)
+
+    def windows(self, k):
+        """
+        Cached window layout for k-mers of length k.
+
+        :return: Tuple (index, segment_starts, counts): index is a (windows, k) matrix of
+                 positions into all_codes, segment_starts the first window row of each
+                 sequence and counts the number of windows per sequence.
+        """
+        if k not in self._windows:
+            counts = np.maximum(self.lengths - k + 1, 0)
+            if (counts == 0).any():
+                raise ValueError(f"Every sequence must be at least {k} bases long")
+            starts = np.concatenate([self.offsets[i] + np.arange(n) for i, n in enumerate(counts)])
+            index = starts[:, None] + np.arange(k)
+            segment_starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+            self._windows[k] = (index, segment_starts, counts)
+        return self._windows[k]
+
+    def window_codes(self, k):
+        """(windows, k) code matrix of every k-mer of every sequence, computed once per k."""
+        if k not in self._window_codes:
+            index, _, _ = self.windows(k)
+            self._window_codes[k] = self.all_codes[index]
+        return self._window_codes[k]
+
+    def score_windows(self, profile, log=False):
+        """
+        Score every k-mer of every sequence against a profile.
+
+        :param profile: 4 x k array (or dict) of probabilities, or of log probabilities if log=True.
+        :return: 1-D float array with one score per window, windows of sequence i starting at
+                 windows(k)[1][i].
+        """
+        profile = profile_from_dict(profile)
+        k = profile.shape[1]
+        codes = self.window_codes(k)
+        if log:
+            return profile[codes, np.arange(k)].sum(axis=1)
+        scores = np.ones(len(codes))
+        for column in range(k):
+            scores *= profile[codes[:, column], column]
+        return scores
+
+    def most_probable_positions(self, profile, log=False):
+        """
+        Start position of the profile-most-probable k-mer in every sequence (first one on ties).
+        """
+        profile = profile_from_dict(profile)
+        k = profile.shape[1]
+        scores = self.score_windows(profile, log=log)
+        _, segment_starts, counts = self.windows(k)
+        best = np.maximum.reduceat(scores, segment_starts)
+        rows = np.arange(len(scores))
+        is_best = scores == np.repeat(best, counts)
+        first = np.minimum.reduceat(np.where(is_best, rows, len(scores)), segment_starts)
+        return first - segment_starts
+
+    def kmers(self, positions, k):
+        """The k-mers starting at positions[i] in sequence i, as strings."""
+        return [sequence[p:p + k] for sequence, p in zip(self.sequences, positions)]
+
+    def kmer_codes(self, positions, k):
+        """(t, k) code matrix of the k-mers starting at positions[i] in sequence i."""
+        starts = self.offsets[:-1] + np.asarray(positions)
+        return self.all_codes[starts[:, None] + np.arange(k)]
+
+    def sequence_scores(self, index, profile):
+        """Pr(k-mer | profile) for every k-mer of one sequence."""
+        profile = profile_from_dict(profile)
+        k = profile.shape[1]
+        _, segment_starts, counts = self.windows(k)
+        codes = self.window_codes(k)[segment_starts[index]:segment_starts[index] + counts[index]]
+        scores = np.ones(len(codes))
+        for column in range(k):
+            scores *= profile[codes[:, column], column]
+        return scores
@@ -0,0 +1,258 @@
+# Position weight matrix (PWM) scanning with exact p-value thresholds.
+#
+# Multiplying profile probabilities (10_probability_of_a_motif_given_the_profile_matrix.py)
+# underflows for long motifs and gives no notion of significance. Here each profile
+# becomes an integer log-odds matrix:
+#   score[b, j] = round(scale * log2(Pr(b at j) / background[b]))
+# so a window's score is a sum of small integers. Because the scores are integers, the
+# exact distribution of the score of a random background k-mer can be computed column
+# by column by dynamic programming (a convolution over the integer score range), and a
+# score threshold can be derived from a p-value: the smallest score s with
+# Pr(score >= s) <= p.
+#
+# PWMScanner stacks a whole library of PWMs (and their reverse complements) into one
+# (max_k, 5, rows) integer tensor, padded with zero-score columns; code 4 (N or any other
+# non-ACGT base) gets a large negative score so it never matches. Each block of the
+# sequence is scored for every PWM and strand at once (one gather per column), windows
+# at or above their row's threshold are reported, and chunked input carries the last
+# max_k - 1 bases so no hit across a chunk boundary is lost. Hits come out as a compact
+# NumPy record array per block, or as BED lines.
+
+from collections import namedtuple
+
+import numpy as np
+
+from .packed import BASES, iter_sequence_chunks, to_codes
+
+HIT_DTYPE = np.dtype([("pwm", np.int32), ("start", np.int64), ("strand", "S1"), ("score", np.int32)])
+
+ScoreDistribution = namedtuple("ScoreDistribution", ["min_score", "probabilities"])
+
+_UNIFORM = np.full(4, 0.25)
+_EXCLUDED = -(1 << 20)     # score of a non-ACGT base, keeps every sum far below any threshold
+_MAX_CELLS = 1 << 22
+
+
+def _profile_array(profile):
+    if isinstance(profile, dict):
+        profile = [profile[base] for base in BASES]
+    return np.asarray(profile, dtype=np.float64)
+
+
+class PWM:
+    """
+    Integer log-odds matrix of one profile, with its exact background score distribution.
+
+    Usage:
+        pwm = PWM(profile, name="motif1")
+        threshold = pwm.threshold(1e-4)      # score with Pr(score >= threshold) <= 1e-4
+        pwm.score("AAGTTC"), pwm.p_value(pwm.score("AAGTTC"))
+    """
+
+    def __init__(self, profile, name=None, background=None, pseudocount=0.01, scale=100):
+        """
+        :param profile: 4 x k probabilities (or counts) as an array or an {'A': [...], ...} dict.
+        :param name: Name used in BED output.
+        :param background: Length-4 background base frequencies; uniform by default.
+        :param pseudocount: Added to every normalized probability before taking logs, so
+                            zero probabilities give a finite (very low) score.
+        :param scale: Integer score units per bit; larger values discretize more finely.
+        """
+        profile = _profile_array(profile)
+        profile = profile / profile.sum(axis=0)
+        profile = (profile + pseudocount) / (1 + 4 * pseudocount)
+        self.background = _UNIFORM if background is None else np.asarray(background, dtype=np.float64)
+        self.name = name
+        self.scale = scale
+        self.matrix = np.rint(scale * np.log2(profile / self.background[:, None])).astype(np.int32)
+        self._distribution = None
+
+    def __len__(self):
+        return self.matrix.shape[1]
+
+    def __repr__(self):
+        return f"PWM(name={self.name!r}, length={len(self)})"
+
+    def score(self, kmer):
+        """Integer log-odds score of one k-mer (None if it contains a base other than A/C/G/T)."""
+        codes = to_codes(kmer)
+        if len(codes) != len(self) or (codes > 3).any():
+            return None
+        return int(self.matrix[codes, np.arange(len(self))].sum())
+
+    def score_distribution(self):
+        """
+        Exact distribution of the score of a random background k-mer.
+
+        :return: ScoreDistribution(min_score, probabilities): probabilities[i] is
+                 Pr(score == min_score + i).
+        """
+        if self._distribution is None:
+            probabilities = np.ones(1)
+            min_score = 0
+            for column in self.matrix.T:
+                low = int(column.min())
+                shifted = column - low
+                following = np.zeros(len(probabilities) + int(shifted.max()))
+                for base in range(4):
+                    following[shifted[base]:shifted[base] + len(probabilities)] += \
+                        probabilities * self.background[base]
+                probabilities = following
+                min_score += low
+            self._distribution = ScoreDistribution(min_score, probabilities)
+        return self._distribution
+
+    def p_value(self, score):
+        """Pr(score of a random background k-mer >= score)."""
+        min_score, probabilities = self.score_distribution()
+        index = min(max(int(score) - min_score, 0), len(probabilities))
+        return float(probabilities[index:].sum())
+
+    def threshold(self, p_value):
+        """Smallest integer score whose p-value is at most p_value."""
+        min_score, probabilities = self.score_distribution()
+        tails = np.cumsum(probabilities[::-1])[::-1]   # tails[i] = Pr(score >= min_score + i)
+        passing = np.flatnonzero(tails <= p_value)
+        return min_score + (int(passing[0]) if len(passing) else len(probabilities))
+
+    def reverse_complement(self):
+        """
+        PWM of the reverse strand (columns reversed, A<->T and C<->G swapped), scored
+        against the same forward-strand sequence.
+
+        The background stays that of the scanned sequence, so the score distribution is
+        recomputed: it equals the forward matrix's distribution under the complemented
+        background, and differs from the forward one unless the background is
+        strand-symmetric (Pr(A) = Pr(T) and Pr(C) = Pr(G)).
+        """
+        rc = object.__new__(PWM)
+        rc.background = self.background
+        rc.name = self.name
+        rc.scale = self.scale
+        rc.matrix = self.matrix[::-1, ::-1].copy()
+        rc._distribution = None
+        return rc
+
+
+class PWMScanner:
+    """
+    Scan sequences for a whole library of PWMs, on both strands, in one pass.
+
+    Usage:
+        scanner = PWMScanner([PWM(p, name=n) for n, p in profiles.items()], p_value=1e-4)
+        for hits in scanner.scan(fasta.iter_chunks("chr1")):    # record arrays (HIT_DTYPE)
+            ...
+        scanner.write_bed(handle, "chr1", fasta.iter_chunks("chr1"))
+    """
+
+    def __init__(self, pwms, p_value=1e-4, thresholds=None, both_strands=True):
+        """
+        :param pwms: List of PWM objects (or of profiles, which are converted with defaults).
+        :param p_value: p-value used to derive each PWM's score threshold.
+        :param thresholds: Optional explicit integer thresholds, one per PWM and used on both
+                           strands (overrides p_value).
+        :param both_strands: Also scan the reverse strand.
+        """
+        self.pwms = [pwm if isinstance(pwm, PWM) else PWM(pwm) for pwm in pwms]
+        if not self.pwms:
+            raise ValueError("At least one PWM is required")
+        self.both_strands = both_strands
+        self.width = max(len(pwm) for pwm in self.pwms)
+
+        # Rows: every PWM on "+", then every PWM on "-"
+        strands = [(pwm, b"+") for pwm in self.pwms]
+        if both_strands:
+            strands += [(pwm.reverse_complement(), b"-") for pwm in self.pwms]
+        if thresholds is None:
+            # Each strand gets its own threshold: with a skewed background the reverse
+            # strand's score distribution differs from the forward one
+            row_thresholds = [pwm.threshold(p_value) for pwm, _ in strands]
+        else:
+            row_thresholds = list(thresholds) * (2 if both_strands else 1)
+        self._row_threshold = np.asarray(row_thresholds, dtype=np.int32)
+        self.thresholds = self._row_threshold[:len(self.pwms)]
+        # (width, 5, rows): one contiguous row of scores per (column, base) lookup
+        self._tensor = np.zeros((self.width, 5, len(strands)), dtype=np.int32)
+        for row, (pwm, _) in enumerate(strands):
+            self._tensor[:len(pwm), :4, row] = pwm.matrix.T
+            self._tensor[:len(pwm), 4, row] = _EXCLUDED
+        self._row_pwm = np.tile(np.arange(len(self.pwms), dtype=np.int32), 2 if both_strands else 1)
+        self._row_strand = np.array([strand for _, strand in strands], dtype="S1")
+
+    def _score_block(self, codes, n, offset):
+        """Hits among the first n windows of codes (which holds n + width - 1 codes)."""
+        scores = self._tensor[0][codes[:n]]
+        for column in range(1, self.width):
+            scores += self._tensor[column][codes[column:column + n]]
+        # (windows, rows) order: hits come out sorted by start, then row
+        starts, rows = np.nonzero(scores >= self._row_threshold)
+        hits = np.empty(len(rows), dtype=HIT_DTYPE)
+        hits["pwm"] = self._row_pwm[rows]
+        hits["start"] = starts + offset
+        hits["strand"] = self._row_strand[rows]
+        hits["score"] = scores[starts, rows]
+        return hits
+
+    def scan(self, sequence, chunk_size=1 << 20):
+        """
+        Stream the hits of every PWM over one sequence.
+
+        :param sequence: str, bytes, Bio.Seq, PackedSequence, or an iterable of consecutive
+                         chunks (pieces or (start, piece) tuples from IndexedFasta.iter_chunks
+                         with overlap=0).
+        :param chunk_size: Bases per chunk when a single sequence is given.
+        :return: Generator of HIT_DTYPE record arrays (pwm index, 0-based start, strand, score),
+                 ordered by start then PWM row; empty blocks are skipped.
+        """
+        block = max(1, _MAX_CELLS // self._tensor.shape[2])
+        carry = np.zeros(0, dtype=np.uint8)
+        offset = 0   # position of carry[0] in the whole sequence
+        for chunk in iter_sequence_chunks(sequence, chunk_size):
+            if isinstance(chunk, tuple):
+                start, chunk = chunk
+                if start != offset + len(carry):
+                    raise ValueError("Chunks must be consecutive and non-overlapping")
+            codes = np.concatenate((carry, to_codes(chunk)))
+            n = len(codes) - self.width + 1
+            for begin in range(0, max(n, 0), block):
+                count = min(block, n - begin)
+                hits = self._score_block(codes[begin:begin + count + self.width - 1], count, offset + begin)
+                if len(hits):
+                    yield hits
+            consumed = max(n, 0)
+            offset += consumed
+            carry = codes[consumed:]
+        # Windows of the last width - 1 positions: pad with non-ACGT so only PWMs that fit match
+        if len(carry):
+            codes = np.concatenate((carry, np.full(self.width - 1, 4, dtype=np.uint8)))
+            hits = self._score_block(codes, len(carry), offset)
+            if len(hits):
+                yield hits
+
+    def find(self, sequence, chunk_size=1 << 20):
+        """All hits of scan() in one record array."""
+        blocks = list(self.scan(sequence, chunk_size))
+        return np.concatenate(blocks) if blocks else np.zeros(0, dtype=HIT_DTYPE)
+
+    def iter_bed(self, chrom, sequence, chunk_size=1 << 20):
+        """
+        Hits as BED6 lines (chrom, start, end, name, score, strand), name being the PWM name
+        (or its index) and score the integer log-odds score.
+        """
+        names = [pwm.name if pwm.name is not None else str(index) for index, pwm in enumerate(self.pwms)]
+        lengths = [len(pwm) for pwm in self.pwms]
+        for hits in self.scan(sequence, chunk_size):
+            for pwm, start, strand, score in hits.tolist():
+                yield f"{chrom}\t{start}\t{start + lengths[pwm]}\t{names[pwm]}\t{score}\t{strand.decode()}\n"
+
+    def write_bed(self, handle, chrom, sequence, chunk_size=1 << 20):
+        """
+        Write the hits on one sequence to an open text handle in BED format.
+
+        :return: Number of hits written.
+        """
+        written = 0
+        for line in self.iter_bed(chrom, sequence, chunk_size):
+            handle.write(line)
+            written += 1
+        return written
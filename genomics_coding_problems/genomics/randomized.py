@@ -0,0 +1,98 @@
+# Randomized motif search with all restarts advanced together as one tensor computation.
+#
+# RandomizedMotifSearch starts from one random k-mer per sequence and repeats
+#   Profile(Motifs) -> Motifs(Profile, Dna)
+# while the score keeps improving. Here the state of every restart is one row of a
+# (restarts, sequences) matrix of motif start positions. Each step, for all restarts still
+# running:
+#   - the (restarts, t, k) motif codes give one-hot counts and (restarts, 4, k) profiles,
+#   - every window of every sequence is scored against every profile with one gather per
+#     column (a (restarts, windows) matrix, column-sequential product as in SequenceSet),
+#   - np.maximum.reduceat over the sequence segments picks the first most probable window
+#     of every sequence for every restart,
+#   - restarts whose new motifs do not score strictly better have converged: they keep
+#     their best motifs and are masked out of the following steps.
+# Restarts are processed in batches so the (restarts, windows) score matrix stays bounded.
+
+from collections import namedtuple
+
+import numpy as np
+
+from .profile import _EYE, SequenceSet, score_motif_sets
+
+RandomizedResult = namedtuple("RandomizedResult", ["motifs", "score", "restart", "iterations"])
+
+_MAX_CELLS = 1 << 22
+
+
+def most_probable_positions_batch(sequences, profiles):
+    """
+    Profile-most-probable window of every sequence for a batch of profiles.
+
+    :param sequences: SequenceSet.
+    :param profiles: (restarts, 4, k) array of probabilities.
+    :return: (restarts, t) array of window starts (first one on ties).
+    """
+    k = profiles.shape[2]
+    _, segment_starts, counts = sequences.windows(k)
+    codes = sequences.window_codes(k)
+    scores = np.ones((len(profiles), len(codes)))
+    for column in range(k):
+        scores *= profiles[:, :, column][:, codes[:, column]]
+    best = np.maximum.reduceat(scores, segment_starts, axis=1)
+    rows = np.arange(len(codes))
+    is_best = scores == np.repeat(best, counts, axis=1)
+    first = np.minimum.reduceat(np.where(is_best, rows, len(codes)), segment_starts, axis=1)
+    return first - segment_starts
+
+
+def _profiles(motif_codes, pseudocount):
+    """(restarts, t, k) motif codes -> (restarts, 4, k) profiles with pseudocounts."""
+    counts = _EYE[motif_codes].sum(axis=1).transpose(0, 2, 1) + pseudocount
+    return counts / (motif_codes.shape[1] + 4 * pseudocount)
+
+
+def randomized_motif_search(dna, k, restarts=1000, seed=None, max_iterations=None, pseudocount=1):
+    """
+    Randomized motif search with many restarts iterated to convergence.
+
+    :param dna: List of DNA sequences (str, Bio.Seq, PackedSequence) or a SequenceSet.
+    :param k: Motif length.
+    :param restarts: Number of random restarts.
+    :param seed: Seed for numpy.random.default_rng; the starting motifs of all restarts are
+                 drawn from it, so runs are reproducible.
+    :param max_iterations: Optional cap on the number of steps per restart.
+    :param pseudocount: Added to every count when building profiles.
+    :return: RandomizedResult(motifs, score, restart, iterations): the best motif set (lowest
+             score, first restart on ties), its score, the restart it came from and the total
+             number of restart steps computed.
+    """
+    sequences = dna if isinstance(dna, SequenceSet) else SequenceSet(dna)
+    _, segment_starts, counts = sequences.windows(k)
+    window_codes = sequences.window_codes(k)
+    rng = np.random.default_rng(seed)
+
+    positions = rng.integers(counts, size=(restarts, len(sequences)))
+    best_scores = score_motif_sets(window_codes[segment_starts + positions])
+    batch = max(1, _MAX_CELLS // len(window_codes))
+    active = np.arange(restarts)
+    steps = 0
+    iteration = 0
+    while len(active) and (max_iterations is None or iteration < max_iterations):
+        iteration += 1
+        steps += len(active)
+        improved = np.zeros(len(active), dtype=bool)
+        for start in range(0, len(active), batch):
+            rows = active[start:start + batch]
+            profiles = _profiles(window_codes[segment_starts + positions[rows]], pseudocount)
+            candidates = most_probable_positions_batch(sequences, profiles)
+            scores = score_motif_sets(window_codes[segment_starts + candidates])
+            better = scores < best_scores[rows]
+            positions[rows[better]] = candidates[better]
+            best_scores[rows[better]] = scores[better]
+            improved[start:start + batch] = better
+        # Converged restarts are masked out of the next steps
+        active = active[improved]
+
+    restart = int(best_scores.argmin())
+    return RandomizedResult(sequences.kmers(positions[restart], k), int(best_scores[restart]), restart, steps)
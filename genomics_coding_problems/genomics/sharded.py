@@ -0,0 +1,354 @@
+# Chromosome-sharded parallel scans over sequences held in shared memory.
+#
+# Handing a 200 Mb chromosome to a process pool as a str pickles it for every task. Here
+# all sequences are copied once into one multiprocessing.shared_memory block (ASCII, one
+# byte per base, chromosomes back to back) and workers attach to it by name; a task
+# message is just (task, chromosome offset, shard, parameters).
+#
+# Each chromosome is cut into shards of shard_size bases. A shard owns the positions
+# [start, end) and reads [start, end + overlap), with an overlap of k - 1 for k-mer
+# counting or of the longest pattern minus one for motif scans, so every window that
+# starts in the shard is seen whole. Only windows that start in the owned range are
+# reported, so no boundary hit is lost or counted twice.
+#
+# Partial results are merged per chromosome by a reducer specific to the task:
+#   - motif counts and k-mer counts are summed,
+#   - motif positions (already offset to chromosome coordinates) are concatenated in
+#     shard order,
+#   - GC skew shards report their local total, minimum and maximum; the skew of a shard
+#     is its local skew plus the total of all shards before it, so the global extremes
+#     and their positions follow from the running prefix.
+
+from collections import namedtuple
+
+import numpy as np
+
+Shard = namedtuple("Shard", ["chrom", "start", "end", "read_end"])
+
+_BUFFER = None     # the shared sequence buffer, as seen by this process
+_SHARED = None     # keeps a worker's attachment alive
+_SCANNERS = {}     # compiled motif scanners, reused across the shards of one worker
+
+
+def _attach(name):
+    global _SHARED, _BUFFER
+    from multiprocessing import shared_memory
+
+    _SHARED = shared_memory.SharedMemory(name=name)
+    _BUFFER = _SHARED.buf
+
+
+def _as_ascii(piece):
+    if isinstance(piece, str):
+        return piece.upper().encode("ascii")
+    if isinstance(piece, (bytes, bytearray, memoryview)):
+        return bytes(piece).upper()
+    return str(piece).upper().encode("ascii")   # Bio.Seq, PackedSequence
+
+
+class SharedGenome:
+    """
+    Sequences copied once into a shared-memory block, addressed by name.
+
+    Usage:
+        with SharedGenome("genome.fa") as genome:
+            genome.view("chr1", 0, 1000)    # zero-copy memoryview of ASCII bases
+    """
+
+    def __init__(self, sequences, chunk_size=1 << 22):
+        """
+        :param sequences: Path to a FASTA file (streamed in chunks through IndexedFasta),
+                          a {name: sequence} dict, or an iterable of (name, sequence) pairs.
+        :param chunk_size: Bases copied per step when reading a FASTA file.
+        """
+        from multiprocessing import shared_memory
+
+        fasta = None
+        if isinstance(sequences, str):
+            from .fastx import IndexedFasta
+            fasta = IndexedFasta(sequences)
+            lengths = fasta.lengths
+        else:
+            sequences = dict(sequences)
+            lengths = {name: len(sequence) for name, sequence in sequences.items()}
+
+        self.index = {}
+        offset = 0
+        for name, length in lengths.items():
+            self.index[name] = (offset, length)
+            offset += length
+        self._memory = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        self.name = self._memory.name
+        try:
+            for name, (offset, length) in self.index.items():
+                if fasta is not None:
+                    for start, piece in fasta.iter_chunks(name, chunk_size):
+                        self._memory.buf[offset + start:offset + start + len(piece)] = _as_ascii(piece)
+                else:
+                    self._memory.buf[offset:offset + length] = _as_ascii(sequences[name])
+        except BaseException:
+            self.close()
+            raise
+        finally:
+            if fasta is not None:
+                fasta.close()
+
+    @property
+    def references(self):
+        """Sequence names in input order."""
+        return list(self.index)
+
+    @property
+    def lengths(self):
+        return {name: length for name, (_, length) in self.index.items()}
+
+    @property
+    def buffer(self):
+        return self._memory.buf
+
+    def view(self, chrom, start=0, end=None):
+        """Zero-copy memoryview of a region (0-based, half-open)."""
+        offset, length = self.index[chrom]
+        end = length if end is None else min(end, length)
+        return self._memory.buf[offset + start:offset + end]
+
+    def close(self):
+        """Release and remove the shared block."""
+        if self._memory is not None:
+            self._memory.close()
+            self._memory.unlink()
+            self._memory = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# ----------------------------------------------------------------------
+# Per-shard work; `sequence` holds bases [shard.start, shard.read_end)
+# ----------------------------------------------------------------------
+
+def _motif_hits(sequence, shard, patterns, both_strands):
+    from .aho_corasick import MotifScanner, _distinct_sites
+
+    key = (tuple(patterns), both_strands)
+    if key not in _SCANNERS:
+        _SCANNERS[key] = MotifScanner(patterns, both_strands)
+    owned = shard.end - shard.start
+    # Sites, as MotifScanner.count/find: a palindromic motif counts once per position
+    for pattern, start, strand in _distinct_sites(_SCANNERS[key].iter_hits([sequence])):
+        if start < owned:
+            yield pattern, shard.start + start, strand
+
+
+def _count_motifs_shard(sequence, shard, patterns, both_strands=False):
+    counts = {}
+    for pattern, _, _ in _motif_hits(sequence, shard, patterns, both_strands):
+        counts[pattern] = counts.get(pattern, 0) + 1
+    return counts
+
+
+def _find_motifs_shard(sequence, shard, patterns, both_strands=False):
+    positions = {}
+    for pattern, start, _ in _motif_hits(sequence, shard, patterns, both_strands):
+        positions.setdefault(pattern, []).append(start)
+    return positions
+
+
+def _count_kmers_shard(sequence, shard, k):
+    from .kmers import KmerCounter
+    # The shard reads exactly k - 1 bases past its end, so every k-mer it sees starts in it
+    return KmerCounter(k).add(sequence).items()
+
+
+def _skew_shard(sequence, shard):
+    from .packed import to_codes
+
+    codes = to_codes(sequence)
+    skew = np.cumsum((codes == 2).astype(np.int64) - (codes == 1))
+    if len(skew) == 0:
+        return 0, 0, None, [], None, []
+    low, high = int(skew.min()), int(skew.max())
+    # 1-based chromosome positions, as in gc_skew
+    return (len(skew), int(skew[-1]), low, (np.flatnonzero(skew == low) + shard.start + 1).tolist(),
+            high, (np.flatnonzero(skew == high) + shard.start + 1).tolist())
+
+
+# ----------------------------------------------------------------------
+# Reducers: partial results of one chromosome, in shard order -> result
+# ----------------------------------------------------------------------
+
+def _sum_counts(partials, patterns, both_strands=False):
+    counts = dict.fromkeys(dict.fromkeys(str(pattern).upper() for pattern in patterns), 0)
+    for partial in partials:
+        for pattern, count in partial.items():
+            counts[pattern] += count
+    return counts
+
+
+def _concatenate_positions(partials, patterns, both_strands=False):
+    positions = {pattern: [] for pattern in dict.fromkeys(str(pattern).upper() for pattern in patterns)}
+    for partial in partials:
+        for pattern, found in partial.items():
+            positions[pattern].extend(found)
+    return positions
+
+
+def _merge_kmer_counts(partials, k):
+    from .kmers import KmerCounter
+
+    counter = KmerCounter(k)
+    for keys, counts in partials:
+        counter.add_counts(keys, counts)
+    return counter
+
+
+def _combine_skew(partials):
+    from .skew import SkewResult
+
+    carry = length = 0
+    min_skew = max_skew = None
+    min_positions, max_positions = [], []
+    for shard_length, total, low, low_positions, high, high_positions in partials:
+        length += shard_length
+        if low is None:
+            continue
+        low, high = low + carry, high + carry
+        if min_skew is None or low < min_skew:
+            min_skew, min_positions = low, []
+        if low == min_skew:
+            min_positions.extend(low_positions)
+        if max_skew is None or high > max_skew:
+            max_skew, max_positions = high, []
+        if high == max_skew:
+            max_positions.extend(high_positions)
+        carry += total
+    return SkewResult(length, min_skew, min_positions, max_skew, max_positions, None)
+
+
+def _no_overlap(**params):
+    return 0
+
+
+def _pattern_overlap(patterns, **params):
+    return max(len(pattern) for pattern in patterns) - 1
+
+
+def _kmer_overlap(k, **params):
+    return k - 1
+
+
+# Task name -> (overlap(params), shard function, reducer)
+TASKS = {
+    "count_motifs": (_pattern_overlap, _count_motifs_shard, _sum_counts),
+    "find_motifs": (_pattern_overlap, _find_motifs_shard, _concatenate_positions),
+    "count_kmers": (_kmer_overlap, _count_kmers_shard, _merge_kmer_counts),
+    "gc_skew": (_no_overlap, _skew_shard, _combine_skew),
+}
+
+
+def _run_shard(args):
+    task, offset, shard, params = args
+    sequence = _BUFFER[offset + shard.start:offset + shard.read_end]
+    try:
+        return TASKS[task][1](sequence, shard, **params)
+    finally:
+        sequence.release()
+
+
+class ShardedExecutor:
+    """
+    Run scans over every chromosome in parallel, shard by shard, from shared memory.
+
+    Usage:
+        with ShardedExecutor("genome.fa", processes=8) as executor:
+            executor.count_motifs(["TGT", "GAT"])      # {chrom: {motif: count}}
+            executor.gc_skew()                         # {chrom: SkewResult}
+            executor.count_kmers(11)["chr1"].most_frequent_kmers()
+    """
+
+    def __init__(self, sequences, shard_size=1 << 22, processes=None):
+        """
+        :param sequences: FASTA path, {name: sequence} dict or (name, sequence) pairs (see SharedGenome).
+        :param shard_size: Bases owned by each shard.
+        :param processes: Worker processes; 1 runs every shard in this process, None uses os.cpu_count().
+        """
+        if shard_size <= 0:
+            raise ValueError("shard_size must be positive")
+        self.genome = sequences if isinstance(sequences, SharedGenome) else SharedGenome(sequences)
+        self.shard_size = shard_size
+        self.processes = processes
+        self._pool = None
+
+    def shards(self, overlap, chroms=None):
+        """Shards of the chosen chromosomes (all by default), in chromosome then position order."""
+        result = []
+        for chrom in chroms or self.genome.references:
+            length = self.genome.index[chrom][1]
+            for start in range(0, length, self.shard_size):
+                end = min(start + self.shard_size, length)
+                result.append(Shard(chrom, start, end, min(end + overlap, length)))
+        return result
+
+    def run(self, task, chroms=None, **params):
+        """
+        Run one task over every shard and reduce the partial results per chromosome.
+
+        :param task: Name in TASKS ("count_motifs", "find_motifs", "count_kmers", "gc_skew").
+        :param chroms: Chromosomes to scan; None scans all of them.
+        :param params: Parameters of the task.
+        :return: Dictionary chromosome -> reduced result.
+        """
+        overlap, _, reducer = TASKS[task]
+        chroms = chroms or self.genome.references
+        shards = self.shards(overlap(**params), chroms)
+        jobs = [(task, self.genome.index[shard.chrom][0], shard, params) for shard in shards]
+        if self.processes == 1:
+            global _BUFFER
+            previous, _BUFFER = _BUFFER, self.genome.buffer
+            try:
+                partials = [_run_shard(job) for job in jobs]
+            finally:
+                _BUFFER = previous
+        else:
+            if self._pool is None:
+                from multiprocessing import Pool
+                self._pool = Pool(self.processes, initializer=_attach, initargs=(self.genome.name,))
+            partials = self._pool.map(_run_shard, jobs, chunksize=1)
+
+        grouped = {chrom: [] for chrom in chroms}
+        for shard, partial in zip(shards, partials):
+            grouped[shard.chrom].append(partial)
+        return {chrom: reducer(parts, **params) for chrom, parts in grouped.items()}
+
+    def count_motifs(self, patterns, both_strands=False, chroms=None):
+        """Overlapping occurrences of every motif per chromosome (as MotifScanner.count)."""
+        return self.run("count_motifs", chroms, patterns=list(patterns), both_strands=both_strands)
+
+    def find_motifs(self, patterns, both_strands=False, chroms=None):
+        """0-based start positions of every motif per chromosome (as MotifScanner.find)."""
+        return self.run("find_motifs", chroms, patterns=list(patterns), both_strands=both_strands)
+
+    def count_kmers(self, k, chroms=None):
+        """KmerCounter per chromosome."""
+        return self.run("count_kmers", chroms, k=k)
+
+    def gc_skew(self, chroms=None):
+        """SkewResult per chromosome (without a track), as gc_skew."""
+        return self.run("gc_skew", chroms)
+
+    def close(self):
+        """Stop the workers and remove the shared block."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        self.genome.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,132 @@
+# GC skew with NumPy cumulative sums.
+#
+# Skew[i] = #G - #C in the first i bases. Each chunk of the genome is turned into a +1/-1/0
+# step array, cumulatively summed and shifted by the skew carried over from the previous
+# chunks, so the genome is processed with bounded memory and no Python loop per base.
+# Positions are 1-based like find_minimum_skew in 05_minimum_gc_skew.py: position i is the
+# skew after reading i bases.
+#
+# Besides every position of the minimum (a candidate replication origin, ori) and of the
+# maximum (the terminus, ter), a downsampled cumulative track or a windowed
+# (G - C) / (G + C) track can be emitted for plotting whole chromosomes.
+
+from collections import namedtuple
+
+import numpy as np
+
+from .packed import iter_sequence_chunks, to_codes
+
+SkewResult = namedtuple("SkewResult", ["length", "min_skew", "min_positions",
+                                       "max_skew", "max_positions", "track"])
+
+_C, _G = 1, 2
+_CHUNK = 1 << 22
+
+
+def gc_skew(sequence, chunk_size=_CHUNK, track_step=None):
+    """
+    Scan the skew of a sequence chunk by chunk.
+
+    :param sequence: str, bytes, Bio.Seq, PackedSequence, or an iterable of consecutive
+                     chunks (e.g. IndexedFasta.iter_chunks(chrom) with overlap=0).
+    :param chunk_size: Bases per vectorized chunk when a single sequence is given.
+    :param track_step: If set, also return the skew at every track_step-th position.
+    :return: SkewResult(length, min_skew, min_positions, max_skew, max_positions, track);
+             positions are 1-based lists, track is (positions, values) NumPy arrays or None.
+             For an empty sequence min/max are None and the position lists are empty.
+    """
+    offset = 0
+    carry = 0
+    min_skew = max_skew = None
+    min_positions, max_positions = [], []
+    track_positions, track_values = [], []
+
+    for chunk in iter_sequence_chunks(sequence, chunk_size):
+        if isinstance(chunk, tuple):   # (start, piece) from IndexedFasta.iter_chunks
+            start, chunk = chunk
+            if start != offset:
+                raise ValueError("Chunks must be consecutive and non-overlapping")
+        codes = to_codes(chunk)
+        if len(codes) == 0:
+            continue
+        steps = (codes == _G).astype(np.int64) - (codes == _C)
+        skew = np.cumsum(steps) + carry
+
+        low, high = int(skew.min()), int(skew.max())
+        if min_skew is None or low < min_skew:
+            min_skew, min_positions = low, []
+        if low == min_skew:
+            min_positions.extend((np.flatnonzero(skew == low) + offset + 1).tolist())
+        if max_skew is None or high > max_skew:
+            max_skew, max_positions = high, []
+        if high == max_skew:
+            max_positions.extend((np.flatnonzero(skew == high) + offset + 1).tolist())
+
+        if track_step:
+            # Positions track_step, 2 * track_step, ... (1-based) that fall in this chunk
+            first = (-offset - 1) % track_step
+            picks = np.arange(first, len(skew), track_step)
+            track_positions.append(picks + offset + 1)
+            track_values.append(skew[picks])
+
+        carry = int(skew[-1])
+        offset += len(codes)
+
+    track = None
+    if track_step:
+        track = (np.concatenate(track_positions) if track_positions else np.zeros(0, dtype=np.int64),
+                 np.concatenate(track_values) if track_values else np.zeros(0, dtype=np.int64))
+    return SkewResult(offset, min_skew, min_positions, max_skew, max_positions, track)
+
+
+def windowed_gc_skew(sequence, window, step=None):
+    """
+    (G - C) / (G + C) in sliding windows, the usual plot for whole bacterial chromosomes.
+
+    :param sequence: str, bytes, Bio.Seq or PackedSequence.
+    :param window: Window length in bases.
+    :param step: Distance between window starts; defaults to window (non-overlapping).
+    :return: Tuple (starts, values): 0-based window starts and skew values (NaN when a window has no G or C).
+    """
+    step = step or window
+    if window <= 0 or step <= 0:
+        raise ValueError("window and step must be positive")
+    codes = to_codes(sequence)
+    g = np.concatenate(([0], np.cumsum(codes == _G)))
+    c = np.concatenate(([0], np.cumsum(codes == _C)))
+    starts = np.arange(0, max(len(codes) - window + 1, 0), step)
+    g_counts = g[starts + window] - g[starts]
+    c_counts = c[starts + window] - c[starts]
+    total = g_counts + c_counts
+    with np.errstate(invalid="ignore", divide="ignore"):
+        values = np.where(total > 0, (g_counts - c_counts) / total, np.nan)
+    return starts, values
+
+
+def _skew_record(args):
+    from .fastx import IndexedFasta
+
+    fasta_path, name, chunk_size, track_step = args
+    with IndexedFasta(fasta_path) as fasta:
+        return name, gc_skew(fasta.iter_chunks(name, chunk_size), track_step=track_step)
+
+
+def gc_skew_fasta(fasta_path, processes=None, chunk_size=_CHUNK, track_step=None):
+    """
+    Skew of every record of a (multi-)FASTA file, one record per worker process.
+    Each worker streams its record from the memory-mapped file, so memory stays bounded.
+
+    :param fasta_path: Path to an uncompressed FASTA file (a .fai index is built if missing).
+    :param processes: Number of worker processes; None uses os.cpu_count().
+    :return: Dictionary record name -> SkewResult, in file order.
+    """
+    from multiprocessing import Pool
+
+    from .fastx import IndexedFasta
+
+    with IndexedFasta(fasta_path) as fasta:
+        names = fasta.references
+    jobs = [(fasta_path, name, chunk_size, track_step) for name in names]
+    with Pool(processes) as pool:
+        results = dict(pool.map(_skew_record, jobs))
+    return {name: results[name] for name in names}
@@ -0,0 +1,158 @@
+# Reverse-complement strand views and bulk reverse complementing.
+#
+# ReverseComplement wraps a sequence (str, bytes, bytearray, memoryview, Bio.Seq,
+# PackedSequence or an array of 2-bit codes) without copying it: position i of the view is
+# the complement of base len - 1 - i of the underlying region, and slicing with step 1
+# returns another view over a narrower region of the same buffer. Bases are only produced
+# when something asks for them:
+#   - codes() reverses a zero-copy NumPy view of the buffer and maps it through a
+#     complement lookup table in one gather (this is what to_codes uses, so every scanner
+#     built on it accepts a view),
+#   - bytes()/str() use bytes.translate, so byte-oriented code (Aho-Corasick, FM-index,
+#     translation) accepts it as well,
+#   - chunked scanners slice the view, so only one chunk of the reverse strand exists at a
+#     time.
+# reverse_complement_many handles millions of short reads at once: the reads are joined,
+# translated and reversed as one buffer and split again, all in C.
+
+import numpy as np
+
+from .packed import AMBIGUOUS, PackedSequence
+
+# ASCII complement, IUPAC ambiguity codes and case preserved (U complements to A)
+_COMPLEMENT = bytes.maketrans(b"ACGTUNRYSWKMBVDHacgtunryswkmbvdh", b"TGCAANYRSWMKVBHDtgcaanyrswmkvbhd")
+# ASCII -> complement 2-bit code (AMBIGUOUS for anything other than A/C/G/T)
+_COMPLEMENT_CODES = np.full(256, AMBIGUOUS, dtype=np.uint8)
+for _code, _base in enumerate("TGCA"):
+    _COMPLEMENT_CODES[ord(_base)] = _code
+    _COMPLEMENT_CODES[ord(_base.lower())] = _code
+# 2-bit code -> complement code
+_CODE_COMPLEMENT = np.array([3, 2, 1, 0, AMBIGUOUS], dtype=np.uint8)
+
+
+class ReverseComplement:
+    """
+    Lazy reverse-complement view of a sequence region; nothing is copied until bases are read.
+
+    Usage:
+        minus = ReverseComplement(chromosome)
+        minus[:10]                      # another view (first 10 bases of the reverse strand)
+        KmerCounter(11).add(minus)      # scanners take it like any other sequence
+        str(minus[100:200])             # materialized with bytes.translate
+    """
+
+    __slots__ = ("_sequence", "_start", "_length")
+
+    def __init__(self, sequence, start=0, end=None):
+        """
+        :param sequence: str, bytes, bytearray, memoryview, Bio.Seq, PackedSequence or an
+                         array of 2-bit codes.
+        :param start: First base of the forward-strand region (0-based).
+        :param end: One past the last base of the forward-strand region; None means the end.
+        """
+        if isinstance(sequence, (bytes, bytearray)):
+            sequence = memoryview(sequence)
+        end = len(sequence) if end is None else min(end, len(sequence))
+        self._sequence = sequence
+        self._start = max(0, start)
+        self._length = max(0, end - self._start)
+
+    def _forward(self, start, end):
+        """Forward-strand bases [start, end) of the view's region, as the underlying type."""
+        return self._sequence[self._start + start:self._start + end]
+
+    def forward(self):
+        """The forward-strand region under this view (a memoryview for byte buffers)."""
+        return self._forward(0, self._length)
+
+    def reverse_complement(self):
+        """Reverse complement of the view, i.e. its forward-strand region."""
+        return self.forward()
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self._length)
+            if step == 1:
+                stop = max(start, stop)
+                # Reverse-strand [start, stop) is forward-strand [length - stop, length - start)
+                return ReverseComplement(self._sequence, self._start + self._length - stop,
+                                         self._start + self._length - start)
+            return str(self)[key]
+        if key < 0:
+            key += self._length
+        if not 0 <= key < self._length:
+            raise IndexError("ReverseComplement index out of range")
+        return str(self[key:key + 1])
+
+    def codes(self):
+        """
+        One complement code per base of the view.
+
+        :return: uint8 NumPy array with codes 0-3 for A, C, G, T and AMBIGUOUS for anything else.
+        """
+        region = self.forward()
+        if isinstance(region, np.ndarray):
+            return _CODE_COMPLEMENT[region[::-1]]
+        if isinstance(region, PackedSequence):
+            return region.reverse_complement().codes()
+        return _COMPLEMENT_CODES[np.frombuffer(_raw(region), dtype=np.uint8)[::-1]]
+
+    def __bytes__(self):
+        region = self.forward()
+        if isinstance(region, np.ndarray):
+            return np.frombuffer(b"TGCAN", dtype=np.uint8)[region[::-1]].tobytes()
+        return bytes(_raw(region)).translate(_COMPLEMENT)[::-1]
+
+    def __str__(self):
+        return bytes(self).decode("ascii")
+
+    def __repr__(self):
+        text = str(self) if self._length <= 60 else str(self[:57]) + "..."
+        return f"ReverseComplement('{text}', length={self._length})"
+
+    def __iter__(self):
+        block = 1 << 16
+        for offset in range(0, self._length, block):
+            yield from str(self[offset:offset + block])
+
+    def __eq__(self, other):
+        if isinstance(other, (ReverseComplement, PackedSequence)):
+            other = str(other)
+        if isinstance(other, str):
+            return str(self) == other
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(str(self))
+
+
+def _raw(region):
+    """Bytes-like object of a forward-strand region (zero-copy for byte buffers)."""
+    if isinstance(region, memoryview):
+        return region
+    if isinstance(region, str):
+        return region.encode("ascii")
+    if isinstance(region, PackedSequence):
+        return str(region).encode("ascii")
+    return bytes(region)   # Bio.Seq
+
+
+def reverse_complement_many(reads):
+    """
+    Reverse complement a batch of reads in one pass over one joined buffer.
+
+    :param reads: List of str or bytes reads (one type per batch; IUPAC codes and case kept).
+    :return: List of reverse complements, of the same type as the reads.
+    """
+    if not reads:
+        return []
+    text = isinstance(reads[0], str)
+    joined = "\n".join(reads).encode("ascii") if text else b"\n".join(reads)
+    # Reversing the joined buffer also reverses the order of the reads
+    result = joined.translate(_COMPLEMENT)[::-1]
+    if text:
+        result = result.decode("ascii")
+    return result.split("\n" if text else b"\n")[::-1]
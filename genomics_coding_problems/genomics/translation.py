@@ -0,0 +1,211 @@
+# Vectorized codon translation and ORF finding.
+#
+# Each base becomes a 2-bit code (A=0, C=1, G=2, U/T=3), each codon the index
+# 16 * b1 + 4 * b2 + b3, and a 64-entry uint8 lookup table maps codon indices straight to
+# amino-acid letters. A whole reading frame is therefore translated with a reshape and
+# one fancy-indexing step, with no per-codon Python work and no string concatenation.
+# Codons with any other character (N, lowercase, a T in RNA mode, a trailing partial
+# codon) translate to "?", exactly like translate_rna in 07_mRNA_to_protein_translation.py.
+#
+# ORFs are found per frame on the translated protein: every stop ("*") closes a segment,
+# and the first start codon inside a segment opens the ORF.
+
+from collections import namedtuple
+
+import numpy as np
+
+CODON_TABLE = {
+    'UUU': 'F', 'UUC': 'F', 'UUA': 'L', 'UUG': 'L',
+    'CUU': 'L', 'CUC': 'L', 'CUA': 'L', 'CUG': 'L',
+    'AUU': 'I', 'AUC': 'I', 'AUA': 'I', 'AUG': 'M',
+    'GUU': 'V', 'GUC': 'V', 'GUA': 'V', 'GUG': 'V',
+    'UCU': 'S', 'UCC': 'S', 'UCA': 'S', 'UCG': 'S',
+    'CCU': 'P', 'CCC': 'P', 'CCA': 'P', 'CCG': 'P',
+    'ACU': 'T', 'ACC': 'T', 'ACA': 'T', 'ACG': 'T',
+    'GCU': 'A', 'GCC': 'A', 'GCA': 'A', 'GCG': 'A',
+    'UAU': 'Y', 'UAC': 'Y', 'UAA': '*', 'UAG': '*',
+    'CAU': 'H', 'CAC': 'H', 'CAA': 'Q', 'CAG': 'Q',
+    'AAU': 'N', 'AAC': 'N', 'AAA': 'K', 'AAG': 'K',
+    'GAU': 'D', 'GAC': 'D', 'GAA': 'E', 'GAG': 'E',
+    'UGU': 'C', 'UGC': 'C', 'UGA': '*', 'UGG': 'W',
+    'CGU': 'R', 'CGC': 'R', 'CGA': 'R', 'CGG': 'R',
+    'AGU': 'S', 'AGC': 'S', 'AGA': 'R', 'AGG': 'R',
+    'GGU': 'G', 'GGC': 'G', 'GGA': 'G', 'GGG': 'G'
+}
+
+ORF = namedtuple("ORF", ["strand", "frame", "start", "end", "protein"])
+
+_INVALID = 4
+_UNKNOWN = ord("?")
+_RNA_BASES = "ACGU"
+_DNA_BASES = "ACGT"
+
+
+def _base_codes(bases):
+    table = np.full(256, _INVALID, dtype=np.uint8)
+    for code, base in enumerate(bases):
+        table[ord(base)] = code
+    return table
+
+
+_BASE_CODES = {True: _base_codes(_RNA_BASES), False: _base_codes(_DNA_BASES)}
+_COMPLEMENT = bytes.maketrans(b"ACGTUacgtu", b"TGCAAtgcaa")
+_DEFAULT_LOOKUP = None
+
+
+def codon_lookup_table(codon_table=None):
+    """
+    Build the 65-entry lookup table: codon index (0-63) -> amino-acid byte, entry 64 = "?".
+
+    :param codon_table: Dictionary of RNA codons to amino acids; defaults to CODON_TABLE.
+    """
+    global _DEFAULT_LOOKUP
+    if codon_table is None and _DEFAULT_LOOKUP is not None:
+        return _DEFAULT_LOOKUP
+    lookup = np.full(65, _UNKNOWN, dtype=np.uint8)
+    for codon, amino_acid in (codon_table or CODON_TABLE).items():
+        if len(codon) == 3 and all(base in _RNA_BASES for base in codon):
+            index = 16 * _RNA_BASES.index(codon[0]) + 4 * _RNA_BASES.index(codon[1]) + _RNA_BASES.index(codon[2])
+            lookup[index] = ord(amino_acid)
+    if codon_table is None:
+        _DEFAULT_LOOKUP = lookup
+    return lookup
+
+
+def _as_bytes(sequence):
+    if isinstance(sequence, str):
+        return sequence.encode("ascii")
+    if isinstance(sequence, (bytes, bytearray)):
+        return bytes(sequence)
+    if hasattr(sequence, "words"):   # PackedSequence
+        return str(sequence).encode("ascii")
+    return bytes(sequence)           # Bio.Seq
+
+
+def _is_rna(raw, rna):
+    if rna is not None:
+        return rna
+    return b"U" in raw or (b"T" not in raw and b"u" in raw)
+
+
+def _codon_indices(raw, rna, frame=0, partial_codon=True):
+    """Codon indices of one reading frame; 64 marks an untranslatable codon."""
+    codes = _BASE_CODES[rna][np.frombuffer(raw, dtype=np.uint8)[frame:]]
+    n_full = len(codes) // 3
+    triplets = codes[:n_full * 3].reshape(n_full, 3).astype(np.int64)
+    indices = 16 * triplets[:, 0] + 4 * triplets[:, 1] + triplets[:, 2]
+    indices[(triplets == _INVALID).any(axis=1)] = 64
+    if partial_codon and len(codes) % 3:
+        indices = np.append(indices, 64)
+    return indices
+
+
+def translate(sequence, codon_table=None, frame=0, rna=None, partial_codon=True):
+    """
+    Translate one reading frame with the vectorized lookup table.
+
+    :param sequence: DNA or RNA as str, bytes, Bio.Seq or PackedSequence.
+    :param codon_table: Optional RNA codon table; defaults to the standard genetic code.
+    :param frame: Offset of the first codon (0, 1 or 2).
+    :param rna: True for RNA (U), False for DNA (T); None detects it from the sequence.
+    :param partial_codon: Emit "?" for a trailing incomplete codon, as translate_rna does.
+    :return: Protein string.
+    """
+    raw = _as_bytes(sequence)
+    lookup = codon_lookup_table(codon_table)
+    indices = _codon_indices(raw, _is_rna(raw, rna), frame, partial_codon)
+    return lookup[indices].tobytes().decode("ascii")
+
+
+def reverse_complement_bytes(raw, rna=False):
+    """Reverse complement of DNA (or RNA when rna=True) bytes."""
+    result = raw.translate(_COMPLEMENT)[::-1]
+    return result.replace(b"T", b"U").replace(b"t", b"u") if rna else result
+
+
+def six_frame_translation(sequence, codon_table=None, rna=None):
+    """
+    Translate all six reading frames (complete codons only).
+
+    :return: Dictionary {"+1", "+2", "+3", "-1", "-2", "-3"} -> protein string; frame -1 starts
+             at the last base of the forward strand.
+    """
+    raw = _as_bytes(sequence)
+    rna = _is_rna(raw, rna)
+    lookup = codon_lookup_table(codon_table)
+    reverse = reverse_complement_bytes(raw, rna)
+    frames = {}
+    for strand, strand_raw in (("+", raw), ("-", reverse)):
+        for frame in range(3):
+            indices = _codon_indices(strand_raw, rna, frame, partial_codon=False)
+            frames[f"{strand}{frame + 1}"] = lookup[indices].tobytes().decode("ascii")
+    return frames
+
+
+def find_orfs(sequence, min_length=30, both_strands=True, start_codons=("M",),
+              require_stop=True, codon_table=None, rna=None):
+    """
+    Open reading frames of one sequence, in all three (or six) frames.
+
+    :param sequence: DNA or RNA as str, bytes, Bio.Seq or PackedSequence.
+    :param min_length: Minimum ORF length in amino acids (stop codon excluded).
+    :param both_strands: Also search the reverse complement.
+    :param start_codons: Amino acids that may open an ORF (by default methionine, i.e. AUG).
+    :param require_stop: Drop ORFs that run off the end of the sequence without a stop codon.
+    :return: List of ORF(strand, frame, start, end, protein) tuples; start/end are 0-based,
+             half-open coordinates on the forward strand (including the stop codon), frame is 1-3.
+    """
+    raw = _as_bytes(sequence)
+    rna = _is_rna(raw, rna)
+    lookup = codon_lookup_table(codon_table)
+    length = len(raw)
+    start_set = np.frombuffer("".join(start_codons).encode("ascii"), dtype=np.uint8)
+    strands = [("+", raw)] + ([("-", reverse_complement_bytes(raw, rna))] if both_strands else [])
+
+    orfs = []
+    for strand, strand_raw in strands:
+        for frame in range(3):
+            protein = lookup[_codon_indices(strand_raw, rna, frame, partial_codon=False)]
+            stops = np.flatnonzero(protein == ord("*"))
+            starts = np.flatnonzero(np.isin(protein, start_set))
+            # Segment ends: every stop, plus the end of the frame when stops are optional
+            ends = stops if require_stop else np.append(stops, len(protein))
+            segment_starts = np.concatenate(([0], stops + 1))[:len(ends)]
+            if len(starts) == 0 or len(ends) == 0:
+                continue
+            # First start codon at or after the beginning of each segment
+            first = np.searchsorted(starts, segment_starts)
+            valid = first < len(starts)
+            orf_starts = starts[np.minimum(first, len(starts) - 1)]
+            valid &= orf_starts < ends
+            valid &= (ends - orf_starts) >= min_length
+            for begin, end in zip(orf_starts[valid], ends[valid]):
+                has_stop = int(end < len(protein))
+                nt_start = frame + 3 * int(begin)
+                nt_end = frame + 3 * (int(end) + has_stop)
+                if strand == "-":
+                    nt_start, nt_end = length - nt_end, length - nt_start
+                orfs.append(ORF(strand, frame + 1, nt_start, nt_end,
+                                protein[begin:end].tobytes().decode("ascii")))
+    return orfs
+
+
+def iter_orfs(records, **options):
+    """
+    Stream ORFs for many sequences, e.g. IndexedFasta iteration or FASTQ batches.
+
+    :param records: Iterable of (name, sequence) pairs.
+    :param options: Passed on to find_orfs.
+    :return: Generator of (name, ORF) tuples.
+    """
+    for name, sequence in records:
+        for orf in find_orfs(sequence, **options):
+            yield name, orf
+
+
+def translate_batch(sequences, codon_table=None, rna=None):
+    """
+    Translate many transcripts (frame 0), yielding one protein per input sequence.
+    """
+    for sequence in sequences:
+        yield translate(sequence, codon_table, rna=rna)
@@ -0,0 +1,338 @@
+# Block-compressed VCF output with a positional index, and region queries on it.
+#
+# The file is written in BGZF, the block layout used by bgzip/tabix: a series of
+# independent gzip members, each holding at most 65,280 uncompressed bytes and recording
+# its own compressed size in a "BC" extra field, followed by an empty end-of-file member.
+# Standard gzip readers (gzip.open, zcat) see one ordinary gzip stream, but any block can
+# be decompressed on its own, so a position in the file is a "virtual offset":
+#   (compressed address of the block << 16) | offset inside the uncompressed block.
+#
+# Records are formatted in batches (one join and one buffered write per batch, instead of
+# one write per record), and while they are written a tabix-style linear index is built:
+# for every 16 kb window of every chromosome, the virtual offset of the first record (in
+# file order) that overlaps the window. A region query seeks to the offset of the window
+# holding its start and decompresses blocks only until it passes its end. The index is
+# saved next to the file as JSON (path + ".vidx").
+#
+# Records must be sorted by position within a chromosome, and each chromosome's records
+# must be contiguous (as in any sorted VCF).
+
+import json
+import struct
+import zlib
+from collections import namedtuple
+
+import numpy as np
+
+from .fastx import parse_region
+
+VcfRecord = namedtuple("VcfRecord", ["chrom", "pos", "id", "ref", "alt", "qual", "filter", "info"])
+
+BLOCK_SIZE = 0xff00                 # uncompressed bytes per block, as in bgzip
+WINDOW_SHIFT = 14                   # 16 kb linear index windows, as in tabix
+INDEX_SUFFIX = ".vidx"
+
+# ID1 ID2 CM FLG MTIME XFL OS XLEN | SI1 SI2 SLEN BSIZE
+_HEADER = struct.Struct("<4BI2BH2BHH")
+_FOOTER = struct.Struct("<II")
+_EOF_BLOCK = bytes.fromhex("1f8b08040000000000ff0600424302001b0003000000000000000000")
+_COLUMNS = "#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO"
+
+
+def _compress_block(data, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    payload = compressor.compress(data) + compressor.flush()
+    size = _HEADER.size + len(payload) + _FOOTER.size
+    header = _HEADER.pack(31, 139, 8, 4, 0, 0, 255, 6, 66, 67, 2, size - 1)
+    return header + payload + _FOOTER.pack(zlib.crc32(data), len(data))
+
+
+class BgzfWriter:
+    """
+    Binary BGZF output stream that reports virtual offsets.
+
+    Every block except the last holds exactly BLOCK_SIZE uncompressed bytes, so the virtual
+    offset of any uncompressed position is known once its block has been written.
+    """
+
+    def __init__(self, path, compresslevel=6):
+        self.path = path
+        self.compresslevel = compresslevel
+        self.position = 0           # uncompressed bytes written so far
+        self._handle = open(path, "wb")
+        self._buffer = bytearray()
+        self._addresses = []        # compressed address of every written block
+
+    def write(self, data):
+        self._buffer += data
+        self.position += len(data)
+        while len(self._buffer) >= BLOCK_SIZE:
+            self._write_block(bytes(self._buffer[:BLOCK_SIZE]))
+            del self._buffer[:BLOCK_SIZE]
+
+    def _write_block(self, data):
+        self._addresses.append(self._handle.tell())
+        self._handle.write(_compress_block(data, self.compresslevel))
+
+    def virtual_offsets(self, positions):
+        """
+        Virtual offsets of uncompressed positions whose blocks have already been written.
+
+        :param positions: Array of uncompressed byte positions.
+        :return: int64 array of virtual offsets.
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        addresses = np.asarray(self._addresses, dtype=np.int64)
+        return (addresses[positions // BLOCK_SIZE] << 16) | (positions % BLOCK_SIZE)
+
+    def close(self):
+        if self._handle.closed:
+            return
+        if self._buffer:
+            self._write_block(bytes(self._buffer))
+            self._buffer.clear()
+        self._handle.write(_EOF_BLOCK)
+        self._handle.close()
+
+
+class BgzfReader:
+    """Random-access reader of a BGZF file: decompresses only the blocks it is asked for."""
+
+    def __init__(self, path):
+        self.path = path
+        self._handle = open(path, "rb")
+
+    def _read_block(self, address):
+        """Uncompressed data of the block at a compressed address (None at the end of the file)."""
+        self._handle.seek(address)
+        header = self._handle.read(_HEADER.size)
+        if not header:
+            return None, address
+        fields = _HEADER.unpack(header) if len(header) == _HEADER.size else None
+        if fields is None or fields[:4] != (31, 139, 8, 4) or fields[8:11] != (66, 67, 2):
+            raise ValueError(f"{self.path}: not a BGZF block at offset {address}")
+        size = fields[11] + 1
+        body = self._handle.read(size - _HEADER.size)
+        data = zlib.decompress(body[:-_FOOTER.size], -15)
+        return data, address + size
+
+    def iter_lines(self, virtual_offset=0):
+        """
+        Stream the lines of the uncompressed text from a virtual offset onwards.
+
+        :return: Generator of lines as bytes, without their terminators.
+        """
+        address, within = virtual_offset >> 16, virtual_offset & 0xffff
+        pending = b""
+        while True:
+            data, address = self._read_block(address)
+            if data is None:
+                break
+            lines = (pending + data[within:]).split(b"\n")
+            within = 0
+            pending = lines.pop()
+            yield from lines
+        if pending:
+            yield pending
+
+    def close(self):
+        self._handle.close()
+
+
+class VcfWriter:
+    """
+    Batched BGZF VCF writer that builds a positional index as it goes.
+
+    Usage:
+        with VcfWriter("variants.vcf.gz", contigs={"chr1": 248956422}) as vcf:
+            vcf.write([("chr1", 10177, "A", "AC"), ...])    # (chrom, pos, ref, alt) or VcfRecord
+    """
+
+    def __init__(self, path, contigs=None, meta=None, index=True, batch_size=10000, compresslevel=6):
+        """
+        :param path: Output path (conventionally ending in .vcf.gz).
+        :param contigs: Optional {name: length} mapping (or list of names) for ##contig lines.
+        :param meta: Optional extra header lines (without the leading "##").
+        :param index: Build the positional index and save it as path + ".vidx" on close.
+        :param batch_size: Records formatted and written together.
+        :param compresslevel: zlib compression level of the blocks.
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.index = index
+        self.count = 0
+        self._stream = BgzfWriter(path, compresslevel)
+        self._batch = []
+        self._chrom = None
+        self._last_start = 0
+        self._max_end = 0
+        self._windows = {}          # chrom -> uncompressed position of the first record per window
+
+        header = ["##fileformat=VCFv4.2"]
+        if isinstance(contigs, dict):
+            header += [f"##contig=<ID={name},length={length}>" for name, length in contigs.items()]
+        elif contigs is not None:
+            header += [f"##contig=<ID={name}>" for name in contigs]
+        header += [f"##{line}" for line in meta or []]
+        header.append(_COLUMNS)
+        self._stream.write(("\n".join(header) + "\n").encode())
+
+    def write(self, records):
+        """
+        Queue records for writing; they are formatted and compressed batch by batch.
+
+        :param records: Iterable of (chrom, pos, ref, alt) tuples (1-based pos; ID, QUAL and
+                        INFO become "." and FILTER "PASS") or of full VcfRecord tuples.
+        """
+        for record in records:
+            self._batch.append(record)
+            if len(self._batch) >= self.batch_size:
+                self._flush_batch()
+
+    def _flush_batch(self):
+        batch, self._batch = self._batch, []
+        if not batch:
+            return
+        lines = []
+        for record in batch:
+            if len(record) == 4:
+                chrom, pos, ref, alt = record
+                lines.append(f"{chrom}\t{pos}\t.\t{ref}\t{alt}\t.\tPASS\t.".encode())
+            else:
+                lines.append("\t".join(map(str, record)).encode())
+        if self.index:
+            lengths = np.fromiter((len(line) + 1 for line in lines), dtype=np.int64, count=len(lines))
+            positions = self._stream.position + np.concatenate(([0], np.cumsum(lengths)[:-1]))
+            self._index_batch(batch, positions)
+        self._stream.write(b"\n".join(lines) + b"\n")
+        self.count += len(batch)
+
+    def _index_batch(self, batch, positions):
+        chroms = [record[0] for record in batch]
+        starts = np.fromiter((int(record[1]) - 1 for record in batch), dtype=np.int64, count=len(batch))
+        # REF is column 2 of a (chrom, pos, ref, alt) tuple and column 3 of a VcfRecord;
+        # a batch may mix both, as _flush_batch allows
+        ends = starts + np.fromiter((max(len(record[2 if len(record) == 4 else 3]), 1) for record in batch),
+                                    dtype=np.int64, count=len(batch))
+        # Runs of records on the same chromosome
+        breaks = [0] + [i for i in range(1, len(chroms)) if chroms[i] != chroms[i - 1]] + [len(chroms)]
+        for begin, stop in zip(breaks, breaks[1:]):
+            self._index_run(chroms[begin], starts[begin:stop], ends[begin:stop], positions[begin:stop])
+
+    def _index_run(self, chrom, starts, ends, positions):
+        if chrom != self._chrom:
+            if chrom in self._windows:
+                raise ValueError(f"Records of {chrom!r} are not contiguous; sort the VCF first")
+            self._windows[chrom] = []
+            self._chrom, self._last_start, self._max_end = chrom, 0, 0
+        if starts[0] < self._last_start or (np.diff(starts) < 0).any():
+            raise ValueError(f"Records of {chrom!r} are not sorted by position")
+        self._last_start = int(starts[-1])
+        # The first record overlapping window w is the first whose running maximum end passes its start
+        ends = np.maximum.accumulate(np.maximum(ends, self._max_end))
+        self._max_end = int(ends[-1])
+        windows = self._windows[chrom]
+        last_window = (self._max_end - 1) >> WINDOW_SHIFT
+        if last_window >= len(windows):
+            boundaries = np.arange(len(windows), last_window + 1, dtype=np.int64) << WINDOW_SHIFT
+            windows.extend(positions[np.searchsorted(ends, boundaries, side="right")].tolist())
+
+    def close(self):
+        """Write the pending batch, the end-of-file block and the index."""
+        if self._stream is None:
+            return
+        self._flush_batch()
+        self._stream.close()
+        if self.index:
+            linear = {chrom: self._stream.virtual_offsets(windows).tolist() if windows else []
+                      for chrom, windows in self._windows.items()}
+            with open(self.path + INDEX_SUFFIX, "w") as handle:
+                json.dump({"window_shift": WINDOW_SHIFT, "linear": linear}, handle)
+        self._stream = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _parse_record(line):
+    fields = line.decode().split("\t", 8)
+    return VcfRecord(fields[0], int(fields[1]), *fields[2:8])
+
+
+class VcfReader:
+    """
+    Reader of an indexed BGZF VCF; region queries only decompress the blocks they need.
+
+    Usage:
+        with VcfReader("variants.vcf.gz") as vcf:
+            for record in vcf.fetch_region("chr1:10,000-20,000"):
+                print(record.pos, record.ref, record.alt)
+    """
+
+    def __init__(self, path, index_path=None):
+        """
+        :param path: BGZF-compressed VCF written by VcfWriter (or bgzip).
+        :param index_path: Index written by VcfWriter; defaults to path + ".vidx".
+        """
+        self.path = path
+        self._stream = BgzfReader(path)
+        with open(index_path or path + INDEX_SUFFIX) as handle:
+            index = json.load(handle)
+        self._shift = index["window_shift"]
+        self._linear = index["linear"]
+        self.header = []
+        for line in self._stream.iter_lines():
+            if not line.startswith(b"#"):
+                break
+            self.header.append(line.decode())
+
+    @property
+    def references(self):
+        """Chromosomes with records, in file order."""
+        return list(self._linear)
+
+    def __iter__(self):
+        """All records of the file, in file order."""
+        for line in self._stream.iter_lines():
+            if line and not line.startswith(b"#"):
+                yield _parse_record(line)
+
+    def fetch(self, chrom, start=0, end=None):
+        """
+        Records overlapping a region given by 0-based, half-open coordinates.
+
+        :param chrom: Chromosome name.
+        :param start: First base (0-based).
+        :param end: One past the last base; None means the end of the chromosome.
+        :return: Generator of VcfRecord tuples whose REF allele overlaps the region.
+        """
+        windows = self._linear.get(chrom, [])
+        window = max(start, 0) >> self._shift
+        if window >= len(windows):
+            return
+        prefix = chrom.encode() + b"\t"
+        for line in self._stream.iter_lines(windows[window]):
+            if not line.startswith(prefix):
+                break
+            record = _parse_record(line)
+            if end is not None and record.pos - 1 >= end:
+                break
+            if record.pos - 1 + len(record.ref) > start:
+                yield record
+
+    def fetch_region(self, region):
+        """Records overlapping a samtools-style region such as "chr1:1,001-2,000"."""
+        chrom, start, end = parse_region(region)
+        return self.fetch(chrom, start, end)
+
+    def close(self):
+        self._stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()